@@ -25,16 +25,22 @@ import hashlib
 import logging
 import random
 import re
+import fnmatch
 import atexit
+import errno
 import subprocess
 import zipfile
 from tempfile import NamedTemporaryFile
 from argparse import ArgumentParser
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+# Modules shared between the binaries, bundled by PyInstaller through --paths binaries/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pe_info import read_pe_info
+
 
 # Logging Setup
 
@@ -195,6 +201,37 @@ def get_directory_size(path: str) -> int:
         logging.warning(f"Error calculating directory size for {path}: {e}")
     return total_size
 
+def parse_size_string(size: str) -> Optional[int]:
+    """Parse a human size string (e.g. "5.2 GB") into bytes."""
+    try:
+        size_parts = size.split()
+        if len(size_parts) != 2:
+            return None
+        multipliers = {'B': 1, 'KB': 1024, 'MB': 1024**2, 'GB': 1024**3, 'TB': 1024**4}
+        return int(float(size_parts[0]) * multipliers.get(size_parts[1].upper(), 1024**3))
+    except (ValueError, AttributeError):
+        return None
+
+def preallocate_file(file_handle, size: int) -> bool:
+    """Reserve disk space for a file so ENOSPC surfaces before any data is written.
+
+    Returns True if the space was reserved, False if the platform cannot preallocate.
+    Raises OSError (ENOSPC) when the disk is too small.
+    """
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(file_handle.fileno(), 0, size)
+            return True
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.EINVAL):
+                return False
+            raise
+    if sys.platform == 'win32':
+        # Extending the file allocates (non-sparse) clusters on NTFS
+        file_handle.truncate(size)
+        return True
+    return False
+
 def get_free_disk_space(path: str) -> int:
     """Get free disk space in bytes for the drive containing the path."""
     try:
@@ -264,6 +301,52 @@ def handleerror(game_info: Dict, game_info_path: str, error: Any):
     safe_write_json(game_info_path, game_info)
 
 
+# Extraction Filter
+
+
+# Folder rules end with "/", anything else is a file name pattern
+DEFAULT_EXTRACTION_EXCLUDES = ["_CommonRedist/", "*.url"]
+
+
+class ExtractionFilter:
+    """
+    Decides which archive members are junk so they are never written to disk.
+    Rules come from the 'extractionExcludes' setting.
+    """
+    
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self.folder_names = {p.rstrip('/\\').lower() for p in patterns if p.endswith(('/', '\\'))}
+        self.file_patterns = [p.lower() for p in patterns if not p.endswith(('/', '\\'))]
+    
+    @classmethod
+    def from_settings(cls) -> 'ExtractionFilter':
+        patterns = load_settings().get('extractionExcludes', DEFAULT_EXTRACTION_EXCLUDES)
+        if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+            logging.warning(f"[ExtractionFilter] Invalid extractionExcludes setting, using defaults")
+            patterns = DEFAULT_EXTRACTION_EXCLUDES
+        return cls([p.strip() for p in patterns if p.strip()])
+    
+    def is_excluded(self, member_name: str) -> bool:
+        """Check an archive member (or relative path) against the exclusion rules."""
+        parts = member_name.replace('\\', '/').lower().split('/')
+        if any(part in self.folder_names for part in parts[:-1]):
+            return True
+        name = parts[-1]
+        return bool(name) and any(fnmatch.fnmatchcase(name, pattern) for pattern in self.file_patterns)
+    
+    def unrar_switches(self) -> List[str]:
+        """unrar -x switches for the same rules (system unrar on Linux/macOS)."""
+        switches = []
+        for pattern in self.patterns:
+            if pattern.endswith(('/', '\\')):
+                folder = pattern.rstrip('/\\')
+                switches += [f"-x{folder}", f"-x{folder}/*", f"-x*/{folder}", f"-x*/{folder}/*"]
+            else:
+                switches.append(f"-x{pattern}")
+        return switches
+
+
 # Robust HTTP Session with Connection Pooling
 
 
@@ -326,11 +409,22 @@ class ChunkedDownloader:
         self.session_downloaded_bytes = 0  # Track bytes downloaded in current session only
         self.start_time = time.time()
         self.last_progress_update = 0
+        self._probed = False
+        # Preallocated downloads keep the written offset in a sidecar, since the file size is the full size
+        self._preallocated = False
+        self._part_state_path = f"{dest_path}.ascendara.part"
         # Load speed limit from settings (KB/s -> bytes/s, 0 = unlimited)
         settings = load_settings()
         self._speed_limit_bytes = int(settings.get('downloadLimit', 0)) * 1024
         logging.info(f"[ChunkedDownloader] Speed limit: {self._speed_limit_bytes // 1024} KB/s" if self._speed_limit_bytes > 0 else "[ChunkedDownloader] Speed limit: unlimited")
         
+    def probe(self) -> Optional[int]:
+        """Probe the server once and return the total file size, if known."""
+        if not self._probed:
+            self._probe_server()
+            self._probed = True
+        return self.total_size
+    
     def _probe_server(self) -> bool:
         """Probe server for file size and range support."""
         try:
@@ -388,9 +482,73 @@ class ChunkedDownloader:
     
     def _get_existing_size(self) -> int:
         """Get size of existing partial download."""
-        if os.path.exists(self.dest_path):
-            return os.path.getsize(self.dest_path)
-        return 0
+        if not os.path.exists(self.dest_path):
+            return 0
+        file_size = os.path.getsize(self.dest_path)
+        if os.path.exists(self._part_state_path):
+            try:
+                with open(self._part_state_path, 'r') as f:
+                    part_state = json.load(f)
+                if part_state.get('total') == file_size:
+                    self._preallocated = True
+                    return min(int(part_state.get('written', 0)), file_size)
+            except Exception as e:
+                logging.warning(f"[ChunkedDownloader] Ignoring unreadable part state: {e}")
+            return 0
+        return file_size
+    
+    def get_remaining_bytes(self) -> Optional[int]:
+        """Bytes still to be downloaded, or None if the total size is unknown."""
+        if not self.total_size:
+            return None
+        existing = self._get_existing_size() if self.supports_range else 0
+        return max(0, self.total_size - existing)
+    
+    def _save_part_state(self):
+        """Persist how much of a preallocated file has been written."""
+        if self._preallocated:
+            safe_write_json(self._part_state_path, {"total": self.total_size, "written": self.downloaded_bytes})
+    
+    def _clear_part_state(self):
+        if os.path.exists(self._part_state_path):
+            try:
+                os.remove(self._part_state_path)
+            except OSError:
+                pass
+    
+    def _preallocate(self):
+        """Reserve the full download size up front so a full disk fails immediately."""
+        # The sidecar goes first: a crash after preallocating must not leave a full size
+        # file without one, it would be taken for a finished download
+        self._preallocated = True
+        self.downloaded_bytes = 0
+        self._save_part_state()
+        try:
+            with open(self.dest_path, 'wb') as f:
+                self._preallocated = preallocate_file(f, self.total_size)
+        except OSError as e:
+            self._preallocated = False
+            self._clear_part_state()
+            if e.errno == errno.ENOSPC:
+                raise OSError(errno.ENOSPC, f"Insufficient disk space. Need {read_size(self.total_size)}") from e
+            raise
+        if self._preallocated:
+            logging.info(f"[ChunkedDownloader] Preallocated {read_size(self.total_size)}")
+        else:
+            # Appended downloads resume from the file size, which a stale sidecar would hide
+            self._clear_part_state()
+    
+    def _open_for_write(self):
+        if self._preallocated:
+            f = open(self.dest_path, 'r+b')
+            f.seek(self.downloaded_bytes)
+            return f
+        return open(self.dest_path, 'ab' if self.downloaded_bytes > 0 else 'wb')
+    
+    def _written_size(self) -> int:
+        if self._preallocated:
+            return self.downloaded_bytes
+        return os.path.getsize(self.dest_path) if os.path.exists(self.dest_path) else 0
     
     def _update_progress(self, force: bool = False):
         """Update progress in game info file."""
@@ -440,6 +598,7 @@ class ChunkedDownloader:
         self.game_info["downloadingData"]["timeUntilComplete"] = eta_str
         self.game_info["downloadingData"]["downloading"] = True
         safe_write_json(self.game_info_path, self.game_info)
+        self._save_part_state()
     
     def _stream_download(self, start_byte: int, file_handle) -> bool:
         """
@@ -514,13 +673,14 @@ class ChunkedDownloader:
         """
         try:
             # Probe server for capabilities
-            self._probe_server()
+            self.probe()
             
             # Check for existing partial download
             existing_size = self._get_existing_size()
             
             if self.total_size and existing_size >= self.total_size:
                 logging.info(f"[ChunkedDownloader] File already complete: {read_size(existing_size)}")
+                self._clear_part_state()
                 return True
             
             if existing_size > 0 and self.supports_range:
@@ -529,8 +689,13 @@ class ChunkedDownloader:
             else:
                 if existing_size > 0 and not self.supports_range:
                     logging.warning("[ChunkedDownloader] Server doesn't support range requests, starting fresh")
+                if os.path.exists(self.dest_path):
                     os.remove(self.dest_path)
+                self._clear_part_state()
+                self._preallocated = False
                 self.downloaded_bytes = 0
+                if self.total_size:
+                    self._preallocate()
             
             self.start_time = time.time()
             retry_count = 0
@@ -539,14 +704,12 @@ class ChunkedDownloader:
             # Retry loop - keeps trying until success or max retries
             while retry_count < self.MAX_RETRIES:
                 # Open file for writing/appending
-                mode = 'ab' if self.downloaded_bytes > 0 else 'wb'
-                
-                with open(self.dest_path, mode) as f:
+                with self._open_for_write() as f:
                     success = self._stream_download(self.downloaded_bytes, f)
                 
                 if success:
                     # Check if download is complete
-                    final_size = os.path.getsize(self.dest_path)
+                    final_size = self._written_size()
                     
                     # Debug logging to see exact values
                     logging.info(f"[ChunkedDownloader] DEBUG: final_size={final_size}, total_size={self.total_size}, difference={abs(final_size - self.total_size) if self.total_size else 'N/A'}")
@@ -558,6 +721,13 @@ class ChunkedDownloader:
                         logging.info(f"[ChunkedDownloader] Download complete: {read_size(final_size)}")
                         return True
                     elif final_size >= self.total_size - 1024:
+                        # Drop any unwritten preallocated tail
+                        if self._preallocated:
+                            with open(self.dest_path, 'r+b') as f:
+                                f.truncate(final_size)
+                            self._clear_part_state()
+                            self._preallocated = False
+                        
                         # Download is complete (within 1KB tolerance)
                         # Clear retry status
                         if 'retryAttempt' in self.game_info.get('downloadingData', {}):
@@ -581,7 +751,8 @@ class ChunkedDownloader:
                     return False
                 
                 retry_count += 1
-                self.downloaded_bytes = os.path.getsize(self.dest_path) if os.path.exists(self.dest_path) else 0
+                self.downloaded_bytes = self._written_size()
+                self._save_part_state()
                 
                 # Update game info with retry status
                 self.game_info["downloadingData"]["retryAttempt"] = retry_count
@@ -608,6 +779,10 @@ class ChunkedDownloader:
 # Main Downloader Class
 
 
+# Buzzheavier pages carry the real file name in their <title>
+BUZZHEAVIER_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+
 class RobustDownloader:
     """
     Main downloader class that orchestrates download, extraction, and verification.
@@ -621,6 +796,9 @@ class RobustDownloader:
         'fuckingfast.co'
     ]
     
+    # Minimum time the verifying state stays visible in the UI
+    VERIFY_MIN_DISPLAY_TIME = 1.0
+    
     def __init__(self, game: str, online: bool, dlc: bool, isVr: bool, 
                  updateFlow: bool, version: str, size: str, download_dir: str, gameID: str = ""):
         self.game = game
@@ -635,6 +813,9 @@ class RobustDownloader:
         os.makedirs(self.download_dir, exist_ok=True)
         self.game_info_path = os.path.join(self.download_dir, f"{sanitize_folder_name(game)}.ascendara.json")
         self.withNotification = None
+        self.extraction_filter = ExtractionFilter.from_settings()
+        # Set when an extractor could not apply the filter and junk was written
+        self._junk_on_disk = False
         
         # Initialize or update game info
         if updateFlow and os.path.exists(self.game_info_path):
@@ -722,39 +903,19 @@ class RobustDownloader:
                 self._download_buzzheavier(url)
                 return
             
-            # Check disk space before starting download
-            # Estimate: download size + extraction (typically 2-3x compressed size)
-            # Use size from game_info if available
-            if self.size:
-                try:
-                    # Parse size string (e.g., "5.2 GB") to bytes
-                    size_parts = self.size.split()
-                    if len(size_parts) == 2:
-                        size_value = float(size_parts[0])
-                        size_unit = size_parts[1].upper()
-                        multipliers = {'B': 1, 'KB': 1024, 'MB': 1024**2, 'GB': 1024**3, 'TB': 1024**4}
-                        estimated_download_size = int(size_value * multipliers.get(size_unit, 1024**3))
-                        # Estimate total needed: download + extraction (3x) + backup if update
-                        total_needed = estimated_download_size * 4 if self.updateFlow else estimated_download_size * 3
-                        
-                        if not check_disk_space(self.download_dir, total_needed, "download and extraction"):
-                            error_msg = f"Insufficient disk space. Need ~{read_size(total_needed)}"
-                            logging.error(f"[RobustDownloader] {error_msg}")
-                            handleerror(self.game_info, self.game_info_path, error_msg)
-                            if withNotification:
-                                _launch_notification(withNotification, "Download Failed", error_msg)
-                            return
-                except Exception as e:
-                    logging.warning(f"[RobustDownloader] Could not parse size for disk check: {e}")
+            # Get filename
+            base_name = self._get_filename_from_url(url)
+            dest = os.path.join(self.download_dir, base_name)
+            
+            # Create chunked downloader and check disk space against the probed size
+            downloader = ChunkedDownloader(url, dest, self.game_info, self.game_info_path)
+            if not self._check_download_space(downloader):
+                return
             
             # Update state
             self.game_info["downloadingData"]["downloading"] = True
             safe_write_json(self.game_info_path, self.game_info)
             
-            # Get filename
-            base_name = self._get_filename_from_url(url)
-            dest = os.path.join(self.download_dir, base_name)
-            
             logging.info(f"[RobustDownloader] Starting download: {url}")
             logging.info(f"[RobustDownloader] Destination: {dest}")
             
@@ -762,8 +923,7 @@ class RobustDownloader:
             if withNotification:
                 _launch_notification(withNotification, "Download Started", f"Starting download for {self.game}")
             
-            # Create chunked downloader and start download
-            downloader = ChunkedDownloader(url, dest, self.game_info, self.game_info_path)
+            # Start download
             success = downloader.download()
             
             if success:
@@ -780,7 +940,8 @@ class RobustDownloader:
                 dest = self._fix_file_extension(dest)
                 
                 # Extract files
-                self._extract_files(dest)
+                if not self._extract_files(dest):
+                    return
                 
                 if withNotification:
                     _launch_notification(withNotification, "Download Complete", f"Successfully downloaded {self.game}")
@@ -800,6 +961,73 @@ class RobustDownloader:
             if withNotification:
                 _launch_notification(withNotification, "Download Error", f"Error downloading {self.game}: {e}")
     
+    def _check_download_space(self, downloader: ChunkedDownloader) -> bool:
+        """Check free space for a download using the size reported by the server.
+        
+        The archive must fit and extraction needs at least as much again; the exact
+        extraction requirement is checked from the archive index before extracting.
+        Falls back to the listed size when the server does not report one.
+        """
+        total_size = downloader.probe()
+        remaining = downloader.get_remaining_bytes()
+        if total_size is None:
+            total_size = parse_size_string(self.size) if self.size else None
+            remaining = total_size
+        if not total_size:
+            logging.warning("[RobustDownloader] Download size unknown, skipping disk space check")
+            return True
+        
+        required = remaining + total_size
+        if check_disk_space(self.download_dir, required, "download"):
+            return True
+        
+        error_msg = f"Insufficient disk space. Need ~{read_size(required)}"
+        logging.error(f"[RobustDownloader] {error_msg}")
+        handleerror(self.game_info, self.game_info_path, error_msg)
+        if self.withNotification:
+            _launch_notification(self.withNotification, "Download Failed", error_msg)
+        return False
+    
+    def _check_extraction_space(self, extracted_size: int, backup_size: int) -> bool:
+        """Check free space for extraction (archive index totals) plus the update backup."""
+        required = extracted_size + backup_size
+        if check_disk_space(self.download_dir, required, "extraction"):
+            return True
+        
+        error_msg = f"Insufficient disk space to extract. Need ~{read_size(required)}"
+        logging.error(f"[RobustDownloader] {error_msg}")
+        handleerror(self.game_info, self.game_info_path, error_msg)
+        if self.withNotification:
+            _launch_notification(self.withNotification, "Extraction Failed", error_msg)
+        return False
+    
+    def _get_backup_items(self) -> List[str]:
+        """Top-level items an update backup copies (everything except archives, temp files and JSON)."""
+        skip_extensions = {'.rar', '.zip', '.7z', '.tmp', '.part', '.download'}
+        skip_names = {'.ascendara_backup', 'filemap.ascendara.json'}
+        items = []
+        for item in os.listdir(self.download_dir):
+            if item in skip_names or item.endswith('.ascendara.json') or item.endswith('.ascendara.part'):
+                continue
+            item_path = os.path.join(self.download_dir, item)
+            if os.path.isfile(item_path) and os.path.splitext(item)[1].lower() in skip_extensions:
+                continue
+            items.append(item)
+        return items
+    
+    def _get_backup_size(self) -> int:
+        """Size of the files an update backup will copy."""
+        if not self.updateFlow:
+            return 0
+        total = 0
+        for item in self._get_backup_items():
+            item_path = os.path.join(self.download_dir, item)
+            try:
+                total += get_directory_size(item_path) if os.path.isdir(item_path) else os.path.getsize(item_path)
+            except OSError:
+                pass
+        return total
+    
     def _create_update_backup(self) -> Optional[str]:
         """Create a backup of existing game files before updating.
         Returns the backup directory path if successful, None otherwise.
@@ -810,21 +1038,7 @@ class RobustDownloader:
         backup_dir = os.path.join(self.download_dir, ".ascendara_backup")
         
         try:
-            # Calculate size of existing game files
-            existing_size = get_directory_size(self.download_dir)
-            logging.info(f"[RobustDownloader] Existing game size: {read_size(existing_size)}")
-            
-            # Check if we have enough space for backup (need space for copy)
-            if not check_disk_space(self.download_dir, existing_size, "backup creation"):
-                logging.error(f"[RobustDownloader] Insufficient disk space to create backup")
-                if self.withNotification:
-                    _launch_notification(
-                        self.withNotification,
-                        "Update Failed",
-                        "Insufficient disk space to create backup"
-                    )
-                return None
-            
+            # Disk space for the backup is reserved by _check_extraction_space
             # Remove old backup if it exists
             if os.path.exists(backup_dir):
                 logging.info(f"[RobustDownloader] Removing old backup: {backup_dir}")
@@ -836,22 +1050,9 @@ class RobustDownloader:
             
             # Backup all files except archives, temp files, and the JSON file
             backup_count = 0
-            skip_extensions = {'.rar', '.zip', '.7z', '.tmp', '.part', '.download'}
-            skip_names = {'.ascendara_backup', 'filemap.ascendara.json'}
-            
-            for item in os.listdir(self.download_dir):
+            for item in self._get_backup_items():
                 item_path = os.path.join(self.download_dir, item)
                 
-                # Skip backup directory itself and JSON file
-                if item in skip_names or item.endswith('.ascendara.json'):
-                    continue
-                
-                # Skip archive files and temp files
-                if os.path.isfile(item_path):
-                    ext = os.path.splitext(item)[1].lower()
-                    if ext in skip_extensions:
-                        continue
-                
                 # Backup the item
                 backup_item_path = os.path.join(backup_dir, item)
                 try:
@@ -959,9 +1160,7 @@ class RobustDownloader:
     
     def _download_buzzheavier(self, url: str):
         """Download from Buzzheavier with robust chunked download and resume support."""
-        from bs4 import BeautifulSoup
-        
-        import re
+        import html
 
         logging.info(f"[RobustDownloader] Buzzheavier download: {url}")
         
@@ -970,10 +1169,9 @@ class RobustDownloader:
         response = session.get(url)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # The title contains real file name
-        title = soup.title.string.strip() if soup.title else 'buzzheavier_download'
+        # The title contains real file name, it is all that is needed from the page so no DOM is built
+        title_match = BUZZHEAVIER_TITLE_RE.search(response.text)
+        title = html.unescape(title_match.group(1)).strip() if title_match else 'buzzheavier_download'
         logging.info(f"[Buzzheavier] Title/filename: {title}")
 
         # Extract signed token from html
@@ -1020,12 +1218,15 @@ class RobustDownloader:
         # Use the robust ChunkedDownloader for the actual file download
         dest_path = os.path.join(self.download_dir, filename)
         
+        # Create chunked downloader and check disk space against the probed size
+        downloader = ChunkedDownloader(final_url, dest_path, self.game_info, self.game_info_path)
+        if not self._check_download_space(downloader):
+            return
+        
         # Update state
         self.game_info["downloadingData"]["downloading"] = True
         safe_write_json(self.game_info_path, self.game_info)
         
-        # Create chunked downloader and start download
-        downloader = ChunkedDownloader(final_url, dest_path, self.game_info, self.game_info_path)
         success = downloader.download()
         
         if success:
@@ -1042,18 +1243,49 @@ class RobustDownloader:
             dest_path = self._fix_file_extension(dest_path)
             
             # Extract files
-            self._extract_files(dest_path)
+            if not self._extract_files(dest_path):
+                return
             
             if self.withNotification:
                 _launch_notification(self.withNotification, "Download Complete", f"Successfully downloaded {self.game}")
         else:
             raise Exception("Buzzheavier download failed after all retries")
     
-    def _extract_files(self, archive_path: Optional[str] = None):
-        """Extract archive files and flatten nested directories."""
-        # Create backup before extraction if this is an update
-        backup_dir = self._create_update_backup()
+    def _list_archive_members(self, archive_path: str) -> List[Tuple[str, int]]:
+        """List (name, uncompressed size) of the file members in a zip/rar archive index."""
+        members = []
+        ext = os.path.splitext(archive_path)[1].lower()
+        if ext == '.zip':
+            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
+                members = [(info.filename, info.file_size) for info in zip_ref.infolist() if not info.is_dir()]
+        elif ext == '.rar':
+            # On Windows, use Python unrar library; on Linux/macOS, use system binary
+            if sys.platform == "win32":
+                from unrar import rarfile
+                with rarfile.RarFile(archive_path, 'r') as rar_ref:
+                    # Directories end with /
+                    members = [(info.filename, info.file_size) for info in rar_ref.infolist()
+                               if not info.filename.endswith('/')]
+            else:
+                unrar_bin = shutil.which('unrar') or shutil.which('unrar-free')
+                if unrar_bin:
+                    result = subprocess.run([unrar_bin, 'l', archive_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                    for line in result.stdout.decode(errors='replace').splitlines():
+                        # Attributes  Size  Date  Time  Name
+                        parts = line.split(None, 4)
+                        if len(parts) < 5 or not parts[1].isdigit():
+                            continue
+                        attributes = parts[0]
+                        if attributes.startswith('d') or 'D' in attributes:
+                            continue
+                        members.append((parts[4], int(parts[1])))
+        return members
+    
+    def _extract_files(self, archive_path: Optional[str] = None) -> bool:
+        """Extract archive files and flatten nested directories.
         
+        Returns False if extraction could not start (the error is already reported).
+        """
         self.game_info["downloadingData"]["extracting"] = True
         # Initialize extraction progress tracking
         self.game_info["downloadingData"]["extractionProgress"] = {
@@ -1087,47 +1319,35 @@ class RobustDownloader:
                     if ext in archive_exts:
                         archives_to_process.append(os.path.join(root, file))
         
-        # Count total files for progress tracking
+        # Count total files and uncompressed bytes from the archive indexes
         total_files_to_extract = 0
+        total_extracted_bytes = 0
+        archive_members = {}
         for arch_path in archives_to_process:
             try:
-                ext = os.path.splitext(arch_path)[1].lower()
-                if ext == '.zip':
-                    with zipfile.ZipFile(arch_path, 'r') as zip_ref:
-                        for zip_info in zip_ref.infolist():
-                            if not zip_info.filename.endswith('.url') and '_CommonRedist' not in zip_info.filename and not zip_info.is_dir():
-                                total_files_to_extract += 1
-                elif ext == '.rar':
-                    # On Windows, use Python unrar library; on Linux/macOS, use system binary
-                    if sys.platform == "win32":
-                        try:
-                            from unrar import rarfile
-                            with rarfile.RarFile(arch_path, 'r') as rar_ref:
-                                for info in rar_ref.infolist():
-                                    # Check if it's a file (not directory) - directories end with /
-                                    if not info.filename.endswith('.url') and '_CommonRedist' not in info.filename and not info.filename.endswith('/'):
-                                        total_files_to_extract += 1
-                        except Exception as e:
-                            logging.warning(f"[RobustDownloader] Could not count RAR files with library: {e}")
-                    else:
-                        import shutil as _shutil
-                        _unrar = _shutil.which('unrar') or _shutil.which('unrar-free')
-                        if _unrar:
-                            _result = subprocess.run([_unrar, 'l', arch_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                            for _line in _result.stdout.decode(errors='replace').splitlines():
-                                _parts = _line.split()
-                                if len(_parts) >= 5 and _parts[0] not in ('-', 'Name', '---'):
-                                    _fname = _parts[-1]
-                                    if not _fname.endswith('.url') and '_CommonRedist' not in _fname and not _fname.endswith('/'):
-                                        total_files_to_extract += 1
+                archive_members[arch_path] = self._list_archive_members(arch_path)
+                for name, size in archive_members[arch_path]:
+                    if not self.extraction_filter.is_excluded(name):
+                        total_files_to_extract += 1
+                        total_extracted_bytes += size
             except Exception as e:
                 logging.warning(f"[RobustDownloader] Could not count files in {arch_path}: {e}")
         
-        logging.info(f"[RobustDownloader] Total files to extract: {total_files_to_extract}")
+        logging.info(f"[RobustDownloader] Total files to extract: {total_files_to_extract} ({read_size(total_extracted_bytes)})")
+        
+        # Archives stay on disk until extracted, so free space must cover the extracted data plus the backup
+        if not self._check_extraction_space(total_extracted_bytes, self._get_backup_size()):
+            return False
+        
+        # Create backup before extraction if this is an update
+        backup_dir = self._create_update_backup()
+        
         self._total_files_to_extract = total_files_to_extract
         self._update_extraction_progress("Preparing...", 0, total_files_to_extract, force=True)
         
         processed_archives = set()
+        # Cleared only while every archive is extracted with its wrapper folder stripped
+        flatten_needed = False
         
         while archives_to_process:
             current_archive = archives_to_process.pop(0)
@@ -1140,10 +1360,20 @@ class RobustDownloader:
             logging.info(f"[RobustDownloader] Extracting: {current_archive}")
             
             try:
+                try:
+                    members = archive_members.get(current_archive) or self._list_archive_members(current_archive)
+                    strip_prefix = self._get_wrapper_prefix(name for name, _ in members)
+                except Exception as e:
+                    logging.warning(f"[RobustDownloader] Could not read archive index for {current_archive}: {e}")
+                    strip_prefix = None
+                
+                stripped = False
                 if ext == '.zip':
-                    self._extract_zip(current_archive, watching_data)
+                    stripped = self._extract_zip(current_archive, watching_data, strip_prefix)
                 elif ext == '.rar':
-                    self._extract_rar(current_archive, watching_data)
+                    stripped = self._extract_rar(current_archive, watching_data, strip_prefix)
+                if not stripped:
+                    flatten_needed = True
                 
                 # Delete archive after extraction
                 try:
@@ -1168,23 +1398,10 @@ class RobustDownloader:
                             
                             # Count files in nested archive and update total
                             try:
-                                nested_file_count = 0
-                                if ext == '.zip':
-                                    with zipfile.ZipFile(new_archive, 'r') as zip_ref:
-                                        for zip_info in zip_ref.infolist():
-                                            if not zip_info.filename.endswith('.url') and '_CommonRedist' not in zip_info.filename and not zip_info.is_dir():
-                                                nested_file_count += 1
-                                elif ext == '.rar':
-                                    import shutil as _shutil
-                                    _unrar = _shutil.which('unrar') or _shutil.which('unrar-free')
-                                    if _unrar:
-                                        _result = subprocess.run([_unrar, 'l', new_archive], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                                        for _line in _result.stdout.decode(errors='replace').splitlines():
-                                            _parts = _line.split()
-                                            if len(_parts) >= 5 and _parts[0] not in ('-', 'Name', '---'):
-                                                _fname = _parts[-1]
-                                                if not _fname.endswith('.url') and '_CommonRedist' not in _fname and not _fname.endswith('/'):
-                                                    nested_file_count += 1
+                                nested_file_count = sum(
+                                    1 for name, _ in self._list_archive_members(new_archive)
+                                    if not self.extraction_filter.is_excluded(name)
+                                )
                                 
                                 if nested_file_count > 0:
                                     self._total_files_to_extract += nested_file_count
@@ -1195,26 +1412,30 @@ class RobustDownloader:
         # Force final progress update before flattening
         self._update_extraction_progress("Finalizing...", self._files_extracted_count, self._total_files_to_extract, force=True)
         
-        # Flatten nested directories
-        self._flatten_directories()
+        # Flatten nested directories (not needed when wrappers were stripped at extraction)
+        if flatten_needed:
+            self._flatten_directories()
+        else:
+            logging.info(f"[RobustDownloader] Archives extracted in place, skipping flatten pass")
         
         # Rebuild filemap
         watching_data = {}
         for dirpath, _, filenames in os.walk(self.download_dir):
             rel_dir = os.path.relpath(dirpath, self.download_dir)
             for fname in filenames:
-                if fname.endswith('.url') or '_CommonRedist' in dirpath:
-                    continue
                 if os.path.splitext(fname)[1].lower() in archive_exts:
                     continue
                 rel_path = os.path.normpath(os.path.join(rel_dir, fname)) if rel_dir != '.' else fname
                 rel_path = rel_path.replace('\\', '/')
+                if self.extraction_filter.is_excluded(rel_path):
+                    continue
                 watching_data[rel_path] = {"size": os.path.getsize(os.path.join(dirpath, fname))}
         
         safe_write_json(watching_path, watching_data)
         
-        # Clean up .url files and _CommonRedist
-        self._cleanup_junk_files()
+        # Junk is excluded at extraction; only sweep if an extractor could not filter
+        if self._junk_on_disk:
+            self._cleanup_junk_files()
         
         # Update state
         self.game_info["downloadingData"]["extracting"] = False
@@ -1226,6 +1447,7 @@ class RobustDownloader:
         
         # Verify
         self._verify_extracted_files(watching_path, backup_dir)
+        return True
     
     def _update_extraction_progress(self, current_file: str, files_extracted: int, total_files: int, force: bool = False):
         """Update extraction progress in the game info JSON.
@@ -1260,8 +1482,11 @@ class RobustDownloader:
             safe_write_json(self.game_info_path, self.game_info)
             self._last_progress_update = current_time
 
-    def _extract_zip(self, archive_path: str, watching_data: Dict):
-        """Extract a ZIP file."""
+    def _extract_zip(self, archive_path: str, watching_data: Dict, strip_prefix: Optional[str] = None) -> bool:
+        """Extract a ZIP file.
+        
+        Returns True if strip_prefix was removed from member paths during extraction.
+        """
         try:
             with zipfile.ZipFile(archive_path, 'r') as test_zip:
                 test_zip.testzip()
@@ -1274,14 +1499,25 @@ class RobustDownloader:
             zip_contents = zip_ref.infolist()
             logging.info(f"[RobustDownloader] ZIP contains {len(zip_contents)} files")
             
-            # Filter members to extract (exclude .url and _CommonRedist)
+            # Filter members to extract (exclusion rules from settings)
             members_to_extract = [
                 zip_info for zip_info in zip_contents
-                if not zip_info.filename.endswith('.url') and '_CommonRedist' not in zip_info.filename
+                if not self.extraction_filter.is_excluded(zip_info.filename)
             ]
             
             logging.info(f"[RobustDownloader] Extracting {len(members_to_extract)} files (filtered from {len(zip_contents)})")
             
+            # Write members straight to their flattened location; ZipFile.open reads by
+            # orig_filename, so renaming the ZipInfo only changes the output path
+            if strip_prefix:
+                prefix = strip_prefix + '/'
+                stripped_members = []
+                for zip_info in members_to_extract:
+                    if zip_info.filename.startswith(prefix) and len(zip_info.filename) > len(prefix):
+                        zip_info.filename = zip_info.filename[len(prefix):]
+                        stripped_members.append(zip_info)
+                members_to_extract = stripped_members
+            
             # Use extractall() for dramatically faster extraction (10-100x faster than file-by-file)
             try:
                 zip_ref.extractall(self.download_dir, members=members_to_extract)
@@ -1307,9 +1543,15 @@ class RobustDownloader:
                     # Update progress more frequently: first 10 files (every file), then every 50 files, or at completion
                     if self._files_extracted_count <= 10 or self._files_extracted_count % 50 == 0 or self._files_extracted_count == self._total_files_to_extract:
                         self._update_extraction_progress(zip_info.filename, self._files_extracted_count, self._total_files_to_extract)
+        
+        return bool(strip_prefix)
     
-    def _extract_rar(self, archive_path: str, watching_data: Dict):
-        """Extract a RAR file using Python unrar library (Windows) or system unrar binary (Linux/macOS)."""
+    def _extract_rar(self, archive_path: str, watching_data: Dict, strip_prefix: Optional[str] = None) -> bool:
+        """Extract a RAR file using Python unrar library (Windows) or system unrar binary (Linux/macOS).
+        
+        Returns True if strip_prefix was removed from member paths during extraction
+        (system unrar only; the library extracts full paths and is flattened afterwards).
+        """
         import threading
         import shutil as _shutil
 
@@ -1318,7 +1560,8 @@ class RobustDownloader:
             try:
                 from unrar import rarfile
                 logging.info(f"[RobustDownloader] Extracting RAR with Python unrar library: {archive_path}")
-                return self._extract_rar_with_library(archive_path, watching_data)
+                self._extract_rar_with_library(archive_path, watching_data)
+                return False
             except ImportError:
                 raise RuntimeError("UnRAR library not found. Please reinstall Ascendara.")
         
@@ -1345,8 +1588,20 @@ class RobustDownloader:
         files_extracted_count = [0]
         last_filename = [""]
 
+        # -ap<path> removes the wrapper folder from member names (not supported by unrar-free)
+        # -x<mask> keeps junk from ever being written (neither is supported by unrar-free)
+        unrar_args = [unrar_bin, "x", "-y"]
+        is_unrar_free = 'unrar-free' in os.path.basename(unrar_bin)
+        if is_unrar_free:
+            strip_prefix = None
+            self._junk_on_disk = True
+        else:
+            unrar_args += self.extraction_filter.unrar_switches()
+            if strip_prefix:
+                unrar_args.append(f"-ap{strip_prefix}")
+
         proc = subprocess.Popen(
-            [unrar_bin, "x", "-y", archive_path, self.download_dir + "/"],
+            unrar_args + [archive_path, self.download_dir + "/"],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
@@ -1373,7 +1628,7 @@ class RobustDownloader:
                         rest = rest.strip()
                         fname = os.path.basename(rest)
                         # Only count/update when the filename actually changes
-                        if fname and fname != last_seen[0] and not fname.endswith('.url') and '_CommonRedist' not in fname:
+                        if fname and fname != last_seen[0] and not self.extraction_filter.is_excluded(rest):
                             last_seen[0] = fname
                             files_extracted_count[0] += 1
                             last_filename[0] = fname
@@ -1415,34 +1670,26 @@ class RobustDownloader:
             logging.warning(f"[RobustDownloader] Extracted count ({self._files_extracted_count}) exceeds total ({self._total_files_to_extract}), capping")
             self._files_extracted_count = self._total_files_to_extract
 
-        # Clean up unwanted files (.url and _CommonRedist)
-        for root, dirs, files_in_dir in os.walk(self.download_dir):
-            if '_CommonRedist' in root:
-                try:
-                    shutil.rmtree(root)
-                    logging.info(f"[RobustDownloader] Removed _CommonRedist: {root}")
-                except Exception as e:
-                    logging.warning(f"[RobustDownloader] Could not remove _CommonRedist: {e}")
-                continue
-
-            for fname in files_in_dir:
-                if fname.endswith('.url'):
-                    try:
-                        os.remove(os.path.join(root, fname))
-                    except Exception:
-                        pass
+        # unrar-free cannot exclude members, so remove junk now
+        if is_unrar_free:
+            self._cleanup_junk_files()
 
         # Build watching data from extracted files
+        self._add_extracted_to_watching_data(watching_data)
+
+        self._update_extraction_progress("Complete", self._files_extracted_count, self._total_files_to_extract, force=True)
+        return bool(strip_prefix)
+    
+    def _add_extracted_to_watching_data(self, watching_data: Dict):
+        """Add extracted files on disk (excluding archives and junk) to the watching data."""
         for dirpath, _, filenames in os.walk(self.download_dir):
             for fname in filenames:
-                if fname.endswith('.url') or fname.endswith('.rar') or fname.endswith('.zip') or '_CommonRedist' in dirpath:
+                if fname.endswith('.rar') or fname.endswith('.zip'):
                     continue
                 full_path = os.path.join(dirpath, fname)
                 key = os.path.relpath(full_path, self.download_dir).replace('\\', '/')
-                if key not in watching_data:
+                if key not in watching_data and not self.extraction_filter.is_excluded(key):
                     watching_data[key] = {"size": os.path.getsize(full_path)}
-
-        self._update_extraction_progress("Complete", self._files_extracted_count, self._total_files_to_extract, force=True)
     
     def _extract_rar_with_library(self, archive_path: str, watching_data: Dict):
         """Extract a RAR file using Python unrar library (Windows with bundled DLL)."""
@@ -1460,9 +1707,9 @@ class RobustDownloader:
             pass
         
         with rarfile.RarFile(archive_path, 'r') as rar_ref:
-            # Filter members to extract (exclude .url and _CommonRedist)
+            # Filter members to extract (exclusion rules from settings)
             rar_files = [info for info in rar_ref.infolist() 
-                        if not info.filename.endswith('.url') and '_CommonRedist' not in info.filename]
+                        if not self.extraction_filter.is_excluded(info.filename)]
             
             logging.info(f"[RobustDownloader] Extracting {len(rar_files)} files from RAR")
             
@@ -1472,7 +1719,7 @@ class RobustDownloader:
             
             def extract_thread():
                 try:
-                    rar_ref.extractall(self.download_dir)
+                    rar_ref.extractall(self.download_dir, members=[info.filename for info in rar_files])
                 except Exception as e:
                     extraction_error.append(e)
                 finally:
@@ -1568,38 +1815,14 @@ class RobustDownloader:
                 logging.warning(f"[RobustDownloader] Extracted count ({self._files_extracted_count}) exceeds total ({self._total_files_to_extract}), capping")
                 self._files_extracted_count = self._total_files_to_extract
         
-        # Clean up unwanted files (.url and _CommonRedist)
-        for root, dirs, files_in_dir in os.walk(self.download_dir):
-            if '_CommonRedist' in root:
-                try:
-                    shutil.rmtree(root)
-                    logging.info(f"[RobustDownloader] Removed _CommonRedist: {root}")
-                except Exception as e:
-                    logging.warning(f"[RobustDownloader] Could not remove _CommonRedist: {e}")
-                continue
-            
-            for fname in files_in_dir:
-                if fname.endswith('.url'):
-                    try:
-                        os.remove(os.path.join(root, fname))
-                    except Exception:
-                        pass
-        
         # Build watching data from extracted files
-        for dirpath, _, filenames in os.walk(self.download_dir):
-            for fname in filenames:
-                if fname.endswith('.url') or fname.endswith('.rar') or fname.endswith('.zip') or '_CommonRedist' in dirpath:
-                    continue
-                full_path = os.path.join(dirpath, fname)
-                key = os.path.relpath(full_path, self.download_dir).replace('\\', '/')
-                if key not in watching_data:
-                    watching_data[key] = {"size": os.path.getsize(full_path)}
+        self._add_extracted_to_watching_data(watching_data)
         
         self._update_extraction_progress("Complete", self._files_extracted_count, self._total_files_to_extract, force=True)
     
-    def _flatten_directories(self):
-        """Flatten nested directories that should be at root level."""
-        protected_files = {
+    def _get_protected_files(self) -> set:
+        """Root-level files that flattening must never overwrite."""
+        return {
             f"{sanitize_folder_name(self.game)}.ascendara.json",
             "filemap.ascendara.json",
             "game.ascendara.json",
@@ -1607,6 +1830,66 @@ class RobustDownloader:
             "header.png",
             "header.webp"
         }
+    
+    def _get_flatten_reason(self, dir_name: str) -> str:
+        """Return why a top-level directory should be flattened, or "" if it should not."""
+        subdir_name = dir_name.lower()
+        game_lower = self.game.lower()
+        # Get first meaningful word (strip punctuation)
+        first_word = ''.join(c for c in game_lower.split()[0] if c.isalnum()) if game_lower else ""
+        # Normalize subdir name for comparison
+        subdir_normalized = subdir_name.replace('-', ' ').replace('_', ' ').replace('.', ' ')
+        
+        if dir_name == sanitize_folder_name(self.game):
+            return "game-named dir"
+        if 'steamrip' in subdir_name:
+            return "contains 'steamrip'"
+        if game_lower.replace(' ', '-').replace(':', '') in subdir_name.replace(' ', '-').replace(':', ''):
+            return "matches game name pattern"
+        if first_word and len(first_word) >= 3 and first_word in subdir_normalized:
+            return f"contains first word '{first_word}'"
+        return ""
+    
+    def _get_wrapper_prefix(self, member_names) -> Optional[str]:
+        """Return the single top-level folder of an archive that flattening would remove.
+        
+        Extracting with this prefix stripped writes files straight into their final
+        location, so the post-extraction flatten pass is not needed.
+        """
+        roots = set()
+        for name in member_names:
+            parts = name.replace('\\', '/').split('/', 1)
+            if len(parts) < 2 or not parts[1]:
+                return None
+            roots.add(parts[0])
+            if len(roots) > 1:
+                return None
+        if not roots:
+            return None
+        
+        root = roots.pop()
+        if root in ('', '.', '..') or root.lower() in self.extraction_filter.folder_names or root.endswith('.ascendara'):
+            return None
+        reason = self._get_flatten_reason(root)
+        if reason:
+            logging.info(f"[RobustDownloader] Stripping archive wrapper '{root}' at extraction ({reason})")
+            return root
+        
+        # A lone folder is flattened only when nothing else is in the download directory
+        protected_files = self._get_protected_files()
+        skip_extensions = {'.rar', '.zip', '.7z', '.part', '.tmp', '.download'}
+        for item in os.listdir(self.download_dir):
+            if item in protected_files or item.endswith('.ascendara.json') or item == '.ascendara_backup':
+                continue
+            if os.path.splitext(item)[1].lower() in skip_extensions:
+                continue
+            return None
+        logging.info(f"[RobustDownloader] Stripping archive wrapper '{root}' at extraction (single root folder)")
+        return root
+    
+    def _flatten_directories(self):
+        """Flatten nested directories that should be at root level."""
+        protected_files = self._get_protected_files()
         
         nested_dirs_to_check = []
         
@@ -1620,34 +1903,15 @@ class RobustDownloader:
         subdirs = []
         for item in os.listdir(self.download_dir):
             item_path = os.path.join(self.download_dir, item)
-            if os.path.isdir(item_path) and not item.endswith('.ascendara') and item != '_CommonRedist':
+            if os.path.isdir(item_path) and not item.endswith('.ascendara') and item.lower() not in self.extraction_filter.folder_names:
                 subdirs.append(item_path)
         
         logging.info(f"[RobustDownloader] Found {len(subdirs)} subdirectories")
         
         # Also check for SteamRIP-style directories (game name with -SteamRIP.com suffix)
         for subdir in subdirs:
-            subdir_name = os.path.basename(subdir).lower()
-            game_lower = self.game.lower()
-            # Get first meaningful word (strip punctuation)
-            first_word = ''.join(c for c in game_lower.split()[0] if c.isalnum()) if game_lower else ""
-            # Normalize subdir name for comparison
-            subdir_normalized = subdir_name.replace('-', ' ').replace('_', ' ').replace('.', ' ')
-            
-            should_flatten = False
-            reason = ""
-            
-            if 'steamrip' in subdir_name:
-                should_flatten = True
-                reason = "contains 'steamrip'"
-            elif game_lower.replace(' ', '-').replace(':', '') in subdir_name.replace(' ', '-').replace(':', ''):
-                should_flatten = True
-                reason = "matches game name pattern"
-            elif first_word and len(first_word) >= 3 and first_word in subdir_normalized:
-                should_flatten = True
-                reason = f"contains first word '{first_word}'"
-            
-            if should_flatten and subdir not in nested_dirs_to_check:
+            reason = self._get_flatten_reason(os.path.basename(subdir))
+            if reason and subdir not in nested_dirs_to_check:
                 nested_dirs_to_check.append(subdir)
                 logging.info(f"[RobustDownloader] Found dir to flatten: {subdir} ({reason})")
         
@@ -1705,23 +1969,24 @@ class RobustDownloader:
                     pass
     
     def _cleanup_junk_files(self):
-        """Remove .url files and _CommonRedist folders."""
+        """Remove files and folders matching the extraction exclusion rules."""
         for root, dirs, files in os.walk(self.download_dir, topdown=False):
             for fname in files:
-                if fname.endswith('.url'):
-                    file_path = os.path.join(root, fname)
+                file_path = os.path.join(root, fname)
+                rel_path = os.path.relpath(file_path, self.download_dir)
+                if self.extraction_filter.is_excluded(rel_path):
                     try:
                         os.remove(file_path)
-                        logging.info(f"[RobustDownloader] Deleted .url: {file_path}")
+                        logging.info(f"[RobustDownloader] Deleted junk file: {file_path}")
                     except Exception:
                         pass
             
             for d in dirs:
-                if d.lower() == '_commonredist':
+                if d.lower() in self.extraction_filter.folder_names:
                     dir_path = os.path.join(root, d)
                     try:
                         shutil.rmtree(dir_path)
-                        logging.info(f"[RobustDownloader] Deleted _CommonRedist: {dir_path}")
+                        logging.info(f"[RobustDownloader] Deleted junk folder: {dir_path}")
                     except Exception:
                         pass
     
@@ -1808,10 +2073,10 @@ class RobustDownloader:
             
             logging.info(f"[RobustDownloader] Verification complete: {verified_count} files OK, {len(verify_errors)} errors")
             
-            # Ensure verifying state shows for at least 1 second in the UI
+            # Ensure verifying state shows for at least a moment in the UI
             elapsed = time.time() - verify_start_time
-            if elapsed < 1.0:
-                time.sleep(1.0 - elapsed)
+            if elapsed < self.VERIFY_MIN_DISPLAY_TIME:
+                time.sleep(self.VERIFY_MIN_DISPLAY_TIME - elapsed)
             
             self.game_info["downloadingData"]["verifying"] = False
             if verify_errors:
@@ -1908,18 +2173,47 @@ class RobustDownloader:
                 game_name_lower = self.game.lower()
                 
                 # Skip common installer/uninstaller/setup files
+                # Crash tools are matched by phrase, "crash" alone would drop Crash Bandicoot or Crashlands
                 skip_keywords = ['unins', 'uninstall', 'setup', 'installer', 'redist', 'vcredist', 
                                 'directx', 'dotnet', 'prerequisite', 'launcher', 'updater', 
-                                'crash', 'report', 'config', 'settings', 'easyanticheat', 
-                                'battleye', 'steam_api']
+                                'crashhandler', 'crash_handler', 'crashpad', 'crashsender', 'report',
+                                'config', 'settings', 'easyanticheat', 'battleye', 'steam_api']
+                version_skip_keywords = ['uninstall', 'setup', 'installer', 'redistributable',
+                                         'crash report', 'crashreport', 'crash handler', 'crashhandler',
+                                         'crashpad', 'bug report', 'updater', 'directx', 'anticheat']
                 if any(keyword in exe_name_lower for keyword in skip_keywords):
                     logging.debug(f"[RobustDownloader] Skipping {exe['name']} (installer/utility)")
                     continue
                 
-                # Exact match with text file reference
-                if exe_from_text and exe['name'].lower() == exe_from_text.lower():
+                # Inspect PE headers (only the first few KB are read)
+                pe = read_pe_info(exe['path'])
+                if pe is None:
+                    logging.debug(f"[RobustDownloader] Skipping {exe['name']} (not a valid PE image)")
+                    continue
+                if pe['is_dll']:
+                    logging.debug(f"[RobustDownloader] Skipping {exe['name']} (dll)")
+                    continue
+                
+                # Exact match with text file reference, the release names its own executable
+                # so the header checks below do not rule it out
+                named_in_text = bool(exe_from_text) and exe_name_lower == exe_from_text.lower()
+                if named_in_text:
                     score += 1000
                     logging.info(f"[RobustDownloader] Exact match with text file: {exe['name']}")
+                else:
+                    if pe['installer']:
+                        logging.debug(f"[RobustDownloader] Skipping {exe['name']} (installer: {pe['installer']})")
+                        continue
+                    
+                    version_text = ' '.join(pe['version'].values()).lower()
+                    if any(keyword in version_text for keyword in version_skip_keywords):
+                        logging.debug(f"[RobustDownloader] Skipping {exe['name']} (version info: {version_text[:60]})")
+                        continue
+                    
+                    # Self-extracting archives are usually installers, but fused LÖVE/NW.js
+                    # games also carry a zip, so this only costs points
+                    if pe['sfx']:
+                        score -= 150
                 
                 # Partial match with text file reference
                 if exe_from_text and exe_from_text.lower() in exe_name_lower:
@@ -1944,6 +2238,29 @@ class RobustDownloader:
                 elif depth == 1:
                     score += 50
                 
+                # Version resource names the product (e.g. ProductName matches the game)
+                product_text = ' '.join(
+                    pe['version'].get(key, '') for key in ('ProductName', 'FileDescription')
+                ).lower()
+                if product_text:
+                    product_words = set(re.findall(r'\w+', product_text))
+                    if sanitized_game and sanitized_game in product_text:
+                        score += 200
+                    elif game_words & product_words:
+                        score += len(game_words & product_words) * 40
+                
+                original_name = pe['version'].get('OriginalFilename', '').lower()
+                if original_name and original_name == exe_name_lower:
+                    score += 15
+                
+                # Games are GUI applications; prefer the 64-bit build when both exist
+                if pe['subsystem'] == 'gui':
+                    score += 40
+                elif pe['subsystem'] == 'console':
+                    score -= 40
+                if pe['machine'] == 'x64':
+                    score += 20
+                
                 # Prefer larger files (likely the main game executable)
                 if exe['size'] > 10 * 1024 * 1024:  # > 10 MB
                     score += 30
@@ -1958,7 +2275,8 @@ class RobustDownloader:
                         score += 20
                         break
                 
-                logging.debug(f"[RobustDownloader] {exe['name']}: score={score}, size={exe['size']}, depth={depth}")
+                logging.debug(f"[RobustDownloader] {exe['name']}: score={score}, size={exe['size']}, depth={depth}, "
+                              f"machine={pe['machine']}, subsystem={pe['subsystem']}, sfx={pe['sfx']}")
                 
                 if score > best_score:
                     best_score = score
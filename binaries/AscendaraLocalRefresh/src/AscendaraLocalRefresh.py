@@ -16,12 +16,22 @@ import atexit
 import shutil
 import signal
 import zipfile
+import zlib
 import time
 import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 
 from steamrip_scraper import SteamRIPScraper
 from goggames_scraper import GOGGamesScraper
-from utils import get_blacklist_ids, send_notification
+from image_cache import ImageCache
+from image_processor import ImageProcessor
+from index_merge import IndexMerger
+from checkpoint import RefreshJournal
+from index_store import IndexStore
+from index_writer import IndexWriter, SHARD_SIZE, iter_shard_entries, read_shard_header, rebuild_from_index
+from politeness import merge_profiles, parse_profiles
+from utils import get_blacklist_ids, get_refresh_profiles, send_notification
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -34,13 +44,26 @@ AVAILABLE_SCRAPERS = {
     # 'dodi': DodiScraper,
 }
 
+# Fields scrapers may still change after the index is published, see collect_late_updates()
+LATE_UPDATE_FIELDS = ("weight",)
+
 
 class RefreshProgress:
-    """Track and persist refresh progress to a JSON file"""
+    """
+    Track refresh progress and persist it to a JSON file.
+    
+    Counters only change in memory, a background thread writes the file at most
+    FLUSH_HZ times per second when something changed, so worker threads never wait
+    on disk. Status, phase and error changes are written immediately.
+    """
+    
+    FLUSH_HZ = 4
+    HEARTBEAT_SECONDS = 5
     
     def __init__(self, output_directory):
         self.progress_file = os.path.join(output_directory, "progress.json")
         self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
         self.status = "initializing"
         self.phase = "starting"
         self.total_posts = 0
@@ -51,6 +74,9 @@ class RefreshProgress:
         self.errors = []
         self.start_time = time.time()
         self.last_successful_timestamp = None
+        self.dirty = False
+        self.last_write = 0.0
+        self.stop_event = threading.Event()
         try:
             if os.path.exists(self.progress_file):
                 with open(self.progress_file, 'r', encoding='utf-8') as f:
@@ -59,35 +85,57 @@ class RefreshProgress:
         except Exception as e:
             logging.debug(f"Could not load previous progress: {e}")
         self._update_progress()
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True, name="ProgressFlusher")
+        self.flusher.start()
+    
+    def _snapshot(self):
+        elapsed = time.time() - self.start_time
+        raw_progress = self.processed_posts / max(1, self.total_posts)
+        capped_progress = min(raw_progress, 1.0)
+        
+        return {
+            "status": self.status,
+            "phase": self.phase,
+            "totalPosts": self.total_posts,
+            "processedPosts": self.processed_posts,
+            "totalImages": self.total_images,
+            "downloadedImages": self.downloaded_images,
+            "currentGame": self.current_game,
+            "progress": round(capped_progress, 4),
+            "elapsedSeconds": round(elapsed, 1),
+            "errors": self.errors[-10:],
+            "timestamp": time.time(),
+            "waitingForCookie": self.phase == "waiting_for_cookie",
+            "lastSuccessfulTimestamp": self.last_successful_timestamp
+        }
     
     def _update_progress(self):
-        """Write progress to file with thread safety"""
-        with self.lock:
-            elapsed = time.time() - self.start_time
-            raw_progress = self.processed_posts / max(1, self.total_posts)
-            capped_progress = min(raw_progress, 1.0)
-            
-            progress_data = {
-                "status": self.status,
-                "phase": self.phase,
-                "totalPosts": self.total_posts,
-                "processedPosts": self.processed_posts,
-                "totalImages": self.total_images,
-                "downloadedImages": self.downloaded_images,
-                "currentGame": self.current_game,
-                "progress": round(capped_progress, 4),
-                "elapsedSeconds": round(elapsed, 1),
-                "errors": self.errors[-10:],
-                "timestamp": time.time(),
-                "waitingForCookie": self.phase == "waiting_for_cookie",
-                "lastSuccessfulTimestamp": self.last_successful_timestamp
-            }
+        """Write progress to file now"""
+        with self.write_lock:
+            with self.lock:
+                progress_data = self._snapshot()
+                self.dirty = False
+            self.last_write = time.monotonic()
+            tmp_file = self.progress_file + ".tmp"
             try:
-                with open(self.progress_file, 'w', encoding='utf-8') as f:
+                # Readers poll the file, replacing it keeps them from seeing a half written one
+                with open(tmp_file, 'w', encoding='utf-8') as f:
                     json.dump(progress_data, f, indent=2)
+                try:
+                    os.replace(tmp_file, self.progress_file)
+                except PermissionError:
+                    # Windows refuses the replace while a reader has the file open
+                    with open(self.progress_file, 'w', encoding='utf-8') as f:
+                        json.dump(progress_data, f, indent=2)
+                    os.remove(tmp_file)
             except Exception as e:
                 logging.error(f"Error writing progress: {e}")
     
+    def _flush_loop(self):
+        while not self.stop_event.wait(1 / self.FLUSH_HZ):
+            if self.dirty or time.monotonic() - self.last_write >= self.HEARTBEAT_SECONDS:
+                self._update_progress()
+    
     def set_status(self, status):
         self.status = status
         self._update_progress()
@@ -97,46 +145,61 @@ class RefreshProgress:
         self._update_progress()
     
     def set_total_posts(self, total):
-        self.total_posts = total
-        self.processed_posts = 0
+        with self.lock:
+            self.total_posts = total
+            self.processed_posts = 0
         self._update_progress()
     
-    def increment_processed(self):
-        self.processed_posts += 1
+    def adjust_posts(self, total_delta, processed_delta=0):
+        """Change the post counts by a delta, for sources that report their own totals"""
+        with self.lock:
+            self.total_posts += total_delta
+            self.processed_posts += processed_delta
         self._update_progress()
     
+    def increment_processed(self):
+        with self.lock:
+            self.processed_posts += 1
+            self.dirty = True
+    
     def set_current_game(self, game_name):
         self.current_game = game_name
-        self._update_progress()
+        self.dirty = True
     
     def update(self, message=""):
         if message:
             self.current_game = message
-        self._update_progress()
+        self.dirty = True
     
     def increment_images(self):
-        self.total_images += 1
+        with self.lock:
+            self.total_images += 1
+            self.dirty = True
     
     def increment_downloaded_images(self):
-        self.downloaded_images += 1
-        self._update_progress()
+        with self.lock:
+            self.downloaded_images += 1
+            self.dirty = True
     
     def add_error(self, error_msg):
-        self.errors.append({
-            "message": error_msg,
-            "timestamp": time.time()
-        })
+        with self.lock:
+            self.errors.append({
+                "message": error_msg,
+                "timestamp": time.time()
+            })
         self._update_progress()
     
     def clear_errors_and_set(self, error_msg):
         """Clear all errors and set a single error message"""
-        self.errors = [{
-            "message": error_msg,
-            "timestamp": time.time()
-        }]
+        with self.lock:
+            self.errors = [{
+                "message": error_msg,
+                "timestamp": time.time()
+            }]
         self._update_progress()
     
     def complete(self, success=True):
+        self.stop_event.set()
         self.status = "completed" if success else "failed"
         self.phase = "done"
         if success:
@@ -144,6 +207,79 @@ class RefreshProgress:
         self._update_progress()
 
 
+class SourceProgress:
+    """
+    Progress of one source in a multi-source refresh. Every source sets its own post
+    total, the shared RefreshProgress shows the sum over all sources.
+    """
+    
+    def __init__(self, progress, source_name):
+        self.progress = progress
+        self.source_name = source_name
+        self.lock = threading.Lock()
+        self.total_posts = 0
+        self.processed_posts = 0
+    
+    def set_total_posts(self, total):
+        with self.lock:
+            total_delta = total - self.total_posts
+            processed_delta = -self.processed_posts
+            self.total_posts = total
+            self.processed_posts = 0
+        self.progress.adjust_posts(total_delta, processed_delta)
+    
+    def increment_processed(self):
+        with self.lock:
+            self.processed_posts += 1
+        self.progress.increment_processed()
+    
+    def add_error(self, error_msg):
+        self.progress.add_error(f"{self.source_name}: {error_msg}")
+    
+    def __getattr__(self, name):
+        return getattr(self.progress, name)
+
+
+def parse_sources(value):
+    """Parse --source, a source name or several separated by commas"""
+    sources = []
+    for name in value.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in AVAILABLE_SCRAPERS:
+            raise argparse.ArgumentTypeError(
+                f"unknown source '{name}' (choose from {', '.join(AVAILABLE_SCRAPERS)})"
+            )
+        if name not in sources:
+            sources.append(name)
+    if not sources:
+        raise argparse.ArgumentTypeError("no source given")
+    return sources
+
+
+def parse_profile(value):
+    """Parse --profile, a JSON file or inline JSON with refresh profiles by source"""
+    try:
+        if os.path.isfile(value):
+            with open(value, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return json.loads(value)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"not a readable profile file or JSON object ({e})")
+
+
+def load_refresh_profiles(profile_arg):
+    """Profiles from the settings file, --profile takes precedence lane by lane"""
+    profiles = parse_profiles(get_refresh_profiles(), "settings")
+    if profile_arg is not None:
+        profiles = merge_profiles(profiles, parse_profiles(profile_arg, "--profile"))
+    for source in profiles:
+        if source not in AVAILABLE_SCRAPERS:
+            logging.warning(f"Ignoring refresh profile of unknown source '{source}'")
+    return profiles
+
+
 def _launch_notification(title, message):
     """Launch notification helper to show a system notification if enabled."""
     try:
@@ -185,98 +321,175 @@ def launch_crash_reporter(error_code, error_message):
         launch_crash_reporter._registered = True
 
 
+def load_previous_index(games_file, source_name, shards_dir=None):
+    """Load the current index for an incremental refresh.
+    Returns (games, refreshed_at), or (None, None) if the index is missing or from another source.
+    A shard layout is read instead of the index file when there is one, its header is checked
+    before any entry is parsed."""
+    try:
+        header = read_shard_header(shards_dir) if shards_dir else None
+        if header:
+            metadata = header.get("metadata", {})
+            if metadata.get("source") != source_name.upper():
+                logging.info(f"Existing index is not a {source_name} index, running a full refresh")
+                return None, None
+            return list(iter_shard_entries(shards_dir, header)), metadata.get("refreshedAt")
+        with open(games_file, 'r', encoding='utf-8') as f:
+            index_data = json.load(f)
+        metadata = index_data.get("metadata", {})
+        games = index_data.get("games")
+        if metadata.get("source") != source_name.upper() or not isinstance(games, list):
+            logging.info(f"Existing index is not a {source_name} index, running a full refresh")
+            return None, None
+        return games, metadata.get("refreshedAt")
+    except FileNotFoundError:
+        return None, None
+    except Exception as e:
+        logging.warning(f"Could not load existing index: {e}")
+        return None, None
+
+
+def link_existing_images(game_data, imgs_dir, imgs_incoming_dir):
+    """Carry images of unchanged games into the incoming folder without downloading them again"""
+    linked = 0
+    for game in game_data:
+        img_id = game.get("imgID")
+        if not img_id:
+            continue
+        src = os.path.join(imgs_dir, f"{img_id}.jpg")
+        dst = os.path.join(imgs_incoming_dir, f"{img_id}.jpg")
+        if os.path.exists(dst) or not os.path.exists(src):
+            continue
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+        linked += 1
+    logging.info(f"Reused {linked} existing images")
+
+
+def save_source_snapshot(snapshot_file, source_name, game_data, refreshed_at):
+    """Keep the unmerged games of one source for the next incremental multi-source refresh.
+    The file has the index layout, so load_previous_index() reads it back."""
+    try:
+        os.makedirs(os.path.dirname(snapshot_file), exist_ok=True)
+        snapshot = {
+            "games": game_data,
+            "metadata": {"source": source_name.upper(), "games": str(len(game_data)), "refreshedAt": refreshed_at}
+        }
+        tmp_file = snapshot_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, snapshot_file)
+    except Exception as e:
+        # Without a snapshot the next incremental refresh of this source runs a full scrape
+        logging.warning(f"Failed to save {source_name} snapshot: {e}")
+
+
+def _zip_member_path(name):
+    """Relative path of a zip member below the extraction root, None for unsafe or empty names"""
+    name = os.path.splitdrive(name.replace('\\', '/'))[1]
+    parts = [part for part in name.split('/') if part not in ('', '.', '..')]
+    return os.path.join(*parts) if parts else None
+
+
+def _file_crc32(path, chunk_size=1024 * 1024):
+    crc = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
 def extract_shared_index(zip_path, output_dir):
-    """Extract a downloaded shared index zip file"""
+    """
+    Extract a downloaded shared index zip file.
+    
+    The zip is unpacked into a new version of the index store. Members whose size and
+    CRC match the file in the live version are hard linked instead of extracted, so an
+    update mostly writes the images that changed. The new version goes live once it is
+    complete, the live one is never touched.
+    """
     progress = RefreshProgress(output_dir)
     progress.set_status("running")
     progress.set_phase("extracting")
     
+    store = IndexStore(output_dir)
+    version = None
+    
     try:
         logging.info(f"Extracting shared index from {zip_path} to {output_dir}")
         
-        games_file = os.path.join(output_dir, "ascendara_games.json")
-        imgs_dir = os.path.join(output_dir, "imgs")
-        games_backup = os.path.join(output_dir, "ascendara_games_backup.json")
-        imgs_backup = os.path.join(output_dir, "imgs_backup")
-        
-        game_count = 0
-        if os.path.exists(games_file):
-            try:
-                with open(games_file, 'r', encoding='utf-8') as f:
-                    games_data = json.load(f)
-                    game_count = len(games_data)
-                    logging.info(f"Current game count: {game_count}")
-            except Exception as e:
-                logging.warning(f"Could not read game count: {e}")
-            
-            shutil.copy2(games_file, games_backup)
-            logging.info("Backed up ascendara_games.json")
-        
-        if os.path.exists(imgs_dir):
-            if os.path.exists(imgs_backup):
-                shutil.rmtree(imgs_backup)
-            
-            total_img_files = sum(len(files) for _, _, files in os.walk(imgs_dir))
-            logging.info(f"Found {total_img_files} image files")
-            
-            if game_count > 0 and total_img_files > game_count:
-                logging.warning(f"Image count ({total_img_files}) exceeds game count ({game_count})")
-                logging.warning("Deleting all images to allow fresh download")
-                progress.set_current_game("Cleaning up excess images...")
-                shutil.rmtree(imgs_dir)
-                logging.info("Deleted imgs directory - will download fresh images")
-            else:
-                logging.info(f"Backing up {total_img_files} image files...")
-                progress.set_total_posts(total_img_files)
-                progress.set_current_game(f"Backing up images (0/{total_img_files})...")
-                
-                os.makedirs(imgs_backup, exist_ok=True)
-                copied_files = 0
-                for root, dirs, files in os.walk(imgs_dir):
-                    rel_path = os.path.relpath(root, imgs_dir)
-                    dest_dir = os.path.join(imgs_backup, rel_path) if rel_path != '.' else imgs_backup
-                    os.makedirs(dest_dir, exist_ok=True)
-                    
-                    for file in files:
-                        src_file = os.path.join(root, file)
-                        dst_file = os.path.join(dest_dir, file)
-                        shutil.copy2(src_file, dst_file)
-                        copied_files += 1
-                        
-                        if copied_files % 50 == 0 or copied_files == total_img_files:
-                            progress.processed_posts = copied_files
-                            progress.set_current_game(f"Backing up images ({copied_files}/{total_img_files})...")
-                
-                logging.info("Backed up imgs directory")
+        store.discard_unpublished()
+        version = store.stage()
+        version_dir = store.version_path(version)
         
+        extracted = 0
+        reused = 0
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            total_files = len(zip_ref.namelist())
+            members = zip_ref.infolist()
+            total_files = len(members)
             logging.info(f"Extracting {total_files} files...")
             progress.set_total_posts(total_files)
             
-            for i, file in enumerate(zip_ref.namelist()):
-                zip_ref.extract(file, output_dir)
-                progress.processed_posts += 1
+            for i, info in enumerate(members):
+                rel_path = _zip_member_path(info.filename)
+                progress.increment_processed()
+                if rel_path is None:
+                    continue
+                staged = os.path.join(version_dir, rel_path)
+                if info.is_dir():
+                    os.makedirs(staged, exist_ok=True)
+                    continue
+                os.makedirs(os.path.dirname(staged), exist_ok=True)
                 
-                if i % 10 == 0 or i == total_files - 1:
-                    progress_percent = ((i + 1) / total_files) * 100
+                # The top level paths lead into the live version
+                current = os.path.join(output_dir, rel_path)
+                if (os.path.isfile(current) and os.path.getsize(current) == info.file_size
+                        and _file_crc32(current) == info.CRC):
+                    try:
+                        os.link(current, staged)
+                    except OSError:
+                        shutil.copy2(current, staged)
+                    reused += 1
+                else:
+                    with zip_ref.open(info) as source, open(staged, 'wb') as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+                    extracted += 1
+                
+                if i % 100 == 0 or i == total_files - 1:
                     progress.set_current_game(f"Extracting: {i + 1}/{total_files} files")
         
+        logging.info(f"Extracted {extracted} changed files, reused {reused} unchanged files")
+        
+        # Shared zips carry no shards or database, build them for the new version if the live one has them
+        games_file = os.path.join(version_dir, "ascendara_games.json")
+        shards_dir = os.path.join(version_dir, "shards")
+        db_file = os.path.join(version_dir, "ascendara_games.db")
+        rebuild_shards_dir = shards_dir if os.path.exists(os.path.join(output_dir, "shards")) else None
+        rebuild_db_file = db_file if os.path.exists(os.path.join(output_dir, "ascendara_games.db")) else None
+        if rebuild_shards_dir or rebuild_db_file:
+            try:
+                rebuilt_games = rebuild_from_index(games_file, rebuild_shards_dir, rebuild_db_file)
+                logging.info(f"Rebuilt index shards/database for {rebuilt_games} games")
+            except Exception as e:
+                logging.warning(f"Could not rebuild index shards/database, leaving them out: {e}")
+                shutil.rmtree(shards_dir, ignore_errors=True)
+                if os.path.exists(db_file):
+                    os.remove(db_file)
+        
+        progress.set_current_game("Publishing the new index...")
+        store.publish(version)
+        store.collect_garbage()
+        
         try:
             os.remove(zip_path)
             logging.info("Removed zip file")
         except Exception as e:
             logging.warning(f"Could not remove zip file: {e}")
         
-        try:
-            if os.path.exists(games_backup):
-                os.remove(games_backup)
-            if os.path.exists(imgs_backup):
-                shutil.rmtree(imgs_backup)
-            logging.info("Cleaned up backup files")
-        except Exception as e:
-            logging.warning(f"Could not clean up backups: {e}")
-        
         progress.set_current_game("Extraction complete")
         progress.complete(success=True)
         logging.info("Shared index extraction completed successfully")
@@ -287,16 +500,12 @@ def extract_shared_index(zip_path, output_dir):
         progress.complete(success=False)
         
         try:
-            if os.path.exists(games_backup):
-                shutil.copy2(games_backup, games_file)
-                logging.info("Restored ascendara_games.json from backup")
-            if os.path.exists(imgs_backup):
-                if os.path.exists(imgs_dir):
-                    shutil.rmtree(imgs_dir)
-                shutil.copytree(imgs_backup, imgs_dir)
-                logging.info("Restored imgs directory from backup")
+            if version is not None:
+                if store.current_version() == version:
+                    store.rollback()
+                store.discard(version)
         except Exception as restore_err:
-            logging.error(f"Failed to restore from backup: {restore_err}")
+            logging.error(f"Failed to restore the previous index: {restore_err}")
         
         sys.exit(1)
 
@@ -312,9 +521,10 @@ def main():
     )
     parser.add_argument(
         '--source', '-s',
-        default='steamrip',
-        choices=list(AVAILABLE_SCRAPERS.keys()),
-        help='Source to scrape (default: steamrip)'
+        default=['steamrip'],
+        type=parse_sources,
+        help=f'Source to scrape ({", ".join(AVAILABLE_SCRAPERS)}), several separated by commas are '
+             'scraped at the same time and merged into one index (default: steamrip)'
     )
     parser.add_argument(
         '--cookie', '-c',
@@ -326,7 +536,13 @@ def main():
         '--workers', '-w',
         type=int,
         default=8,
-        help='Number of worker threads (default: 8)'
+        help='Number of I/O worker threads, e.g. cover downloads (default: 8)'
+    )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=None,
+        help='Number of processes parsing post pages, 0 parses in the I/O threads (default: CPU count - 1, max 4)'
     )
     parser.add_argument(
         '--per-page', '-p',
@@ -334,6 +550,12 @@ def main():
         default=100,
         help='Number of posts to fetch per page (default: 100, max: 100)'
     )
+    parser.add_argument(
+        '--page-window',
+        type=int,
+        default=3,
+        help='Number of post pages fetched ahead while the current page is processed (default: 3)'
+    )
     parser.add_argument(
         '--skip-views',
         action='store_true',
@@ -350,6 +572,50 @@ def main():
         default=None,
         help='Custom User-Agent string (for Firefox/Opera cookie compatibility)'
     )
+    parser.add_argument(
+        '--skip-image-processing',
+        action='store_true',
+        help='Keep covers as downloaded instead of normalising them and building thumbnails'
+    )
+    parser.add_argument(
+        '--sharded',
+        action='store_true',
+        help='Also write the index as NDJSON shards with a small header file (shards/index.json)'
+    )
+    parser.add_argument(
+        '--shard-size',
+        type=int,
+        default=SHARD_SIZE,
+        help=f'Games per index shard (default: {SHARD_SIZE})'
+    )
+    parser.add_argument(
+        '--sqlite',
+        action='store_true',
+        help='Also write a searchable SQLite copy of the index (ascendara_games.db)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only fetch games changed since the last refresh and merge them into the current index'
+    )
+    parser.add_argument(
+        '--profile',
+        type=parse_profile,
+        default=None,
+        help='Request limits per source and lane as a JSON file or inline JSON, e.g. '
+             '\'{"steamrip": {"pages": {"rate": 1, "concurrency": 2}}}\'. Applied over the '
+             'localRefreshProfiles setting'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted refresh from its checkpoint instead of starting over'
+    )
+    parser.add_argument(
+        '--rollback',
+        action='store_true',
+        help='Switch the index back to the version that was live before the last refresh'
+    )
     parser.add_argument(
         '--extract-shared-index',
         action='store_true',
@@ -370,92 +636,99 @@ def main():
         extract_shared_index(args.zip_path, args.output)
         sys.exit(0)
     
+    if args.rollback:
+        sys.exit(0 if IndexStore(args.output).rollback() else 1)
+    
     logging.info("=== Starting Ascendara Local Refresh ===")
     logging.info(f"Output directory: {args.output}")
-    logging.info(f"Source: {args.source}")
+    logging.info(f"Source: {', '.join(args.source)}")
     
     # Setup directories
     output_dir = args.output
+    # Top level paths link into the live version of the index store
     imgs_dir = os.path.join(output_dir, "imgs")
     games_file = os.path.join(output_dir, "ascendara_games.json")
     imgs_incoming_dir = os.path.join(output_dir, "imgs_incoming")
     games_incoming_file = os.path.join(output_dir, "ascendara_games_incoming.json")
+    shards_incoming_dir = os.path.join(output_dir, "shards_incoming")
+    db_incoming_file = os.path.join(output_dir, "ascendara_games_incoming.db")
+    # Left behind by releases that swapped the index through backups
     imgs_backup_dir = os.path.join(output_dir, "imgs_backup")
     games_backup_file = os.path.join(output_dir, "ascendara_games_backup.json")
+    db_backup_file = os.path.join(output_dir, "ascendara_games_backup.db")
+    shards_backup_dir = os.path.join(output_dir, "shards_backup")
+    checkpoints_dir = os.path.join(output_dir, "checkpoints")
+    store = IndexStore(output_dir)
     
     def cleanup_incoming():
         """Remove incomplete incoming data on failure"""
         try:
+            if writer:
+                writer.abort()
             if os.path.exists(imgs_incoming_dir):
                 shutil.rmtree(imgs_incoming_dir)
             if os.path.exists(games_incoming_file):
                 os.remove(games_incoming_file)
+            if os.path.exists(shards_incoming_dir):
+                shutil.rmtree(shards_incoming_dir)
+            if os.path.exists(db_incoming_file):
+                os.remove(db_incoming_file)
         except Exception as e:
             logging.warning(f"Failed to cleanup incoming: {e}")
     
-    def restore_backup():
-        """Restore from backup if swap was interrupted"""
-        restored = False
-        try:
-            if os.path.exists(imgs_backup_dir):
-                if os.path.exists(imgs_dir):
-                    shutil.rmtree(imgs_dir)
-                shutil.move(imgs_backup_dir, imgs_dir)
-                logging.info("Restored imgs folder from backup")
-                restored = True
-            if os.path.exists(games_backup_file):
-                if os.path.exists(games_file):
-                    os.remove(games_file)
-                shutil.move(games_backup_file, games_file)
-                logging.info("Restored ascendara_games.json from backup")
-                restored = True
-        except Exception as e:
-            logging.error(f"Failed to restore backup: {e}")
-        return restored
-    
-    def cleanup_backup():
-        """Remove backup files after successful swap"""
-        try:
-            if os.path.exists(imgs_backup_dir):
-                shutil.rmtree(imgs_backup_dir)
-            if os.path.exists(games_backup_file):
-                os.remove(games_backup_file)
-        except Exception as e:
-            logging.warning(f"Failed to cleanup backup: {e}")
-    
     def swap_incoming_to_current():
-        """Atomically swap incoming data to current location"""
+        """Move incoming data into a new index version and make it the live one"""
+        version = None
         try:
-            logging.info("Swapping incoming data to current...")
-            
-            if os.path.exists(imgs_dir):
-                if os.path.exists(imgs_backup_dir):
-                    shutil.rmtree(imgs_backup_dir)
-                shutil.move(imgs_dir, imgs_backup_dir)
-            
-            if os.path.exists(games_file):
-                if os.path.exists(games_backup_file):
-                    os.remove(games_backup_file)
-                shutil.copy2(games_file, games_backup_file)
-            
-            if os.path.exists(imgs_incoming_dir):
-                shutil.move(imgs_incoming_dir, imgs_dir)
-            
-            if os.path.exists(games_incoming_file):
-                if os.path.exists(games_file):
-                    os.remove(games_file)
-                shutil.move(games_incoming_file, games_file)
-            
-            cleanup_backup()
+            logging.info("Publishing incoming data...")
+            version = store.stage()
+            version_dir = store.version_path(version)
+            # Renames within the index folder, nothing is copied
+            for incoming, name in ((imgs_incoming_dir, "imgs"), (games_incoming_file, "ascendara_games.json"),
+                                   (shards_incoming_dir, "shards"), (db_incoming_file, "ascendara_games.db")):
+                if os.path.exists(incoming):
+                    os.replace(incoming, os.path.join(version_dir, name))
+            store.publish(version)
+            store.collect_garbage()
             logging.info("Swap completed successfully")
             return True
             
         except Exception as e:
-            logging.error(f"Swap failed: {e}, attempting rollback...")
-            restore_backup()
+            logging.error(f"Swap failed: {e}, keeping the current index...")
+            if version is not None:
+                try:
+                    if store.current_version() == version:
+                        store.rollback()
+                    store.discard(version)
+                except Exception as restore_err:
+                    logging.error(f"Failed to restore the previous index: {restore_err}")
             return False
     
+    def apply_late_updates():
+        """Publish fields that arrived after the swap, like view counts, as updates to the live index"""
+        try:
+            updates = {}
+            for scraper in scrapers.values():
+                for game_id, fields in scraper.collect_late_updates().items():
+                    if merger:
+                        game_id = merger.game_id_for(scraper.get_source_name(), game_id)
+                    updates.setdefault(game_id, {}).update(fields)
+            changed = {}
+            for game_id, fields in updates.items():
+                written = index_fields.get(game_id)
+                if written is not None and any(written.get(key) != value for key, value in fields.items()):
+                    changed[game_id] = fields
+            if changed:
+                logging.info(f"Publishing late results for {len(changed)} games...")
+                store.publish_updates(changed)
+        except Exception as e:
+            # The published index is complete without them, they are fetched again next run
+            logging.warning(f"Failed to apply late updates to the index: {e}")
+    
     refresh_completed_successfully = [False]
+    # Incoming index, games are written to it as the scrapers finish them
+    writer = None
+    processor = None
     
     def on_exit_cleanup():
         """Cleanup incoming data on unexpected exit if not completed successfully"""
@@ -486,6 +759,13 @@ def main():
             shutil.rmtree(imgs_backup_dir)
         if os.path.exists(games_backup_file):
             os.remove(games_backup_file)
+        for stale_dir in (shards_incoming_dir, shards_backup_dir):
+            if os.path.exists(stale_dir):
+                shutil.rmtree(stale_dir)
+        for stale_file in (db_incoming_file, db_backup_file):
+            if os.path.exists(stale_file):
+                os.remove(stale_file)
+        store.discard_unpublished()
         
         os.makedirs(imgs_incoming_dir, exist_ok=True)
         logging.info("Created incoming directories")
@@ -495,65 +775,239 @@ def main():
         launch_crash_reporter(1, str(e))
         sys.exit(1)
     
+    # Posts modified while this run is scraping are picked up by the next incremental refresh
+    refresh_started = time.time()
+    
     # Initialize progress tracking
     progress = RefreshProgress(output_dir)
     progress.set_status("running")
     progress.set_phase("initializing")
     
+    multi_source = len(args.source) > 1
+    scrapers = {}
+    merger = None
+    # The games themselves are only on disk, late updates are compared against these fields
+    index_fields = {}
+    
+    def cleanup_scrapers():
+        for scraper in scrapers.values():
+            try:
+                scraper.log_request_rates()
+                scraper.cleanup()
+            except Exception as e:
+                logging.warning(f"Failed to clean up {scraper.get_source_name()} scraper: {e}")
+            if scraper.checkpoint:
+                scraper.checkpoint.close()
+    
+    def source_snapshot_file(source_key):
+        return os.path.join(output_dir, "sources", f"{source_key}.json")
+    
+    def scrape_source(source_key, scraper, source_progress, sink=None):
+        """Scrape one source, incrementally when its previous games are known.
+        With a sink the games are passed to it as they are finished instead of being returned"""
+        if args.incremental:
+            if multi_source:
+                existing_games, refreshed_at = load_previous_index(source_snapshot_file(source_key),
+                                                                   scraper.get_source_name())
+            else:
+                existing_games, refreshed_at = load_previous_index(games_file, scraper.get_source_name(),
+                                                                   os.path.join(output_dir, "shards"))
+            refreshed_at = refreshed_at or progress.last_successful_timestamp
+            if existing_games and refreshed_at:
+                logging.info(f"Incremental refresh of {len(existing_games)} existing {scraper.get_source_name()} games")
+                game_data = scraper.scrape_updates(
+                    existing_games,
+                    refreshed_at,
+                    blacklist_ids=blacklist_ids,
+                    per_page=args.per_page,
+                    workers=args.workers,
+                    progress=source_progress,
+                    page_window=args.page_window,
+                    parse_workers=args.parse_workers
+                )
+                if game_data is not None:
+                    link_existing_images(game_data, imgs_dir, imgs_incoming_dir)
+                    if sink:
+                        # Changes are merged into the previous index, which is in memory for that anyway
+                        sink(game_data)
+                        return []
+                    return game_data
+            logging.info(f"No incremental refresh possible for {scraper.get_source_name()}, running a full refresh")
+        
+        return scraper.scrape_games(
+            blacklist_ids=blacklist_ids,
+            per_page=args.per_page,
+            workers=args.workers,
+            progress=source_progress,
+            page_window=args.page_window,
+            parse_workers=args.parse_workers,
+            sink=sink
+        )
+    
+    def write_games(games):
+        """Process the covers of finished games and append the games to the incoming index"""
+        nonlocal processor
+        if processor:
+            try:
+                # Single source batches are pages, their progress is shown as posts
+                processor.process_batch(games, imgs_incoming_dir, progress if multi_source else None)
+            except Exception as e:
+                # The raw covers are still usable, a failed pass should not fail the refresh
+                logging.warning(f"Image processing failed, keeping original covers: {e}")
+                finish_image_processing()
+        for game in games:
+            writer.write(game)
+            if game.get("gameID"):
+                index_fields[game["gameID"]] = {key: game.get(key) for key in LATE_UPDATE_FIELDS}
+    
+    def finish_image_processing():
+        """Stop the image processing pool, no further covers are processed after this"""
+        nonlocal processor
+        try:
+            processor.finish()
+        except Exception as e:
+            logging.warning(f"Could not finish image processing: {e}")
+        processor = None
+    
+    def resumed_start(started):
+        """A resumed run counts from when the interrupted one started, posts changed since are caught next time"""
+        for scraper in scrapers.values():
+            if scraper.checkpoint and scraper.checkpoint.resumed:
+                started = min(started, scraper.checkpoint.started_at)
+        return started
+    
+    def previous_source_games(source_key, scraper):
+        """Games of a source from its last successful run, used when it fails this time"""
+        previous_games, refreshed_at = load_previous_index(source_snapshot_file(source_key), scraper.get_source_name())
+        if not previous_games:
+            return None, None
+        logging.warning(f"Keeping {len(previous_games)} {scraper.get_source_name()} games from the last refresh")
+        link_existing_images(previous_games, imgs_dir, imgs_incoming_dir)
+        return previous_games, refreshed_at
+    
     try:
         # Load blacklist IDs
         blacklist_ids = get_blacklist_ids()
         
-        # Initialize the selected scraper
-        ScraperClass = AVAILABLE_SCRAPERS[args.source]
-        scraper = ScraperClass(output_dir, progress.progress_file)
+        # Scrapers of one run share the cover cache
+        image_cache = ImageCache(os.path.join(output_dir, "image_cache"))
+        source_errors = {}
+        profiles = load_refresh_profiles(args.profile)
         
-        logging.info(f"Initializing {scraper.get_source_name()} scraper...")
+        for source_key in args.source:
+            scraper = AVAILABLE_SCRAPERS[source_key](output_dir, progress.progress_file, image_cache)
+            scrapers[source_key] = scraper
+            # Finished pages are journaled so a failed or killed run can be continued with --resume
+            scraper.checkpoint = RefreshJournal(os.path.join(checkpoints_dir, f"{source_key}.ndjson"),
+                                                resume=args.resume)
+            scraper.configure_politeness(profiles.get(source_key))
+            
+            logging.info(f"Initializing {scraper.get_source_name()} scraper...")
+            
+            if not scraper.initialize(
+                cookie=args.cookie,
+                user_agent=args.user_agent,
+                skip_views=args.skip_views,
+                view_workers=args.view_workers
+            ):
+                logging.error(f"Failed to initialize {scraper.get_source_name()} scraper")
+                progress.add_error(f"Failed to initialize {scraper.get_source_name()} scraper")
+                if not multi_source:
+                    progress.complete(success=False)
+                    cleanup_incoming()
+                    sys.exit(1)
+                source_errors[source_key] = "Failed to initialize scraper"
         
-        if not scraper.initialize(
-            cookie=args.cookie,
-            user_agent=args.user_agent,
-            skip_views=args.skip_views,
-            view_workers=args.view_workers
-        ):
-            logging.error("Failed to initialize scraper")
-            progress.add_error("Failed to initialize scraper")
-            progress.complete(success=False)
-            cleanup_incoming()
-            sys.exit(1)
+        if args.skip_image_processing:
+            logging.info("Skipping image processing")
+        elif not ImageProcessor.available():
+            logging.info("Pillow is not available, skipping image processing")
+        else:
+            try:
+                processor = ImageProcessor(os.path.join(output_dir, "image_cache"))
+            except Exception as e:
+                logging.warning(f"Image processing unavailable, keeping original covers: {e}")
+
+        logging.info(f"Writing to incoming file: {games_incoming_file}...")
+        writer = IndexWriter(games_incoming_file, shards_incoming_dir if args.sharded else None,
+                             args.shard_size, db_incoming_file if args.sqlite else None).open()
         
         # Scrape games
         progress.set_phase("processing_posts")
         logging.info("Starting game scraping...")
         
-        game_data = scraper.scrape_games(
-            blacklist_ids=blacklist_ids,
-            per_page=args.per_page,
-            workers=args.workers,
-            progress=progress
-        )
+        if not multi_source:
+            # Games go to the index page by page, the full list is never built
+            source_key, scraper = next(iter(scrapers.items()))
+            scrape_source(source_key, scraper, progress, sink=write_games)
+            refresh_started = resumed_start(refresh_started)
+        else:
+            # Every source runs in its own thread against its own rate limits
+            source_games = {}
+            source_pool = ThreadPoolExecutor(max_workers=len(scrapers), thread_name_prefix="Source")
+            try:
+                source_futures = {
+                    source_key: source_pool.submit(scrape_source, source_key, scraper,
+                                                   SourceProgress(progress, scraper.get_source_name()))
+                    for source_key, scraper in scrapers.items() if source_key not in source_errors
+                }
+                for source_key, future in source_futures.items():
+                    try:
+                        source_games[source_key] = future.result()
+                    except Exception as e:
+                        name = scrapers[source_key].get_source_name()
+                        logging.error(f"{name} refresh failed: {e}")
+                        progress.add_error(f"{name} refresh failed: {e}")
+                        source_errors[source_key] = str(e)
+            finally:
+                source_pool.shutdown(wait=False, cancel_futures=True)
+            
+            refresh_started = resumed_start(refresh_started)
+            merger = IndexMerger()
+            source_metadata = {}
+            for source_key, scraper in scrapers.items():
+                name = scraper.get_source_name()
+                games = source_games.get(source_key)
+                refreshed_at = refresh_started
+                if games is None:
+                    games, refreshed_at = previous_source_games(source_key, scraper)
+                    if games is None:
+                        source_metadata[name] = {"games": 0, "duplicates": 0, "error": source_errors[source_key]}
+                        continue
+                source_metadata[name] = dict(merger.add_source(name, games), refreshedAt=refreshed_at)
+                if source_key in source_errors:
+                    source_metadata[name]["error"] = source_errors[source_key]
+            
+            if len(source_errors) == len(scrapers) and not merger.games:
+                raise RuntimeError("All sources failed")
+            
+            # A game of a later source can still change an earlier entry, so merged games are written last
+            if processor:
+                progress.set_phase("processing_images")
+            write_games(merger.games)
         
-        logging.info(f"Scraped {len(game_data)} games")
+        logging.info(f"Scraped {writer.count} games")
         
         # Build output
         progress.set_phase("saving")
+        if processor:
+            finish_image_processing()
         
+        source_names = [scraper.get_source_name() for scraper in scrapers.values()]
         metadata = {
             "getDate": datetime.datetime.now().strftime("%B %d, %Y, %I:%M %p"),
             "local": True,
-            "source": scraper.get_source_name().upper(),
+            "source": "+".join(name.upper() for name in source_names),
             "listVersion": "1.0",
-            "games": str(len(game_data))
+            "games": str(writer.count),
+            "refreshedAt": refresh_started
         }
+        if multi_source:
+            metadata["sources"] = source_metadata
         
-        output_data = {
-            "metadata": metadata,
-            "games": game_data
-        }
-        
-        logging.info(f"Writing to incoming file: {games_incoming_file}...")
-        with open(games_incoming_file, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        writer.close(metadata)
+        if args.sharded:
+            logging.info(f"Wrote {len(writer.shards)} index shards")
         
         # Swap incoming data to current
         progress.set_phase("swapping")
@@ -562,23 +1016,35 @@ def main():
             progress.add_error("Failed to swap incoming data to current")
             progress.complete(success=False)
             cleanup_incoming()
-            scraper.cleanup()
+            cleanup_scrapers()
             sys.exit(1)
         
-        # Cleanup scraper resources
-        scraper.cleanup()
+        refresh_completed_successfully[0] = True
+        atexit.unregister(on_exit_cleanup)
+        
+        for scraper in scrapers.values():
+            if scraper.checkpoint:
+                scraper.checkpoint.discard()
+        
+        if multi_source:
+            for source_key, games in source_games.items():
+                save_source_snapshot(source_snapshot_file(source_key), scrapers[source_key].get_source_name(),
+                                     games, refresh_started)
+        
+        # The index is already live, results still in flight are published as updates to it.
+        # The run stays "running" until then so no other refresh or index extraction starts meanwhile
+        progress.set_phase("fetching_views")
+        apply_late_updates()
+        cleanup_scrapers()
         
         progress.complete(success=True)
-        logging.info(f"=== Done! Saved {len(game_data)} games ===")
+        logging.info(f"=== Done! Saved {writer.count} games ===")
         
         _launch_notification(
             "Index Refresh Complete",
-            f"Successfully indexed {len(game_data)} games from {scraper.get_source_name()}"
+            f"Successfully indexed {writer.count} games from {', '.join(source_names)}"
         )
         
-        refresh_completed_successfully[0] = True
-        atexit.unregister(on_exit_cleanup)
-        
         # Mark that user has successfully indexed
         try:
             timestamp_path = os.path.join(os.path.expanduser('~'), 'timestamp.ascendara.json')
@@ -598,8 +1064,7 @@ def main():
         progress.complete(success=False)
         atexit.unregister(on_exit_cleanup)
         cleanup_incoming()
-        if 'scraper' in locals():
-            scraper.cleanup()
+        cleanup_scrapers()
         sys.exit(1)
         
     except Exception as e:
@@ -608,11 +1073,12 @@ def main():
         progress.complete(success=False)
         atexit.unregister(on_exit_cleanup)
         cleanup_incoming()
-        if 'scraper' in locals():
-            scraper.cleanup()
+        cleanup_scrapers()
         launch_crash_reporter(1, str(e))
         sys.exit(1)
 
 
 if __name__ == "__main__":
+    # Needed for the image processing pool in the frozen binary
+    multiprocessing.freeze_support()
     main()
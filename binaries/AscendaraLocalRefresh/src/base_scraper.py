@@ -4,24 +4,45 @@ Defines the interface that all source scrapers must implement
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Set
+from typing import Callable, Deque, Dict, List, Optional, Set
 import logging
+import time
+import os
+
+from image_cache import ImageCache
+from politeness import HostPolicy, PolitenessProfile, parse_retry_after
 
 
 class BaseScraper(ABC):
     """Abstract base class for all game source scrapers"""
     
-    def __init__(self, output_dir: str, progress_file: str):
+    # Finished games held back while their cover downloads, a few pages worth
+    MAX_PENDING_GAMES = 500
+    
+    def __init__(self, output_dir: str, progress_file: str, image_cache: Optional[ImageCache] = None):
         """
         Initialize the scraper
         
         Args:
             output_dir: Directory to save output files
             progress_file: Path to progress tracking file
+            image_cache: Cover cache shared with other scrapers of the same run
         """
         self.output_dir = output_dir
         self.progress_file = progress_file
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Covers persist here between refreshes and are linked into imgs_incoming. Scrapers
+        # running side by side must share one, each would prune the other's covers on save
+        self.image_cache = image_cache or ImageCache(os.path.join(output_dir, "image_cache"))
+        # Cover downloads, set up by scrapers in initialize()
+        self.image_fetcher = None
+        # RefreshJournal of this run, set by the caller when progress should survive a crash
+        self.checkpoint = None
+        # Request limits per lane ("pages", "images", ...), subclasses set their defaults
+        # and every request goes through lane(). The user's profile is applied by
+        # configure_politeness() before initialize()
+        self.PROFILE: Dict[str, Dict] = {}
+        self.politeness = None
     
     @abstractmethod
     def get_source_name(self) -> str:
@@ -42,18 +63,46 @@ class BaseScraper(ABC):
         pass
     
     @abstractmethod
-    def scrape_games(self, blacklist_ids: Set[int]) -> List[Dict]:
+    def scrape_games(self, blacklist_ids: Set[int], sink: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
         """
         Scrape all games from the source
         
         Args:
             blacklist_ids: Set of game IDs to skip
+            sink: Called with finished games in index order as they come in, a page at a time
             
         Returns:
-            List of game dictionaries with standardized format
+            List of game dictionaries with standardized format, empty if a sink took them
         """
         pass
     
+    def scrape_updates(self, existing_games: List[Dict], since: float, blacklist_ids: Set[int],
+                       **kwargs) -> Optional[List[Dict]]:
+        """
+        Scrape only games changed since the last refresh and merge them into the existing index
+        
+        Args:
+            existing_games: Games from the current index
+            since: Unix timestamp of the last successful refresh
+            blacklist_ids: Set of game IDs to skip
+            
+        Returns:
+            Merged list of game dictionaries, or None if the source has no incremental mode
+        """
+        return None
+    
+    def collect_late_updates(self, timeout: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Wait for background work that may finish after the index was published
+        
+        Args:
+            timeout: Seconds to wait at most, None for the scraper's default
+            
+        Returns:
+            Dictionary of gameID to the fields that changed, e.g. {"weight": "1234"}
+        """
+        return {}
+    
     @abstractmethod
     def get_total_pages(self) -> int:
         """
@@ -69,6 +118,105 @@ class BaseScraper(ABC):
         """Cleanup resources (close sessions, stop threads, etc.)"""
         pass
     
+    def configure_politeness(self, overrides: Optional[Dict[str, Dict]] = None):
+        """Apply the user's profile for this source, lane settings in it replace the defaults"""
+        self.politeness = PolitenessProfile(self.get_source_name(), self.PROFILE, overrides)
+    
+    def lane(self, name: str, **fallback) -> HostPolicy:
+        """
+        Policy of one lane of this source's profile
+        
+        Args:
+            name: Lane name, one of the keys of PROFILE
+            fallback: Settings derived from command line options, used unless the profile sets them
+        """
+        if self.politeness is None:
+            self.configure_politeness()
+        return self.politeness.lane(name, **fallback)
+    
+    def log_request_rates(self):
+        """Log the request rate each lane achieved, cover hosts separately"""
+        if self.politeness:
+            host_policies = self.image_fetcher.host_policies.values() if self.image_fetcher else ()
+            self.politeness.log_request_rates(host_policies)
+    
+    def _polite_get(self, lane: str, session, url: str, **kwargs):
+        """
+        GET a URL within the limits of a lane
+        
+        429s slow the lane down, server and connection errors are retried after the
+        lane's backoff while its attempts and retry budget last. The last response is
+        returned, or the last connection error raised.
+        """
+        policy = self.lane(lane)
+        attempt = 0
+        while True:
+            response = None
+            try:
+                with policy.slot():
+                    response = session.get(url, **kwargs)
+            except Exception as e:
+                error = e
+            else:
+                if response.status_code == 429:
+                    policy.backoff(parse_retry_after(response.headers.get("Retry-After")))
+                    self.logger.warning(f"429 from {policy.name} lane, slowing down")
+                elif response.status_code < 500:
+                    policy.recover()
+                    return response
+            
+            attempt += 1
+            if attempt >= policy.attempts or not policy.take_retry():
+                if response is None:
+                    raise error
+                return response
+            # A 429 already blocks the lane's bucket for the Retry-After period
+            if response is None or response.status_code != 429 or not policy.bucket:
+                time.sleep(policy.delay(attempt))
+    
+    def _submit_cover(self, image_url: str, imgs_dir: str, progress=None):
+        """Queue a cover download, its imgID is journaled once it finishes"""
+        future = self.image_fetcher.submit(image_url, imgs_dir, progress)
+        if self.checkpoint:
+            def journal_cover(done):
+                if done.cancelled() or done.exception():
+                    return
+                if done.result():
+                    self.checkpoint.record("cover", url=image_url, imgID=done.result())
+            future.add_done_callback(journal_cover)
+        return future
+    
+    def _emit(self, pending: Deque[Dict], sink: Callable[[List[Dict]], None], final: bool = False) -> int:
+        """
+        Pass the games at the front of pending whose cover is in to sink, final waits for
+        all. When covers fall behind, this waits for them so the scraper does not run ahead
+        of the downloads with every game in memory. Returns how many games were passed
+        """
+        finished = self.image_fetcher.take_finished(pending, 0 if final else self.MAX_PENDING_GAMES)
+        if finished:
+            self._finish_games(finished)
+            sink(finished)
+        return len(finished)
+    
+    def _finish_games(self, games: List[Dict]):
+        """Last changes to games before they leave the scraper, e.g. results that came in meanwhile"""
+        pass
+    
+    def _checkpoint_entry(self, game_entry: Dict, image_url: Optional[str]) -> Dict:
+        """Journal copy of a game entry, its cover is journaled by URL until the download finishes"""
+        entry = {key: value for key, value in game_entry.items() if key != "_img_future"}
+        entry["_cover"] = image_url
+        return entry
+    
+    def _restore_cover(self, game_entry: Dict, image_url: Optional[str], covers: Dict[str, str],
+                       imgs_dir: str, progress=None):
+        """Link the cover of a game restored from a checkpoint, or download it again if the cache lost it"""
+        img_id = covers.get(image_url) if image_url else None
+        if img_id and self.image_cache.link_into(img_id, imgs_dir):
+            game_entry["imgID"] = img_id
+        elif image_url:
+            game_entry["_img_future"] = self._submit_cover(image_url, imgs_dir, progress)
+    
     def get_progress(self) -> Dict:
         """
         Get current scraping progress
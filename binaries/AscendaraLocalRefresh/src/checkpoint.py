@@ -0,0 +1,131 @@
+"""
+Refresh Checkpoints
+Append-only journal of a scraper's finished work, so an interrupted refresh can be resumed
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List
+
+
+class RefreshJournal:
+    """
+    NDJSON journal of one scraper's run.
+
+    The first line is a header with the run's parameters, every later line is a record
+    such as a finished page with its game entries or a downloaded cover. Records are
+    only ever appended, a run killed mid write leaves at most one torn last line, which
+    is skipped when the journal is read back. begin() continues the journal when the
+    run is resumed with the same parameters and starts a new one otherwise.
+    """
+
+    VERSION = 1
+    FLUSH_SECONDS = 2.0
+
+    def __init__(self, journal_file: str, resume: bool = False):
+        self.journal_file = journal_file
+        self.resume = resume
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.handle = None
+        self.started_at = time.time()
+        self.resumed = False
+        self.info: Dict = {}
+        self.last_flush = 0.0
+
+    def begin(self, params: Dict, **info) -> List[Dict]:
+        """
+        Open the journal for a run with the given parameters.
+
+        Returns the records of the interrupted run when resuming one with the same
+        parameters, otherwise an empty list. info is stored in the header without
+        being compared, e.g. the post total at the time the run started.
+        """
+        records = []
+        header = None
+        if self.resume:
+            header, records = self._read()
+            if header is None or header.get("params") != params:
+                if header is not None:
+                    self.logger.info("Checkpoint was written with other settings, starting over")
+                header, records = None, []
+
+        with self.lock:
+            if self.handle:
+                self.handle.close()
+            os.makedirs(os.path.dirname(self.journal_file) or ".", exist_ok=True)
+            if header is not None:
+                self.handle = open(self.journal_file, 'a+', encoding='utf-8')
+                if self.handle.tell() > 0:
+                    # Start past a torn last line, otherwise the next record would join it
+                    self.handle.seek(self.handle.tell() - 1)
+                    if self.handle.read(1) != "\n":
+                        self.handle.write("\n")
+                self.started_at = header.get("startedAt", self.started_at)
+                self.resumed = True
+                self.info = header.get("info", {})
+                self.logger.info(f"Resuming from checkpoint with {len(records)} records")
+            else:
+                self.handle = open(self.journal_file, 'w', encoding='utf-8')
+                self.resumed = False
+                self.info = info
+                self._write({"version": self.VERSION, "params": params, "info": info, "startedAt": self.started_at})
+                self.handle.flush()
+        return records
+
+    def _read(self):
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None, []
+        except Exception as e:
+            self.logger.warning(f"Could not read checkpoint: {e}")
+            return None, []
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # The last line may be torn by a kill, everything before it is intact
+                continue
+        if not records or records[0].get("version") != self.VERSION:
+            return None, []
+        return records[0], records[1:]
+
+    def _write(self, record: Dict):
+        self.handle.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+
+    def record(self, kind: str, flush: bool = False, **fields):
+        """Append a record, it reaches the disk with the next flush at the latest"""
+        with self.lock:
+            if self.handle is None:
+                return
+            try:
+                self._write(dict(fields, type=kind))
+                now = time.monotonic()
+                if flush or now - self.last_flush >= self.FLUSH_SECONDS:
+                    self.handle.flush()
+                    self.last_flush = now
+            except Exception as e:
+                self.logger.warning(f"Could not write checkpoint: {e}")
+
+    def close(self):
+        with self.lock:
+            if self.handle:
+                self.handle.close()
+                self.handle = None
+
+    def discard(self):
+        """Remove the journal once the refresh it belongs to has been published"""
+        self.close()
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.warning(f"Could not remove checkpoint: {e}")
@@ -0,0 +1,261 @@
+"""
+Fetch Engine
+Runs all requests of a scraper on one asyncio event loop with a shared connection pool
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from curl_cffi.requests import AsyncSession
+
+from politeness import HostPolicy, parse_retry_after
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
+
+
+def normalize_cookie(cookie: Optional[str]) -> Optional[str]:
+    """Accept a bare cf_clearance value or a full cookie string"""
+    if not cookie:
+        return None
+    cookie = cookie.strip().strip('"\'')
+    if not cookie.startswith("cf_clearance="):
+        cookie = f"cf_clearance={cookie}"
+    return cookie
+
+
+def session_headers(cookie: Optional[str] = None, user_agent: Optional[str] = None) -> Dict[str, str]:
+    """User-Agent and Cookie headers for requests that have to pass Cloudflare"""
+    headers = {"User-Agent": user_agent or DEFAULT_USER_AGENT}
+    cookie = normalize_cookie(cookie)
+    if cookie:
+        headers["Cookie"] = cookie
+    return headers
+
+
+def browser_for(user_agent: Optional[str]) -> str:
+    """Browser to impersonate for the user agent, cf_clearance is bound to its TLS fingerprint"""
+    if user_agent and "firefox" in user_agent.lower():
+        return "firefox"
+    return "chrome"
+
+
+class EngineSession:
+    """
+    Session facade over one engine endpoint, for code written against requests.
+
+    get()/head() block the calling thread, code that runs on the engine loop awaits
+    fetch() instead.
+    """
+
+    def __init__(self, engine: "FetchEngine", endpoint: str):
+        self.engine = engine
+        self.endpoint = endpoint
+
+    def get(self, url, timeout=None, headers=None):
+        return self.engine.get(self.endpoint, url, timeout=timeout, headers=headers).result()
+
+    def head(self, url, timeout=None, headers=None):
+        return self.engine.head(self.endpoint, url, timeout=timeout, headers=headers).result()
+
+    async def fetch(self, method, url, timeout=None, headers=None):
+        return await self.engine.fetch(self.endpoint, method, url, timeout=timeout, headers=headers)
+
+    def close(self):
+        # The engine owns the connections
+        pass
+
+
+class FetchEngine:
+    """
+    One event loop thread and one connection pool shared by every kind of request.
+
+    Blocking code calls get()/head() and receives a concurrent.futures.Future, coroutines
+    on the loop await fetch() directly. Requests are grouped by endpoint name ("pages",
+    "views", ...), limit() gives an endpoint the HostPolicy of a profile lane, which sets
+    its concurrency and rate and slows it down when the host answers 429. pause() holds
+    every request that has not been sent yet, e.g. while waiting for a new cookie, and
+    resume() installs the new credentials and releases them. Cancelling a returned future
+    cancels the request on the loop, close() cancels all.
+
+    Requests are sent by a curl_cffi AsyncSession that impersonates the browser of the
+    user agent, so cf_clearance stays valid, with up to pool_size transfers at once. The
+    transfers run on the loop itself, no thread is held per request.
+    """
+
+    def __init__(self, cookie: Optional[str] = None, user_agent: Optional[str] = None, pool_size: int = 32):
+        self.cookie = cookie
+        self.user_agent = user_agent
+        self.pool_size = max(1, pool_size)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.limits: Dict[str, HostPolicy] = {}
+        self.loop = None
+        self.thread = None
+        self.session = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._running = None
+        self._tasks = set()
+        self._closed = False
+
+    def limit(self, endpoint: str, policy: HostPolicy):
+        """Send the requests of an endpoint within the limits of a policy"""
+        self.limits[endpoint] = policy
+        if self.loop:
+            # Limits changed after start take effect for requests created from now on
+            self.loop.call_soon_threadsafe(self._semaphores.pop, endpoint, None)
+
+    def start(self):
+        if self.loop:
+            return self
+        # curl_cffi watches its sockets with add_reader, which the Windows proactor loop lacks
+        self.loop = asyncio.SelectorEventLoop()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True, name="FetchEngine")
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self.loop).result()
+        self.logger.info(f"Fetch engine started (pool size {self.pool_size})")
+        return self
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _open(self):
+        self._running = asyncio.Event()
+        self._running.set()
+        self.session = self._create_session()
+
+    def _create_session(self):
+        return AsyncSession(
+            loop=self.loop,
+            max_clients=self.pool_size,
+            impersonate=browser_for(self.user_agent),
+            # The Cookie header is sent as given
+            headers=session_headers(self.cookie, self.user_agent),
+        )
+
+    async def _close_session(self, session):
+        try:
+            await session.close()
+        except Exception as e:
+            self.logger.debug(f"Error closing session: {e}")
+
+    # Blocking API
+
+    def get(self, endpoint: str, url: str, timeout: Optional[float] = 30, headers: Optional[Dict] = None):
+        return self.submit(self.fetch(endpoint, "GET", url, timeout, headers))
+
+    def head(self, endpoint: str, url: str, timeout: Optional[float] = 30, headers: Optional[Dict] = None):
+        return self.submit(self.fetch(endpoint, "HEAD", url, timeout, headers))
+
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop, returns a concurrent.futures.Future"""
+        if self._closed or not self.loop:
+            coro.close()
+            raise RuntimeError("Fetch engine is not running")
+        return asyncio.run_coroutine_threadsafe(self._track(coro), self.loop)
+
+    def every(self, interval: float, callback: Callable):
+        """Await callback(run_number) every interval seconds until the returned future is cancelled"""
+        async def periodic():
+            run = 0
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await callback(run)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.debug(f"Periodic task failed: {e}")
+                run += 1
+        return self.submit(periodic())
+
+    def pause(self):
+        """Hold all requests that have not been sent yet"""
+        if self.loop and not self._closed:
+            self.loop.call_soon_threadsafe(self._running.clear)
+            self.logger.info("Fetch engine paused")
+
+    def resume(self, cookie: Optional[str] = None, user_agent: Optional[str] = None):
+        """Release held requests, switching to a new session first if credentials are given"""
+        if not self.loop or self._closed:
+            return
+        asyncio.run_coroutine_threadsafe(self._resume(cookie, user_agent), self.loop).result()
+        self.logger.info("Fetch engine resumed" + (" with new credentials" if cookie or user_agent else ""))
+
+    async def _resume(self, cookie, user_agent):
+        if cookie or user_agent:
+            self.cookie = cookie or self.cookie
+            self.user_agent = user_agent or self.user_agent
+            old_session = self.session
+            self.session = self._create_session()
+            await self._close_session(old_session)
+        self._running.set()
+
+    def cancel(self):
+        """Cancel every pending request, the engine stays usable"""
+        if self.loop and not self._closed:
+            self.loop.call_soon_threadsafe(self._cancel_tasks)
+
+    def _cancel_tasks(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    def close(self):
+        if self._closed or not self.loop:
+            return
+        self._closed = True
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=10)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+
+    async def _shutdown(self):
+        tasks = [task for task in self._tasks if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Held requests were cancelled above, let the gate go so nothing waits on it
+        self._running.set()
+        await self._close_session(self.session)
+        await self.loop.shutdown_default_executor()
+
+    # Coroutine API
+
+    async def _track(self, coro):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        try:
+            return await coro
+        finally:
+            self._tasks.discard(task)
+
+    def _semaphore_for(self, endpoint):
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            policy = self.limits.get(endpoint)
+            semaphore = self._semaphores[endpoint] = asyncio.Semaphore(policy.concurrency if policy else self.pool_size)
+        return semaphore
+
+    async def fetch(self, endpoint: str, method: str, url: str, timeout: Optional[float] = 30,
+                    headers: Optional[Dict] = None):
+        """Send one request, waiting for the endpoint's limits and while the engine is paused"""
+        policy = self.limits.get(endpoint)
+        async with self._semaphore_for(endpoint):
+            while True:
+                await self._running.wait()
+                if policy and policy.bucket:
+                    await policy.bucket.acquire_async()
+                # A pause that started while waiting for the rate limit still applies
+                if self._running.is_set():
+                    break
+            if policy:
+                policy.record_request()
+            response = await self.session.request(method, url, timeout=timeout, headers=headers,
+                                                  allow_redirects=method != "HEAD")
+            if policy:
+                if response.status_code == 429:
+                    policy.backoff(parse_retry_after(response.headers.get("Retry-After")))
+                else:
+                    policy.recover()
+            return response
@@ -5,42 +5,86 @@ Handles scraping game data from gog-games.to
 
 import requests
 import json
-import time
-import threading
 import logging
 import re
 import html
 import random
 import string
 import os
-from typing import Dict, List, Optional, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from bs4 import BeautifulSoup
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
 
 from base_scraper import BaseScraper
+from html_parser import BACKEND as HTML_BACKEND, Selector, SelectorSet, parse_html
+from image_cache import ImageCache
+from image_fetcher import ImageFetcher
 from utils import encode_game_id
 
+# Selectors and patterns are compiled once, several are tried in order as the site structure may vary
+GAME_LINK_SELECTORS = SelectorSet([
+    'a[href*="/game/"]',
+    '.game-card a',
+    '.game-item a',
+    'a.game-link',
+    'div.game a'
+])
+GAME_NAME_SELECTORS = SelectorSet([
+    'h1.game-title',
+    'h1',
+    '.game-name',
+    'title'
+])
+COVER_SELECTORS = SelectorSet([
+    'img.game-cover',
+    'img.cover',
+    '.game-image img',
+    'img[alt*="cover"]',
+    'img[src*="cover"]'
+])
+PAGINATION_SELECTOR = Selector('a[href*="page="]')
+LINK_SELECTOR = Selector('a[href]')
+OG_IMAGE_SELECTOR = Selector('meta[property="og:image"]')
+
+PAGE_NUMBER_RE = re.compile(r'[?&]page=(\d+)')
+SIZE_PATTERNS = [
+    re.compile(r'Size:?\s*([0-9.]+\s*[GM]B)', re.IGNORECASE),
+    re.compile(r'([0-9.]+\s*[GM]B)', re.IGNORECASE),
+]
+VERSION_PATTERNS = [
+    re.compile(r'Version:?\s*([0-9.]+[a-zA-Z0-9._-]*)', re.IGNORECASE),
+    re.compile(r'v\.?\s*([0-9.]+[a-zA-Z0-9._-]*)', re.IGNORECASE),
+]
+DATE_PATTERNS = [
+    re.compile(r'Updated:?\s*(\d{4}-\d{2}-\d{2})'),
+    re.compile(r'(\d{4}-\d{2}-\d{2})'),
+]
+
 
 class GOGGamesScraper(BaseScraper):
     """Scraper implementation for GOG-Games.to source"""
     
-    def __init__(self, output_dir: str, progress_file: str):
-        super().__init__(output_dir, progress_file)
+    def __init__(self, output_dir: str, progress_file: str, image_cache: Optional[ImageCache] = None):
+        super().__init__(output_dir, progress_file, image_cache)
         
         # GOG-Games specific configuration
         self.base_url = "https://gog-games.to"
         self.session = None
         self.total_pages = 0
         
-        # Rate limiting
-        self.request_lock = threading.Lock()
-        self.last_request = 0
-        self.REQUEST_DELAY = 0.5  # seconds between requests
-        
-        # Image download rate limiting
-        self.image_download_lock = threading.Lock()
-        self.last_image_download = 0
-        self.IMAGE_DOWNLOAD_DELAY = 0.3
+        # Request limits, "site" is shared by the listing and all detail fetchers and
+        # "images" applies to each cover host on its own
+        self.PROFILE = {
+            "site": {"concurrency": 8, "rate": 2.0, "burst": 1, "attempts": 3},
+            "images": {"concurrency": 4, "rate": 3.0, "burst": 6, "attempts": 3,
+                       "backoff": {"curve": "linear", "initial": 2.0}},
+        }
+        # Listing stops running ahead once this many detail pages per worker are queued
+        self.DETAIL_BACKLOG = 4
+        
+        # Cover downloads run in the background
+        self.image_fetcher = None
     
     def get_source_name(self) -> str:
         return "GOG-Games"
@@ -65,6 +109,21 @@ class GOGGamesScraper(BaseScraper):
                 headers['Cookie'] = cookie
             
             self.session.headers.update(headers)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=32)
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+            
+            # Images get their own session and connection pool, 403s are not a cookie signal here
+            image_session = requests.Session()
+            image_session.headers.update(headers)
+            images = self.lane("images")
+            self.image_fetcher = ImageFetcher(
+                self.image_cache,
+                image_session,
+                images,
+                workers=images.concurrency,
+                max_failures=None
+            )
             
             # Test connection
             self.logger.info("Testing connection to gog-games.to...")
@@ -74,7 +133,7 @@ class GOGGamesScraper(BaseScraper):
                 self.logger.error(f"Failed to connect: HTTP {response.status_code}")
                 return False
             
-            self.logger.info("Successfully connected to gog-games.to")
+            self.logger.info(f"Successfully connected to gog-games.to (HTML parser: {HTML_BACKEND})")
             return True
             
         except Exception as e:
@@ -82,80 +141,111 @@ class GOGGamesScraper(BaseScraper):
             return False
     
     def scrape_games(self, blacklist_ids: Set[int], per_page: int = 100, 
-                     workers: int = 8, progress=None) -> List[Dict]:
-        """Scrape all games from GOG-Games.to"""
+                     workers: int = 8, progress=None, sink: Optional[Callable[[List[Dict]], None]] = None,
+                     **kwargs) -> List[Dict]:
+        """Scrape all games from GOG-Games.to (source-specific options in kwargs are ignored).
+        
+        Listing pages are read in order and every game link goes to a pool of workers
+        detail fetchers right away, so the next listing page is fetched while the details
+        of the previous one are still coming in. All requests share the "site" lane.
+        Games are passed to sink in listing order as their details and cover come in.
+        """
         game_data = []
+        if sink is None:
+            sink = game_data.extend
+        # Games whose cover is still downloading, and the games behind them
+        pending = deque()
+        games_sent = 0
         processed_game_urls = set()
-        
         imgs_dir = f"{self.output_dir}/imgs_incoming"
-        
-        # GOG-Games typically shows games in a paginated list
-        # We'll scrape the game list pages and then fetch details for each game
-        page = 1
         max_pages = 200  # Safety limit
-        
-        self.logger.info("Starting to scrape game listings...")
-        
-        while page <= max_pages:
+        listings = {}
+        
+        self.logger.info(f"Starting to scrape game listings ({workers} detail workers)...")
+        
+        # Games an interrupted run finished come from its checkpoint, listings are read again
+        restored_games = {}
+        covers = {}
+        if self.checkpoint:
+            records = self.checkpoint.begin({"baseUrl": self.base_url})
+            restored_games = {record["url"]: record["game"] for record in records if record.get("type") == "game"}
+            covers = {record["url"]: record["imgID"] for record in records if record.get("type") == "cover"}
+            if restored_games:
+                self.logger.info(f"Restoring {len(restored_games)} games from the checkpoint")
+        
+        detail_pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="GOGDetail")
+        detail_futures = deque()
+        # Keeps the listing only a few pages ahead of the detail fetchers
+        backlog = threading.BoundedSemaphore(max(1, workers) * self.DETAIL_BACKLOG)
+        
+        def fetch_details(game_url):
             try:
-                # Fetch game list page
-                list_url = f"{self.base_url}/games?page={page}"
-                self.logger.info(f"Fetching page {page}: {list_url}")
-                
-                response = self._rate_limited_get(list_url)
-                
-                if response.status_code != 200:
-                    self.logger.warning(f"Got status {response.status_code} on page {page}, stopping")
-                    break
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Find game links on the page
-                # GOG-Games typically has game cards with links
-                game_links = self._extract_game_links(soup)
-                
-                if not game_links:
-                    self.logger.info(f"No more games found on page {page}, stopping")
-                    break
-                
-                self.logger.info(f"Found {len(game_links)} games on page {page}")
-                
-                # Update total if this is first page
-                if page == 1 and progress:
-                    # Estimate total based on pagination
-                    total_estimate = len(game_links) * max_pages
-                    progress.set_total_posts(total_estimate)
-                
-                # Process each game
-                for game_url in game_links:
-                    if game_url in processed_game_urls:
-                        continue
+                game_entry = restored_games.pop(game_url, None)
+                if game_entry is not None:
+                    self._restore_cover(game_entry, game_entry.pop("_cover", None), covers, imgs_dir, progress)
+                    return game_entry
+                return self._process_game(game_url, imgs_dir, progress, blacklist_ids)
+            finally:
+                if progress:
+                    progress.increment_processed()
+        
+        def take_details(wait=False):
+            """Queue the games of finished detail fetches at the front, keeping the listing order"""
+            while detail_futures and (wait or detail_futures[0].done()):
+                try:
+                    game_entry = detail_futures.popleft().result()
+                except Exception as e:
+                    self.logger.error(f"Error processing game: {e}")
+                    game_entry = None
+                if game_entry:
+                    pending.append(game_entry)
+        
+        try:
+            page = 1
+            while page <= max_pages:
+                take_details()
+                games_sent += self._emit(pending, sink)
+                try:
+                    game_links = listings.pop(page, None)
+                    if game_links is None:
+                        game_links, listing = self._fetch_listing(page)
+                        if game_links is None:
+                            break
+                        if page == 1:
+                            self._discover_total(listing, game_links, listings, progress)
                     
-                    processed_game_urls.add(game_url)
+                    if not game_links:
+                        self.logger.info(f"No more games found on page {page}, stopping")
+                        break
                     
-                    try:
-                        game_entry = self._process_game(game_url, imgs_dir, progress, blacklist_ids)
-                        if game_entry:
-                            game_data.append(game_entry)
-                        
-                        if progress:
-                            progress.increment_processed()
+                    self.logger.info(f"Found {len(game_links)} games on page {page}")
+                    for game_url in game_links:
+                        if game_url in processed_game_urls:
+                            continue
+                        processed_game_urls.add(game_url)
+                        backlog.acquire()
+                        future = detail_pool.submit(fetch_details, game_url)
+                        future.add_done_callback(lambda _: backlog.release())
+                        detail_futures.append(future)
                     
-                    except Exception as e:
-                        self.logger.error(f"Error processing game {game_url}: {e}")
-                        if progress:
-                            progress.add_error(f"Error processing {game_url}: {str(e)}")
-                
-                page += 1
-                time.sleep(1)  # Be nice to the server between pages
-                
-            except Exception as e:
-                self.logger.error(f"Error fetching page {page}: {e}")
-                if progress:
-                    progress.add_error(f"Error fetching page {page}: {str(e)}")
-                break
+                    page += 1
+                    
+                except Exception as e:
+                    self.logger.error(f"Error fetching page {page}: {e}")
+                    if progress:
+                        progress.add_error(f"Error fetching page {page}: {str(e)}")
+                    break
+            
+            take_details(wait=True)
+        finally:
+            for future in detail_futures:
+                future.cancel()
+            detail_pool.shutdown(wait=True)
+        
+        # Wait for cover downloads still in flight
+        games_sent += self._emit(pending, sink, final=True)
         
-        self.logger.info(f"Scraped {len(game_data)} games total")
+        self.logger.info(f"Scraped {games_sent} games total")
         return game_data
     
     def get_total_pages(self) -> int:
@@ -164,46 +254,61 @@ class GOGGamesScraper(BaseScraper):
     
     def cleanup(self):
         """Cleanup resources"""
+        if self.image_fetcher:
+            self.image_fetcher.shutdown()
+        self.image_cache.save()
         if self.session:
             self.session.close()
     
     # Private helper methods
     
     def _rate_limited_get(self, url, timeout=30):
-        """Make a rate-limited GET request"""
-        with self.request_lock:
-            elapsed = time.time() - self.last_request
-            if elapsed < self.REQUEST_DELAY:
-                time.sleep(self.REQUEST_DELAY - elapsed)
-            
-            response = self.session.get(url, timeout=timeout)
-            self.last_request = time.time()
-            return response
+        """GET a gog-games.to page within the limits of the site lane"""
+        return self._polite_get("site", self.session, url, timeout=timeout)
+    
+    def _fetch_listing(self, page):
+        """Fetch one listing page, returns (game links, page) or (None, None) if it failed"""
+        list_url = f"{self.base_url}/games?page={page}"
+        self.logger.info(f"Fetching page {page}: {list_url}")
+        response = self._rate_limited_get(list_url)
+        if response.status_code != 200:
+            self.logger.warning(f"Got status {response.status_code} on page {page}, stopping")
+            return None, None
+        page = parse_html(response.text)
+        return self._extract_game_links(page), page
     
-    def _extract_game_links(self, soup):
+    def _discover_total(self, page, first_links, listings, progress):
+        """Count the games from the first listing page's pagination and the last page"""
+        page_numbers = [int(n) for link in page.select(PAGINATION_SELECTOR)
+                        for n in PAGE_NUMBER_RE.findall(link.get('href', ''))]
+        last_page = max(page_numbers, default=1)
+        self.total_pages = last_page
+        total = len(first_links)
+        if last_page > 1:
+            # The last page is usually partial, it is kept so it is not fetched twice
+            last_links, _ = self._fetch_listing(last_page)
+            if last_links is not None:
+                listings[last_page] = last_links
+                total = len(first_links) * (last_page - 1) + len(last_links)
+            else:
+                total = len(first_links) * last_page
+        self.logger.info(f"Found {last_page} listing pages with about {total} games")
+        if progress:
+            progress.set_total_posts(total)
+    
+    def _extract_game_links(self, page):
         """Extract game page links from a listing page"""
         game_links = []
+        seen = set()
         
-        # Try multiple selectors as the site structure may vary
-        # Common patterns: game cards, game titles, etc.
-        selectors = [
-            'a[href*="/game/"]',
-            '.game-card a',
-            '.game-item a',
-            'a.game-link',
-            'div.game a'
-        ]
-        
-        for selector in selectors:
-            links = soup.select(selector)
-            if links:
-                for link in links:
-                    href = link.get('href', '')
-                    if href and '/game/' in href:
-                        full_url = href if href.startswith('http') else f"{self.base_url}{href}"
-                        if full_url not in game_links:
-                            game_links.append(full_url)
-                break  # Use first selector that works
+        # Use the first selector that works
+        for link in page.select_first(GAME_LINK_SELECTORS):
+            href = link.get('href', '')
+            if href and '/game/' in href:
+                full_url = href if href.startswith('http') else f"{self.base_url}{href}"
+                if full_url not in seen:
+                    seen.add(full_url)
+                    game_links.append(full_url)
         
         return game_links
     
@@ -219,10 +324,10 @@ class GOGGamesScraper(BaseScraper):
                 self.logger.warning(f"Failed to fetch {game_url}: HTTP {response.status_code}")
                 return None
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            page = parse_html(response.text)
             
             # Extract game data
-            game_name = self._extract_game_name(soup)
+            game_name = self._extract_game_name(page)
             if not game_name:
                 self.logger.warning(f"Could not extract game name from {game_url}")
                 return None
@@ -231,22 +336,21 @@ class GOGGamesScraper(BaseScraper):
                 progress.set_current_game(game_name)
             
             # Extract other metadata
-            game_size = self._extract_game_size(soup)
-            version = self._extract_version(soup)
-            download_links = self._extract_download_links(soup)
+            game_size = self._extract_game_size(page)
+            version = self._extract_version(page)
+            download_links = self._extract_download_links(page)
             
-            # Get image
-            image_url = self._extract_image_url(soup)
+            # Queue the cover download, imgID is filled in once it completes
+            image_url = self._extract_image_url(page)
             img_id = self._generate_random_id()
-            if image_url:
-                img_id = self._download_image(image_url, img_id, imgs_dir, progress)
+            img_future = self._submit_cover(image_url, imgs_dir, progress) if image_url else None
             
             # Generate game ID from URL
             game_id_num = self._extract_game_id_from_url(game_url)
             encoded_game_id = encode_game_id(game_id_num) if game_id_num else self._generate_random_id(6)
             
             # Get release date/update date
-            latest_update = self._extract_update_date(soup)
+            latest_update = self._extract_update_date(page)
             
             game_entry = {
                 "game": game_name,
@@ -264,6 +368,10 @@ class GOGGamesScraper(BaseScraper):
                 "latest_update": latest_update,
                 "minReqs": None  # Not typically listed on GOG-Games
             }
+            if self.checkpoint:
+                self.checkpoint.record("game", url=game_url, game=self._checkpoint_entry(game_entry, image_url))
+            if img_future:
+                game_entry["_img_future"] = img_future
             
             return game_entry
         
@@ -274,20 +382,12 @@ class GOGGamesScraper(BaseScraper):
                 progress.add_error(error_msg)
             return None
     
-    def _extract_game_name(self, soup):
+    def _extract_game_name(self, page):
         """Extract game name from page"""
-        # Try multiple selectors
-        selectors = [
-            'h1.game-title',
-            'h1',
-            '.game-name',
-            'title'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
+        for selector in GAME_NAME_SELECTORS:
+            element = page.select_one(selector)
             if element:
-                name = element.get_text(strip=True)
+                name = element.text()
                 # Clean up title
                 name = name.replace(' - GOG Games', '').replace('Download', '').strip()
                 name = html.unescape(name)
@@ -296,49 +396,31 @@ class GOGGamesScraper(BaseScraper):
         
         return ""
     
-    def _extract_game_size(self, soup):
+    def _extract_game_size(self, page):
         """Extract game size from page"""
-        # Look for size information in common locations
-        text = soup.get_text()
-        
         # Common patterns: "Size: 5.2 GB", "5.2GB", etc.
-        size_patterns = [
-            r'Size:?\s*([0-9.]+\s*[GM]B)',
-            r'([0-9.]+\s*[GM]B)',
-        ]
-        
-        for pattern in size_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in SIZE_PATTERNS:
+            match = pattern.search(page.text)
             if match:
                 return match.group(1).strip()
         
         return ""
     
-    def _extract_version(self, soup):
+    def _extract_version(self, page):
         """Extract version from page"""
-        text = soup.get_text()
-        
         # Common patterns: "Version: 1.0.5", "v1.0.5", etc.
-        version_patterns = [
-            r'Version:?\s*([0-9.]+[a-zA-Z0-9._-]*)',
-            r'v\.?\s*([0-9.]+[a-zA-Z0-9._-]*)',
-        ]
-        
-        for pattern in version_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in VERSION_PATTERNS:
+            match = pattern.search(page.text)
             if match:
                 return match.group(1).strip()
         
         return ""
     
-    def _extract_download_links(self, soup):
+    def _extract_download_links(self, page):
         """Extract download links from page"""
         download_links = {}
         
-        # Find all links on the page
-        links = soup.find_all('a', href=True)
-        
-        for link in links:
+        for link in page.select(LINK_SELECTOR):
             href = link.get('href', '')
             
             # Check for various file hosting services
@@ -357,24 +439,16 @@ class GOGGamesScraper(BaseScraper):
         
         return download_links
     
-    def _extract_image_url(self, soup):
+    def _extract_image_url(self, page):
         """Extract game cover image URL"""
         # Try og:image meta tag first
-        og_image = soup.find('meta', property='og:image')
+        og_image = page.select_one(OG_IMAGE_SELECTOR)
         if og_image and og_image.get('content'):
             return og_image.get('content')
         
         # Try common image selectors
-        selectors = [
-            'img.game-cover',
-            'img.cover',
-            '.game-image img',
-            'img[alt*="cover"]',
-            'img[src*="cover"]'
-        ]
-        
-        for selector in selectors:
-            img = soup.select_one(selector)
+        for selector in COVER_SELECTORS:
+            img = page.select_one(selector)
             if img and img.get('src'):
                 src = img.get('src')
                 if src.startswith('http'):
@@ -384,18 +458,11 @@ class GOGGamesScraper(BaseScraper):
         
         return ""
     
-    def _extract_update_date(self, soup):
+    def _extract_update_date(self, page):
         """Extract last update date"""
-        text = soup.get_text()
-        
         # Look for date patterns
-        date_patterns = [
-            r'Updated:?\s*(\d{4}-\d{2}-\d{2})',
-            r'(\d{4}-\d{2}-\d{2})',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
+        for pattern in DATE_PATTERNS:
+            match = pattern.search(page.text)
             if match:
                 return match.group(1)
         
@@ -414,48 +481,3 @@ class GOGGamesScraper(BaseScraper):
     def _generate_random_id(self, length=10):
         """Generate a random alphanumeric ID"""
         return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
-    def _download_image(self, image_url, img_id, imgs_dir, progress):
-        """Download and save image with rate limiting"""
-        if not image_url:
-            return ""
-        
-        if progress:
-            progress.increment_images()
-        
-        max_retries = 3
-        
-        for attempt in range(max_retries):
-            try:
-                with self.image_download_lock:
-                    elapsed = time.time() - self.last_image_download
-                    if elapsed < self.IMAGE_DOWNLOAD_DELAY:
-                        time.sleep(self.IMAGE_DOWNLOAD_DELAY - elapsed)
-                    self.last_image_download = time.time()
-                
-                response = self.session.get(image_url, timeout=15)
-                
-                if response.status_code == 429:
-                    wait_time = (attempt + 1) * 5
-                    self.logger.warning(f"429 on image, waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    continue
-                
-                response.raise_for_status()
-                
-                img_path = os.path.join(imgs_dir, f"{img_id}.jpg")
-                with open(img_path, 'wb') as f:
-                    f.write(response.content)
-                
-                if progress:
-                    progress.increment_downloaded_images()
-                
-                return img_id
-                
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep((attempt + 1) * 2)
-                else:
-                    self.logger.warning(f"Failed to download image after {max_retries} attempts: {image_url}")
-        
-        return ""
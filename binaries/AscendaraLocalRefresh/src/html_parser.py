@@ -0,0 +1,141 @@
+"""
+HTML Parser
+Parses scraped pages with the fastest HTML parser installed
+"""
+
+from typing import Iterable, List, Optional
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+    except ImportError:
+        _SelectolaxParser = None
+
+try:
+    import lxml.html as _lxml_html
+    from lxml.cssselect import CSSSelector as _CSSSelector
+except ImportError:
+    _lxml_html = None
+    _CSSSelector = None
+
+try:
+    # Without cssselect lxml can still speed up BeautifulSoup as its tree builder
+    import lxml
+    _SOUP_FEATURES = "lxml"
+except ImportError:
+    _SOUP_FEATURES = "html.parser"
+
+if _SelectolaxParser is not None:
+    BACKEND = "selectolax"
+elif _CSSSelector is not None:
+    BACKEND = "lxml"
+else:
+    BACKEND = "bs4"
+    from bs4 import BeautifulSoup
+    import soupsieve
+
+
+class Selector:
+    """A CSS selector compiled once for the active backend"""
+
+    def __init__(self, css: str):
+        self.css = css
+        if BACKEND == "lxml":
+            self.compiled = _CSSSelector(css)
+        elif BACKEND == "bs4":
+            self.compiled = soupsieve.compile(css)
+        else:
+            # selectolax compiles selectors natively on every call, which is cheap
+            self.compiled = css
+
+
+class SelectorSet:
+    """Selectors tried in order, the first one that matches anything wins"""
+
+    def __init__(self, selectors: Iterable[str]):
+        self.selectors = [Selector(css) for css in selectors]
+
+    def __iter__(self):
+        return iter(self.selectors)
+
+
+class HtmlNode:
+    """Backend independent view of an element"""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def get(self, attribute: str, default=None):
+        if BACKEND == "selectolax":
+            value = self.node.attributes.get(attribute)
+            return default if value is None else value
+        return self.node.get(attribute, default)
+
+    def text(self) -> str:
+        """Text of the element with every piece stripped, like get_text(strip=True)"""
+        if BACKEND == "selectolax":
+            return self.node.text(strip=True)
+        if BACKEND == "lxml":
+            return "".join(piece.strip() for piece in self.node.itertext())
+        return self.node.get_text(strip=True)
+
+
+class HtmlPage:
+    """A parsed page, query it with Selector/SelectorSet objects"""
+
+    def __init__(self, markup: str):
+        self._text = None
+        if BACKEND == "selectolax":
+            self.tree = _SelectolaxParser(markup)
+        elif BACKEND == "lxml":
+            self.tree = _lxml_html.fromstring(markup) if markup.strip() else _lxml_html.fromstring("<html></html>")
+        else:
+            self.tree = BeautifulSoup(markup, _SOUP_FEATURES)
+
+    def select(self, selector: Selector) -> List[HtmlNode]:
+        if BACKEND == "selectolax":
+            nodes = self.tree.css(selector.compiled)
+        elif BACKEND == "lxml":
+            nodes = selector.compiled(self.tree)
+        else:
+            nodes = selector.compiled.select(self.tree)
+        return [HtmlNode(node) for node in nodes]
+
+    def select_one(self, selector: Selector) -> Optional[HtmlNode]:
+        if BACKEND == "selectolax":
+            node = self.tree.css_first(selector.compiled)
+        elif BACKEND == "lxml":
+            nodes = selector.compiled(self.tree)
+            node = nodes[0] if nodes else None
+        else:
+            node = selector.compiled.select_one(self.tree)
+        return HtmlNode(node) if node is not None else None
+
+    def select_first(self, selectors: SelectorSet) -> List[HtmlNode]:
+        """Matches of the first selector in the set that matches anything"""
+        for selector in selectors:
+            nodes = self.select(selector)
+            if nodes:
+                return nodes
+        return []
+
+    @property
+    def text(self) -> str:
+        """All text of the page, computed once"""
+        if self._text is None:
+            if BACKEND == "selectolax":
+                root = self.tree.root
+                self._text = root.text() if root is not None else ""
+            elif BACKEND == "lxml":
+                self._text = self.tree.text_content()
+            else:
+                self._text = self.tree.get_text()
+        return self._text
+
+
+def parse_html(markup: str) -> HtmlPage:
+    return HtmlPage(markup)
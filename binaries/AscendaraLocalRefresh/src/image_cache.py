@@ -0,0 +1,145 @@
+"""
+Persistent Image Cache
+Keeps cover images across refreshes so unchanged covers are never downloaded twice
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+
+class ImageCache:
+    """
+    Content-addressed store for cover images.
+
+    Each source URL maps to its last known ETag/Last-Modified and an imgID derived from
+    the image bytes, so the imgID only changes when the image itself does. Cached files
+    are hard linked into the incoming imgs folder of every refresh.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    ID_LENGTH = 10
+    MAX_UNUSED_DAYS = 30
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, self.MANIFEST_NAME)
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.entries: Dict[str, Dict] = {}
+        self.stats = {"downloaded": 0, "revalidated": 0, "bytes": 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("images", {})
+        except Exception as e:
+            self.logger.warning(f"Could not load image cache manifest, starting empty: {e}")
+            self.entries = {}
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _path_for(self, img_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{img_id}.jpg")
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return If-None-Match/If-Modified-Since headers for a cached URL"""
+        with self.lock:
+            entry = self.entries.get(self._url_key(url))
+        if not entry or not os.path.exists(self._path_for(entry["imgID"])):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("lastModified"):
+            headers["If-Modified-Since"] = entry["lastModified"]
+        return headers
+
+    def revalidated(self, url: str) -> Optional[str]:
+        """Mark a cached URL as unchanged after a 304, returns its imgID"""
+        with self.lock:
+            entry = self.entries.get(self._url_key(url))
+            if not entry:
+                return None
+            entry["lastUsed"] = time.time()
+            self.stats["revalidated"] += 1
+            return entry["imgID"]
+
+    def store(self, url: str, content: bytes, headers) -> str:
+        """Store downloaded image bytes for a URL, returns the content-derived imgID"""
+        img_id = hashlib.sha1(content).hexdigest()[:self.ID_LENGTH]
+        img_path = self._path_for(img_id)
+        if not os.path.exists(img_path):
+            tmp_path = f"{img_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, img_path)
+
+        with self.lock:
+            self.entries[self._url_key(url)] = {
+                "url": url,
+                "imgID": img_id,
+                "etag": headers.get("ETag"),
+                "lastModified": headers.get("Last-Modified"),
+                "size": len(content),
+                "lastUsed": time.time(),
+            }
+            self.stats["downloaded"] += 1
+            self.stats["bytes"] += len(content)
+        return img_id
+
+    def link_into(self, img_id: str, dest_dir: str) -> bool:
+        """Hard link (or copy) a cached image into dest_dir as {imgID}.jpg"""
+        src = self._path_for(img_id)
+        dst = os.path.join(dest_dir, f"{img_id}.jpg")
+        if os.path.exists(dst):
+            return True
+        if not os.path.exists(src):
+            return False
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copy2(src, dst)
+        return True
+
+    def save(self):
+        """Write the manifest and drop images that no refresh has used for a while"""
+        cutoff = time.time() - self.MAX_UNUSED_DAYS * 24 * 60 * 60
+        with self.lock:
+            stale = [key for key, entry in self.entries.items() if entry.get("lastUsed", 0) < cutoff]
+            for key in stale:
+                del self.entries[key]
+            live_ids = {entry["imgID"] for entry in self.entries.values()}
+            manifest = {"version": 1, "images": self.entries}
+            tmp_path = f"{self.manifest_path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+                os.replace(tmp_path, self.manifest_path)
+            except Exception as e:
+                self.logger.warning(f"Could not save image cache manifest: {e}")
+                return
+
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".jpg") and name[:-4] not in live_ids:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+
+        self.logger.info(
+            f"Image cache: {self.stats['downloaded']} downloaded ({self.stats['bytes'] // 1024} KB), "
+            f"{self.stats['revalidated']} unchanged, {len(self.entries)} cached, {removed} pruned"
+        )
@@ -0,0 +1,293 @@
+"""
+Image Fetcher
+Downloads cover images in the background, rate limited per host
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Deque, Dict, List, Optional
+from urllib.parse import urlparse
+
+from fetch_engine import EngineSession
+from politeness import HostPolicy, parse_retry_after
+
+# What a response means for a download, besides success
+RATE_LIMITED = "rate_limited"
+REFUSED = "refused"
+NOT_CACHED = "not_cached"
+
+
+class ImageFetcher:
+    """
+    Background cover downloader.
+
+    Posts submit image URLs and get a future back, so post processing never waits on
+    cover art, take_finished() passes games on once their cover is in. With an
+    EngineSession downloads are coroutines on the fetch engine's loop, at most workers at
+    once, otherwise they run in a pool of workers threads. Each host gets its own copy of
+    the scraper's "images" lane policy, with its own concurrency and rate limit. When too
+    many requests are refused with 403 the fetcher marks the session expired and holds
+    pending downloads until reset_session() supplies a new one.
+    """
+
+    def __init__(self, image_cache, session, policy: HostPolicy, workers: int = 8,
+                 max_failures: Optional[int] = 5):
+        self.image_cache = image_cache
+        self.session = session
+        self.policy = policy
+        self.max_failures = max_failures
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # The pool is started on the first submit, so workers can still be changed before that
+        self.workers = workers
+        self.executor = None
+        self.executor_lock = threading.Lock()
+        self.host_policies: Dict[str, HostPolicy] = {}
+        self.host_policies_lock = threading.Lock()
+        self.failure_lock = threading.Lock()
+        self.failed_count = 0
+        self.expired_event = threading.Event()
+        self.stop_event = threading.Event()
+        self._async_workers = None
+        self._async_slots: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def session_expired(self) -> bool:
+        return self.expired_event.is_set()
+
+    def submit(self, image_url: str, imgs_dir: str, progress=None):
+        """Queue an image download, the future resolves to its imgID ("" on failure)"""
+        if progress:
+            progress.increment_images()
+        if isinstance(self.session, EngineSession):
+            return self.session.engine.submit(self._fetch_async(image_url, imgs_dir, progress))
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="ImageFetcher")
+        return self.executor.submit(self._fetch, image_url, imgs_dir, progress)
+
+    def reset_session(self, session):
+        """Swap in a new session (e.g. after a cookie refresh) and resume held downloads"""
+        old_session = self.session
+        self.session = session
+        with self.failure_lock:
+            self.failed_count = 0
+        self.expired_event.clear()
+        try:
+            old_session.close()
+        except Exception:
+            pass
+
+    def take_finished(self, pending: Deque[Dict], max_pending: Optional[int] = None) -> List[Dict]:
+        """
+        Pop the games off the front of pending whose cover download finished and fill in
+        their imgID ("" on failure). Games keep their order, a cover still downloading
+        holds back the games after it. While more than max_pending games are left its
+        download is waited for instead, 0 waits for all.
+        """
+        if max_pending == 0 and self.session_expired:
+            # No new session is coming, release downloads held for one
+            self.stop_event.set()
+        finished = []
+        while pending:
+            future = pending[0].get("_img_future")
+            if future is not None and not self._wait_for_download(future, len(pending), max_pending):
+                break
+            game = pending.popleft()
+            game.pop("_img_future", None)
+            if future is not None:
+                try:
+                    game["imgID"] = future.result()
+                except Exception as e:
+                    self.logger.warning(f"Image download failed: {e}")
+                    game["imgID"] = ""
+            finished.append(game)
+        return finished
+
+    def _wait_for_download(self, future, pending_count, max_pending) -> bool:
+        """True once the download is done, False if it should not be waited for"""
+        while not future.done():
+            if max_pending is None or pending_count <= max_pending:
+                return False
+            # Downloads held for a new session never finish while the scraper waits here
+            if max_pending and self.session_expired:
+                return False
+            wait([future], timeout=0.5)
+        return True
+
+    def shutdown(self):
+        self.stop_event.set()
+        if self.executor:
+            self.executor.shutdown(wait=True)
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+    def _policy_for(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.host_policies_lock:
+            policy = self.host_policies.get(host)
+            if policy is None:
+                policy = self.host_policies[host] = self.policy.for_host(host)
+            return policy
+
+    def _record_failure(self):
+        if self.max_failures is None:
+            return
+        with self.failure_lock:
+            self.failed_count += 1
+            if self.failed_count >= self.max_failures and not self.expired_event.is_set():
+                self.logger.warning(f"Hit {self.max_failures} failed image downloads, session likely expired")
+                self.expired_event.set()
+
+    def _wait_for_session(self) -> bool:
+        """Hold while the session is expired, returns False if the fetcher is stopping"""
+        while self.expired_event.is_set():
+            if self.stop_event.is_set():
+                return False
+            time.sleep(0.5)
+        return True
+
+    async def _wait_for_session_async(self) -> bool:
+        while self.expired_event.is_set():
+            if self.stop_event.is_set():
+                return False
+            await asyncio.sleep(0.5)
+        return True
+
+    def _handle_response(self, response, image_url, imgs_dir, policy, progress):
+        """Store a downloaded cover, returns its imgID or why the attempt did not succeed"""
+        if response.status_code == 429:
+            # Rate limits slow the host down instead of using up attempts
+            policy.backoff(parse_retry_after(response.headers.get("Retry-After")))
+            self.logger.warning(f"429 on image host {urlparse(image_url).netloc}, "
+                                f"slowing to {policy.bucket.rate if policy.bucket else 0:.1f} req/s")
+            return None, RATE_LIMITED
+
+        if response.status_code == 403:
+            self._record_failure()
+            return None, REFUSED
+
+        if response.status_code == 304:
+            img_id = self.image_cache.revalidated(image_url)
+            if not img_id or not self.image_cache.link_into(img_id, imgs_dir):
+                return None, NOT_CACHED
+        else:
+            response.raise_for_status()
+            img_id = self.image_cache.store(image_url, response.content, response.headers)
+            self.image_cache.link_into(img_id, imgs_dir)
+
+        policy.recover()
+        with self.failure_lock:
+            self.failed_count = 0
+        if progress:
+            progress.increment_downloaded_images()
+        return img_id, None
+
+    def _give_up(self, image_url, policy):
+        self.logger.warning(f"Failed to download image after {policy.attempts} attempts: {image_url}")
+        self._record_failure()
+        return ""
+
+    def _fetch(self, image_url, imgs_dir, progress):
+        with self._policy_for(image_url).slots:
+            return self._download(image_url, imgs_dir, progress)
+
+    def _download(self, image_url, imgs_dir, progress):
+        policy = self._policy_for(image_url)
+        attempt = 0
+        rate_limited = 0
+
+        while attempt < policy.attempts:
+            if not self._wait_for_session():
+                return ""
+            if attempt and not policy.take_retry():
+                self.logger.debug(f"Retry budget of {policy.name} spent, giving up on {image_url}")
+                break
+            policy.acquire()
+
+            try:
+                response = self.session.get(image_url, timeout=15,
+                                            headers=self.image_cache.conditional_headers(image_url))
+                img_id, reason = self._handle_response(response, image_url, imgs_dir, policy, progress)
+                if reason == RATE_LIMITED:
+                    rate_limited += 1
+                    if rate_limited >= policy.attempts * 3:
+                        break
+                    continue
+                if reason == REFUSED:
+                    self.logger.warning(f"403 Forbidden on image (attempt {attempt + 1}), session may be expired")
+                    attempt += 1
+                    time.sleep(policy.delay(attempt))
+                    continue
+                if reason == NOT_CACHED:
+                    attempt += 1
+                    continue
+                return img_id
+
+            except Exception as e:
+                attempt += 1
+                if attempt < policy.attempts:
+                    time.sleep(policy.delay(attempt))
+                else:
+                    self.logger.debug(f"Last image download error for {image_url}: {e}")
+
+        return self._give_up(image_url, policy)
+
+    async def _fetch_async(self, image_url, imgs_dir, progress):
+        policy = self._policy_for(image_url)
+        if self._async_workers is None:
+            self._async_workers = asyncio.Semaphore(max(1, self.workers))
+        slots = self._async_slots.get(policy.name)
+        if slots is None:
+            slots = self._async_slots[policy.name] = asyncio.Semaphore(policy.concurrency)
+        async with self._async_workers, slots:
+            return await self._download_async(image_url, imgs_dir, progress, policy)
+
+    async def _download_async(self, image_url, imgs_dir, progress, policy):
+        attempt = 0
+        rate_limited = 0
+
+        while attempt < policy.attempts:
+            if not await self._wait_for_session_async():
+                return ""
+            if attempt and not policy.take_retry():
+                self.logger.debug(f"Retry budget of {policy.name} spent, giving up on {image_url}")
+                break
+            if policy.bucket:
+                await policy.bucket.acquire_async()
+            policy.record_request()
+
+            try:
+                # The session is read on every attempt, reset_session() may have replaced it
+                response = await self.session.fetch("GET", image_url, timeout=15,
+                                                    headers=self.image_cache.conditional_headers(image_url))
+                img_id, reason = self._handle_response(response, image_url, imgs_dir, policy, progress)
+                if reason == RATE_LIMITED:
+                    rate_limited += 1
+                    if rate_limited >= policy.attempts * 3:
+                        break
+                    continue
+                if reason == REFUSED:
+                    self.logger.warning(f"403 Forbidden on image (attempt {attempt + 1}), session may be expired")
+                    attempt += 1
+                    await asyncio.sleep(policy.delay(attempt))
+                    continue
+                if reason == NOT_CACHED:
+                    attempt += 1
+                    continue
+                return img_id
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                attempt += 1
+                if attempt < policy.attempts:
+                    await asyncio.sleep(policy.delay(attempt))
+                else:
+                    self.logger.debug(f"Last image download error for {image_url}: {e}")
+
+        return self._give_up(image_url, policy)
@@ -0,0 +1,265 @@
+"""
+Image Processor
+Normalises cover images and builds card thumbnails for the local index
+"""
+
+import io
+import os
+import json
+import shutil
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+# Bump when the output settings change so cached results are rebuilt
+PROCESSOR_VERSION = 1
+
+COVER_MAX_WIDTH = 1280
+THUMB_SIZE = (460, 460)
+COVER_QUALITY = 85
+THUMB_QUALITY = 80
+THUMBS_DIR = "thumbs"
+METADATA_KEYS = ("exif", "icc_profile", "comment", "xmp", "XML:com.adobe.xmp", "photoshop")
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """Detect the real image format from its magic bytes"""
+    if data[:3] == b'\xff\xd8\xff':
+        return "jpeg"
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return "png"
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return "gif"
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return "webp"
+    if data[4:12] in (b'ftypavif', b'ftypavis'):
+        return "avif"
+    if data[:2] == b'BM':
+        return "bmp"
+    return None
+
+
+def _link_or_copy(src, dst):
+    """Place src at dst, replacing whatever is there"""
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def _save_atomic(img, path, **save_args):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    img.save(tmp_path, **save_args)
+    os.replace(tmp_path, path)
+
+
+def _to_rgb(img):
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (0, 0, 0))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _dominant_color(img) -> str:
+    small = img.copy()
+    small.thumbnail((64, 64))
+    paletted = small.quantize(colors=5)
+    _, index = max(paletted.getcolors())
+    r, g, b = paletted.getpalette()[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def process_image(src_path: str, out_dir: str, img_id: str, thumb_format: str) -> Dict:
+    """
+    Normalise one cover and write its thumbnail (runs in a worker process).
+
+    The cover is written as a metadata-free JPEG no wider than COVER_MAX_WIDTH, clean
+    JPEGs that are already small enough are kept byte for byte.
+    """
+    with open(src_path, 'rb') as f:
+        data = f.read()
+    source_format = sniff_format(data)
+    if source_format is None:
+        raise ValueError("not a recognised image format")
+
+    with Image.open(io.BytesIO(data)) as original:
+        has_metadata = any(key in original.info for key in METADATA_KEYS)
+        img = _to_rgb(ImageOps.exif_transpose(original))
+
+    cover_path = os.path.join(out_dir, f"{img_id}.jpg")
+    width, height = img.size
+    if source_format == "jpeg" and width <= COVER_MAX_WIDTH and not has_metadata:
+        _link_or_copy(src_path, cover_path)
+        cover = img
+    else:
+        cover = img
+        if width > COVER_MAX_WIDTH:
+            height = round(height * COVER_MAX_WIDTH / width)
+            width = COVER_MAX_WIDTH
+            cover = img.resize((width, height), Image.LANCZOS)
+        _save_atomic(cover, cover_path, format="JPEG", quality=COVER_QUALITY, optimize=True, progressive=True)
+
+    thumb = cover.copy()
+    thumb.thumbnail(THUMB_SIZE, Image.LANCZOS)
+    thumb_path = os.path.join(out_dir, f"{img_id}.{thumb_format}")
+    if thumb_format == "webp":
+        _save_atomic(thumb, thumb_path, format="WEBP", quality=THUMB_QUALITY, method=4)
+    else:
+        _save_atomic(thumb, thumb_path, format="JPEG", quality=THUMB_QUALITY, optimize=True)
+
+    return {
+        "width": width,
+        "height": height,
+        "color": _dominant_color(thumb),
+        "thumb": thumb_format,
+        "sourceFormat": source_format,
+        "sourceBytes": len(data),
+        "bytes": os.path.getsize(cover_path) + os.path.getsize(thumb_path),
+    }
+
+
+class ImageProcessor:
+    """
+    Runs process_image over every cover of a refresh in a process pool.
+
+    Covers can be handed over all at once with process(), or in batches as the index
+    is written with process_batch() and a final finish(). The pool stays up between
+    batches.
+
+    Results are keyed by imgID, which is derived from the image bytes, so covers that
+    were already processed by an earlier refresh are only linked back into place.
+    """
+
+    MANIFEST_NAME = "processed.json"
+
+    def __init__(self, cache_dir: str, workers: Optional[int] = None):
+        self.processed_dir = os.path.join(cache_dir, "processed")
+        self.manifest_path = os.path.join(self.processed_dir, self.MANIFEST_NAME)
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.entries: Dict[str, Dict] = {}
+        # Covers seen since the processor was created, across batches
+        self.live_ids = set()
+        self.pool = None
+        self.processed = self.cached = self.failed = 0
+        self.source_bytes = self.output_bytes = 0
+
+        if Image is None:
+            return
+        self.thumb_format = "webp" if features.check("webp") else "jpg"
+        os.makedirs(self.processed_dir, exist_ok=True)
+        try:
+            if os.path.exists(self.manifest_path):
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == PROCESSOR_VERSION:
+                    self.entries = manifest.get("images", {})
+        except Exception as e:
+            self.logger.warning(f"Could not load processed image manifest, starting empty: {e}")
+            self.entries = {}
+
+    @staticmethod
+    def available() -> bool:
+        return Image is not None
+
+    def _is_cached(self, img_id: str) -> bool:
+        info = self.entries.get(img_id)
+        if not info:
+            return False
+        return (os.path.exists(os.path.join(self.processed_dir, f"{img_id}.jpg")) and
+                os.path.exists(os.path.join(self.processed_dir, f"{img_id}.{info['thumb']}")))
+
+    def process(self, game_data: List[Dict], imgs_dir: str, progress=None):
+        """Process all covers in imgs_dir and record dimensions and colour in each game entry"""
+        self.process_batch(game_data, imgs_dir, progress)
+        self.finish()
+
+    def process_batch(self, game_data: List[Dict], imgs_dir: str, progress=None):
+        """Process the covers of some games of the index, finish() once all games were seen"""
+        img_ids = sorted({game["imgID"] for game in game_data if game.get("imgID")} - self.live_ids)
+        self.live_ids.update(img_ids)
+        pending = [img_id for img_id in img_ids
+                   if not self._is_cached(img_id) and os.path.exists(os.path.join(imgs_dir, f"{img_id}.jpg"))]
+        self.cached += len(img_ids) - len(pending)
+
+        if pending:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            futures = {
+                self.pool.submit(process_image, os.path.join(imgs_dir, f"{img_id}.jpg"),
+                                 self.processed_dir, img_id, self.thumb_format): img_id
+                for img_id in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                img_id = futures[future]
+                try:
+                    self.entries[img_id] = future.result()
+                    self.processed += 1
+                except Exception as e:
+                    self.failed += 1
+                    self.entries.pop(img_id, None)
+                    self.logger.debug(f"Could not process image {img_id}: {e}")
+                if progress and (done % 50 == 0 or done == len(futures)):
+                    progress.set_current_game(f"Processing images ({done}/{len(futures)})...")
+
+        thumbs_dir = os.path.join(imgs_dir, THUMBS_DIR)
+        os.makedirs(thumbs_dir, exist_ok=True)
+        for img_id in img_ids:
+            info = self.entries.get(img_id)
+            if not info or not self._is_cached(img_id):
+                continue
+            _link_or_copy(os.path.join(self.processed_dir, f"{img_id}.jpg"), os.path.join(imgs_dir, f"{img_id}.jpg"))
+            _link_or_copy(os.path.join(self.processed_dir, f"{img_id}.{info['thumb']}"),
+                          os.path.join(thumbs_dir, f"{img_id}.{info['thumb']}"))
+            self.source_bytes += info["sourceBytes"]
+            self.output_bytes += info["bytes"]
+
+        for game in game_data:
+            info = self.entries.get(game.get("imgID"))
+            if info:
+                game["imgWidth"] = info["width"]
+                game["imgHeight"] = info["height"]
+                game["imgColor"] = info["color"]
+                game["thumb"] = info["thumb"]
+
+    def finish(self):
+        """Stop the pool and keep only the results of covers that are in the index"""
+        if self.pool:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+        self._save(self.live_ids)
+        self.logger.info(f"Image processing done: {self.processed} processed ({self.cached} already processed), "
+                         f"{self.failed} failed, {self.source_bytes // 1024} KB of covers stored as "
+                         f"{self.output_bytes // 1024} KB with thumbnails")
+
+    def _save(self, live_ids):
+        """Write the manifest and drop results for covers no longer in the index"""
+        self.entries = {img_id: info for img_id, info in self.entries.items() if img_id in live_ids}
+        tmp_path = f"{self.manifest_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": PROCESSOR_VERSION, "images": self.entries}, f)
+            os.replace(tmp_path, self.manifest_path)
+        except Exception as e:
+            self.logger.warning(f"Could not save processed image manifest: {e}")
+            return
+
+        for name in os.listdir(self.processed_dir):
+            if name == self.MANIFEST_NAME:
+                continue
+            if name.split(".", 1)[0] not in self.entries:
+                try:
+                    os.remove(os.path.join(self.processed_dir, name))
+                except OSError:
+                    pass
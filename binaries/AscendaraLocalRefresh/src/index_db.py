@@ -0,0 +1,155 @@
+"""
+Index Database
+SQLite copy of the game index with full text search over game names
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+from typing import Dict, Optional
+
+DB_SCHEMA_VERSION = 1
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3, "TB": 1024 ** 4}
+
+SCHEMA = """
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE games (
+    id INTEGER PRIMARY KEY,
+    game_id TEXT,
+    name TEXT NOT NULL,
+    size_bytes INTEGER,
+    weight INTEGER NOT NULL DEFAULT 0,
+    online INTEGER NOT NULL DEFAULT 0,
+    dlc INTEGER NOT NULL DEFAULT 0,
+    latest_update TEXT,
+    img_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE game_categories (
+    game INTEGER NOT NULL REFERENCES games(id),
+    category TEXT NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_games_game_id ON games(game_id);
+CREATE INDEX idx_games_weight ON games(weight DESC);
+CREATE INDEX idx_games_size ON games(size_bytes);
+CREATE INDEX idx_games_latest_update ON games(latest_update DESC);
+CREATE INDEX idx_games_flags ON games(online, dlc);
+CREATE INDEX idx_game_categories ON game_categories(category, game);
+"""
+
+
+def parse_size_bytes(size) -> Optional[int]:
+    """Turn sizes like '12.5 GB' into bytes"""
+    match = re.search(r'(\d+(?:[.,]\d+)?)\s*([KMGT]B)', str(size or ""), re.IGNORECASE)
+    if not match:
+        return None
+    return int(float(match.group(1).replace(",", ".")) * SIZE_UNITS[match.group(2).upper()])
+
+
+def _to_int(value) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def fts5_available() -> bool:
+    try:
+        connection = sqlite3.connect(":memory:")
+        try:
+            connection.execute("CREATE VIRTUAL TABLE probe USING fts5(name)")
+            return True
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return False
+
+
+class IndexDatabase:
+    """
+    Builds ascendara_games.db next to the JSON index.
+
+    games.id is the entry's position in ascendara_games.json and games.data holds the
+    full entry, so a query result can be used exactly like a JSON entry. Name search
+    goes through the games_fts table when SQLite has FTS5, e.g.
+
+        SELECT g.data FROM games_fts JOIN games g ON g.id = games_fts.rowid
+        WHERE games_fts MATCH 'cyber*' ORDER BY g.weight DESC LIMIT 50
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.connection = None
+        self.count = 0
+
+    def open(self):
+        if os.path.exists(self.db_file):
+            os.remove(self.db_file)
+        self.connection = sqlite3.connect(self.db_file)
+        # The file is built off to the side and swapped in whole, so no journal is needed
+        self.connection.execute("PRAGMA journal_mode=OFF")
+        self.connection.execute("PRAGMA synchronous=OFF")
+        self.connection.executescript(SCHEMA)
+        return self
+
+    def add(self, entry: Dict, line: Optional[str] = None):
+        """Insert one game entry, line is its already serialised JSON if available"""
+        game_id = self.count
+        self.connection.execute(
+            "INSERT INTO games (id, game_id, name, size_bytes, weight, online, dlc, latest_update, img_id, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                game_id,
+                entry.get("gameID") or None,
+                entry.get("game", ""),
+                parse_size_bytes(entry.get("size")),
+                _to_int(entry.get("weight")),
+                1 if entry.get("online") else 0,
+                1 if entry.get("dlc") else 0,
+                entry.get("latest_update") or None,
+                entry.get("imgID") or None,
+                line if line is not None else json.dumps(entry, ensure_ascii=False),
+            ),
+        )
+        categories = entry.get("category") or []
+        if categories:
+            self.connection.executemany(
+                "INSERT INTO game_categories (game, category) VALUES (?, ?)",
+                [(game_id, category) for category in dict.fromkeys(categories) if category],
+            )
+        self.count += 1
+
+    def finish(self, metadata: Dict):
+        """Build indexes and the search table, then close the database"""
+        rows = [(key, json.dumps(value, ensure_ascii=False)) for key, value in metadata.items()]
+        rows.append(("schemaVersion", json.dumps(DB_SCHEMA_VERSION)))
+        self.connection.executemany("INSERT INTO metadata (key, value) VALUES (?, ?)", rows)
+        # Indexes are created after the bulk insert, which is much faster than maintaining them per row
+        self.connection.executescript(INDEXES)
+        if fts5_available():
+            self.connection.executescript(
+                "CREATE VIRTUAL TABLE games_fts USING fts5("
+                "name, content='games', content_rowid='id', tokenize='unicode61 remove_diacritics 2');"
+                "INSERT INTO games_fts(games_fts) VALUES('rebuild');"
+            )
+        else:
+            self.logger.warning("SQLite was built without FTS5, name search will fall back to LIKE queries")
+        self.connection.commit()
+        self.connection.execute("ANALYZE")
+        self.connection.close()
+        self.connection = None
+        self.logger.info(f"Wrote {self.count} games to {self.db_file}")
+
+    def abort(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+        if os.path.exists(self.db_file):
+            os.remove(self.db_file)
@@ -0,0 +1,119 @@
+"""
+Index Merge
+Merges the games of several sources into one index, the same game found on two sources becomes one entry
+"""
+
+import re
+import zlib
+import logging
+import unicodedata
+from typing import Dict, List, Optional
+
+from utils import encode_game_id
+
+TRADEMARK_RE = re.compile(r'[™®©]')
+NON_WORD_RE = re.compile(r'[^\w]+')
+
+# Fields a duplicate may fill in when the entry kept for the game has no value for them
+FILLABLE_FIELDS = ("size", "version", "imgID", "latest_update", "minReqs")
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """
+    Matching key for a game title: case, accents, trademark signs, punctuation and
+    spacing are ignored, "&" matches "and". Editions are kept, a GOTY edition and the
+    base game are different downloads.
+    """
+    if not title:
+        return ""
+    # Trademark signs go first, NFKD would turn "™" into "tm"
+    title = unicodedata.normalize("NFKD", TRADEMARK_RE.sub("", title).casefold())
+    title = "".join(char for char in title if not unicodedata.combining(char)).replace("&", " and ")
+    return " ".join(NON_WORD_RE.sub(" ", title).replace("_", " ").split())
+
+
+def _weight(game: Dict) -> int:
+    try:
+        return int(game.get("weight") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class IndexMerger:
+    """
+    Builds one index from the games of several sources.
+
+    Sources are added in priority order. The first source that has a game keeps its
+    entry, a later source with the same normalized title adds its download links and
+    its name to the entry's "sources" list and fills in fields the entry is missing.
+    Title keys are looked up in a dict built as games are added, so merging is linear
+    in the number of games. Games of the same source are never merged with each other.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.games: List[Dict] = []
+        self.by_key: Dict[str, Dict] = {}
+        self.game_ids = set()
+        # (source, original gameID) of every game that has another gameID in the merged index
+        self.id_map: Dict[tuple, str] = {}
+        self.stats: Dict[str, Dict] = {}
+
+    def add_source(self, source_name: str, games: List[Dict]) -> Dict:
+        """Merge the games of one source, returns the games/duplicates counts of the source"""
+        added = 0
+        duplicates = 0
+        for game in games:
+            key = normalize_title(game.get("game"))
+            existing = self.by_key.get(key) if key else None
+            if existing is not None and source_name not in existing["sources"]:
+                self._merge_into(existing, game, source_name)
+                duplicates += 1
+                continue
+
+            entry = dict(game)
+            # Links of later sources are added to these lists, the source's own games stay as scraped
+            entry["download_links"] = {provider: list(urls) for provider, urls in (game.get("download_links") or {}).items()}
+            entry["sources"] = [source_name]
+            self._claim_game_id(entry, source_name)
+            self.games.append(entry)
+            if key and existing is None:
+                self.by_key[key] = entry
+            added += 1
+
+        self.stats[source_name] = {"games": added, "duplicates": duplicates}
+        self.logger.info(f"Merged {source_name}: {added} games, {duplicates} already listed by another source")
+        return self.stats[source_name]
+
+    def _merge_into(self, entry: Dict, game: Dict, source_name: str):
+        entry["sources"].append(source_name)
+        if game.get("gameID"):
+            self.id_map[(source_name, game["gameID"])] = entry.get("gameID", "")
+        for provider, urls in (game.get("download_links") or {}).items():
+            known = entry["download_links"].setdefault(provider, [])
+            known.extend(url for url in urls if url not in known)
+        for field in FILLABLE_FIELDS:
+            if not entry.get(field) and game.get(field):
+                entry[field] = game[field]
+        # Weights are view counts, the most viewed copy says the most about popularity
+        if _weight(game) > _weight(entry):
+            entry["weight"] = game["weight"]
+
+    def _claim_game_id(self, entry: Dict, source_name: str):
+        """Keep gameIDs unique across sources, a colliding ID is derived again from the source name"""
+        game_id = entry.get("gameID")
+        if not game_id:
+            return
+        new_id = game_id
+        salt = 0
+        while new_id in self.game_ids:
+            new_id = encode_game_id(zlib.crc32(f"{source_name}:{game_id}:{salt}".encode("utf-8")))
+            salt += 1
+        if new_id != game_id:
+            entry["gameID"] = new_id
+            self.id_map[(source_name, game_id)] = new_id
+        self.game_ids.add(new_id)
+
+    def game_id_for(self, source_name: str, game_id: str) -> str:
+        """The gameID a game of a source has in the merged index"""
+        return self.id_map.get((source_name, game_id), game_id)
@@ -0,0 +1,309 @@
+"""
+Index Store
+Versioned publish layout, a refresh goes live by switching one pointer file
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import struct
+import logging
+from typing import Dict, List, Optional
+
+if sys.platform == 'win32':
+    import ctypes
+    from ctypes import wintypes
+
+# Everything a published index consists of, each one is optional
+PUBLISHED_NAMES = ("ascendara_games.json", "imgs", "shards", "ascendara_games.db")
+
+VERSION_DIR_RE = re.compile(r'^v(\d+)$')
+
+# Directory junctions, folder links on Windows that need no privilege and can be retargeted in place
+IO_REPARSE_TAG_MOUNT_POINT = 0xA0000003
+FSCTL_SET_REPARSE_POINT = 0x000900A4
+
+# Field updates published for a version after it went live, stored next to its folder
+UPDATES_SUFFIX = ".updates.json"
+
+
+class IndexStore:
+    """
+    Published indexes live in index/v<N>/, index/current.json names the live one.
+
+    A new version is filled while the live one stays untouched and goes live when the
+    pointer file is replaced, which is a single rename. The previous version is kept so
+    rollback() can switch back instantly, older ones are removed by collect_garbage().
+    A published version is never written to again, fields that arrive later (view counts)
+    go to a small v<N>.updates.json next to it that the pointer file names.
+
+    The UI reads ascendara_games.json and imgs/ at the top of the index folder. Those
+    paths are symlinks into the live version, each switched by one rename as well. On
+    Windows folders are directory junctions instead, which need no developer mode and are
+    switched by rewriting the junction's target, and files without symlinks are hard
+    links. Only where neither works (FAT drives) they fall back to copies.
+    """
+
+    POINTER_NAME = "current.json"
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.index_dir = os.path.join(output_dir, "index")
+        self.pointer_file = os.path.join(self.index_dir, self.POINTER_NAME)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def version_path(self, version: int) -> str:
+        return os.path.join(self.index_dir, f"v{version}")
+
+    def updates_path(self, version: int) -> str:
+        return os.path.join(self.index_dir, f"v{version}{UPDATES_SUFFIX}")
+
+    def versions(self) -> List[int]:
+        """All version folders on disk, oldest first"""
+        try:
+            names = os.listdir(self.index_dir)
+        except FileNotFoundError:
+            return []
+        found = []
+        for name in names:
+            match = VERSION_DIR_RE.match(name)
+            if match and os.path.isdir(os.path.join(self.index_dir, name)):
+                found.append(int(match.group(1)))
+        return sorted(found)
+
+    def _read_pointer(self) -> Dict:
+        try:
+            with open(self.pointer_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Could not read index pointer: {e}")
+            return {}
+
+    def current_version(self) -> Optional[int]:
+        version = self._read_pointer().get("version")
+        return version if isinstance(version, int) and os.path.isdir(self.version_path(version)) else None
+
+    def current_path(self) -> Optional[str]:
+        version = self.current_version()
+        return self.version_path(version) if version is not None else None
+
+    def stage(self) -> int:
+        """Create an empty folder for the next version, returns its number"""
+        versions = self.versions()
+        version = (versions[-1] + 1) if versions else 1
+        os.makedirs(self.version_path(version))
+        return version
+
+    def _remove_version(self, version: int):
+        shutil.rmtree(self.version_path(version), ignore_errors=True)
+        try:
+            os.remove(self.updates_path(version))
+        except OSError:
+            pass
+
+    def discard(self, version: int):
+        """Remove a staged version that was never published"""
+        if version != self.current_version():
+            self._remove_version(version)
+
+    def discard_unpublished(self):
+        """Remove versions newer than the live one, left behind by runs that did not finish"""
+        current = self.current_version() or 0
+        for version in self.versions():
+            if version > current:
+                self.logger.info(f"Removing unpublished index version {version}")
+                self._remove_version(version)
+
+    def publish(self, version: int):
+        """Make a staged version the live one"""
+        pointer = {
+            "version": version,
+            "path": self._relative(self.version_path(version)),
+            "previous": self.current_version(),
+            "publishedAt": time.time(),
+        }
+        # Rolling back to a version brings back its updates too
+        if os.path.exists(self.updates_path(version)):
+            pointer["updates"] = self._relative(self.updates_path(version))
+        self._write_pointer(pointer)
+        self.logger.info(f"Published index version {version}")
+        self.link_current()
+
+    def publish_updates(self, updates: Dict[str, Dict]):
+        """Publish {gameID: fields} for entries of the live version without rewriting it"""
+        pointer = self._read_pointer()
+        version = pointer.get("version")
+        if not isinstance(version, int):
+            raise RuntimeError("No live index version to update")
+        updates_file = self.updates_path(version)
+        tmp_file = updates_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": version, "games": updates}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, updates_file)
+        pointer["updates"] = self._relative(updates_file)
+        self._write_pointer(pointer)
+        self.logger.info(f"Published updates for {len(updates)} games of index version {version}")
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.output_dir).replace(os.sep, '/')
+
+    def _write_pointer(self, pointer: Dict):
+        tmp_file = self.pointer_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(pointer, f, indent=2)
+        os.replace(tmp_file, self.pointer_file)
+
+    def rollback(self) -> bool:
+        """Switch back to the version that was live before the current one"""
+        previous = self._read_pointer().get("previous")
+        if not isinstance(previous, int) or not os.path.isdir(self.version_path(previous)):
+            self.logger.error("No previous index version to roll back to")
+            return False
+        self.publish(previous)
+        return True
+
+    def collect_garbage(self):
+        """Remove versions older than the live one and the one before it"""
+        pointer = self._read_pointer()
+        keep = {pointer.get("version"), pointer.get("previous")}
+        current = pointer.get("version") or 0
+        for version in self.versions():
+            if version not in keep and version < current:
+                # Files still open in an old version (Windows) keep it until the next run
+                self._remove_version(version)
+
+    # Top level paths read by the UI
+
+    def link_current(self):
+        """Point the top level index paths at the live version"""
+        current = self.current_path()
+        if current is None:
+            return
+        for name in PUBLISHED_NAMES:
+            self._link(name, os.path.join(current, name))
+
+    def _link(self, name: str, target: str):
+        legacy = os.path.join(self.output_dir, name)
+        if not os.path.exists(target):
+            _remove(legacy)
+            return
+        if sys.platform == 'win32' and os.path.isdir(target):
+            try:
+                self._link_junction(legacy, target)
+                return
+            except OSError as e:
+                self.logger.warning(f"Could not link {name} with a junction, copying it as links: {e}")
+        tmp_path = legacy + ".next"
+        _remove(tmp_path)
+        is_dir = os.path.isdir(target)
+        try:
+            os.symlink(os.path.relpath(target, self.output_dir), tmp_path, target_is_directory=is_dir)
+        except (OSError, NotImplementedError):
+            _hard_link_copy(target, tmp_path)
+        try:
+            os.replace(tmp_path, legacy)
+        except OSError:
+            # Folders, and folder links on Windows, can not be replaced by a rename
+            old_path = legacy + ".old"
+            _remove(old_path)
+            os.replace(legacy, old_path)
+            os.replace(tmp_path, legacy)
+            _remove(old_path)
+
+    def _link_junction(self, legacy: str, target: str):
+        if _is_junction(legacy):
+            # The folder stays in place, only the target it resolves to changes
+            _point_junction(legacy, target)
+            return
+        # First publish, or switching from a layout without junctions
+        tmp_path = legacy + ".next"
+        _remove(tmp_path)
+        os.mkdir(tmp_path)
+        _point_junction(tmp_path, target)
+        if os.path.lexists(legacy):
+            old_path = legacy + ".old"
+            _remove(old_path)
+            os.replace(legacy, old_path)
+            os.replace(tmp_path, legacy)
+            _remove(old_path)
+        else:
+            os.replace(tmp_path, legacy)
+
+
+def _is_junction(path: str) -> bool:
+    try:
+        return getattr(os.lstat(path), "st_reparse_tag", 0) == IO_REPARSE_TAG_MOUNT_POINT
+    except OSError:
+        return False
+
+
+def _point_junction(path: str, target: str):
+    """Make the empty folder or junction at path resolve to target, a single reparse point write"""
+    target = os.path.abspath(target)
+    substitute_name = ("\\??\\" + target).encode("utf-16-le")
+    print_name = target.encode("utf-16-le")
+    path_buffer = substitute_name + b"\0\0" + print_name + b"\0\0"
+    # REPARSE_DATA_BUFFER of a mount point: tag, data length, reserved, then name offsets and lengths
+    data = struct.pack("<IHHHHHH", IO_REPARSE_TAG_MOUNT_POINT, 8 + len(path_buffer), 0,
+                       0, len(substitute_name), len(substitute_name) + 2, len(print_name)) + path_buffer
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = (wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                     wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE)
+    kernel32.DeviceIoControl.argtypes = (wintypes.HANDLE, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD,
+                                         wintypes.LPVOID, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                         wintypes.LPVOID)
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    generic_write = 0x40000000
+    open_existing = 3
+    open_reparse_point = 0x00200000 | 0x02000000  # FILE_FLAG_OPEN_REPARSE_POINT | FILE_FLAG_BACKUP_SEMANTICS
+    handle = kernel32.CreateFileW(path, generic_write, 0, None, open_existing, open_reparse_point, None)
+    if handle is None or handle == wintypes.HANDLE(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        buffer = ctypes.create_string_buffer(data, len(data))
+        returned = wintypes.DWORD()
+        if not kernel32.DeviceIoControl(handle, FSCTL_SET_REPARSE_POINT, buffer, len(data), None, 0,
+                                        ctypes.byref(returned), None):
+            raise ctypes.WinError(ctypes.get_last_error())
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _remove(path: str):
+    """Remove a file, folder, or link without following it"""
+    if _is_junction(path):
+        os.rmdir(path)
+    elif os.path.islink(path):
+        if sys.platform == 'win32' and os.path.isdir(path):
+            os.rmdir(path)
+        else:
+            os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _hard_link_copy(src: str, dst: str):
+    """Copy a file or folder as hard links, falling back to real copies across filesystems"""
+    if not os.path.isdir(src):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+        return
+    for root, _, files in os.walk(src):
+        dest_dir = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(dest_dir, exist_ok=True)
+        for name in files:
+            try:
+                os.link(os.path.join(root, name), os.path.join(dest_dir, name))
+            except OSError:
+                shutil.copy2(os.path.join(root, name), os.path.join(dest_dir, name))
@@ -0,0 +1,156 @@
+"""
+Index Writer
+Writes game entries to the index file and, optionally, to NDJSON shards, and reads shards back
+"""
+
+import os
+import json
+import shutil
+from typing import Dict, Iterable, Iterator, Optional
+
+from index_db import IndexDatabase
+
+SHARD_SIZE = 1000
+SHARD_HEADER_NAME = "index.json"
+SHARD_LAYOUT_VERSION = 1
+
+
+class IndexWriter:
+    """
+    Writes the game index one entry at a time instead of serialising it in one go.
+
+    A single-source refresh writes each page of games as the scraper finishes it, so only
+    the pages still waiting for covers are in memory. Merged multi-source indexes and
+    incremental refreshes, which need the whole list to merge, are written in one batch.
+
+    games_file gets the usual {"games": [...], "metadata": {...}} document with one
+    entry per line, so it stays readable by json.load / JSON.parse. When shards_dir is
+    set, entries are also written to games-NNNN.ndjson files of shard_size entries and a
+    small index.json header lists the metadata and shards, letting consumers load the
+    catalog lazily. When db_file is set, the same pass fills a searchable SQLite copy.
+    """
+
+    def __init__(self, games_file: Optional[str] = None, shards_dir: Optional[str] = None,
+                 shard_size: int = SHARD_SIZE, db_file: Optional[str] = None):
+        self.games_file = games_file
+        self.shards_dir = shards_dir
+        self.shard_size = max(1, shard_size)
+        self.database = IndexDatabase(db_file) if db_file else None
+        self.count = 0
+        self.shards = []
+        self._games_handle = None
+        self._shard_handle = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+
+    def open(self):
+        if self.games_file:
+            self._games_handle = open(self.games_file, 'w', encoding='utf-8')
+            self._games_handle.write('{"games": [')
+        if self.shards_dir:
+            if os.path.exists(self.shards_dir):
+                shutil.rmtree(self.shards_dir)
+            os.makedirs(self.shards_dir)
+        if self.database:
+            self.database.open()
+        return self
+
+    def write(self, entry: Dict):
+        """Append a single game entry"""
+        line = json.dumps(entry, ensure_ascii=False)
+        if self._games_handle:
+            self._games_handle.write(",\n" if self.count else "\n")
+            self._games_handle.write(line)
+        if self.shards_dir:
+            if self._shard_handle is None or self.shards[-1]["count"] >= self.shard_size:
+                self._next_shard()
+            self._shard_handle.write(line)
+            self._shard_handle.write("\n")
+            self.shards[-1]["count"] += 1
+        if self.database:
+            self.database.add(entry, line)
+        self.count += 1
+
+    def write_all(self, entries: Iterable[Dict]):
+        for entry in entries:
+            self.write(entry)
+
+    def _next_shard(self):
+        if self._shard_handle:
+            self._shard_handle.close()
+        name = f"games-{len(self.shards):04d}.ndjson"
+        self._shard_handle = open(os.path.join(self.shards_dir, name), 'w', encoding='utf-8')
+        self.shards.append({"file": name, "count": 0})
+
+    def close(self, metadata: Dict):
+        """Finish all outputs, metadata is written last since it holds the final game count"""
+        if self._games_handle:
+            self._games_handle.write("\n],\n")
+            self._games_handle.write(f'"metadata": {json.dumps(metadata, ensure_ascii=False)}}}\n')
+            self._games_handle.close()
+            self._games_handle = None
+        if self.shards_dir:
+            if self._shard_handle:
+                self._shard_handle.close()
+                self._shard_handle = None
+            header = {
+                "version": SHARD_LAYOUT_VERSION,
+                "metadata": metadata,
+                "total": self.count,
+                "shardSize": self.shard_size,
+                "shards": self.shards,
+            }
+            with open(os.path.join(self.shards_dir, SHARD_HEADER_NAME), 'w', encoding='utf-8') as f:
+                json.dump(header, f, ensure_ascii=False)
+        if self.database:
+            self.database.finish(metadata)
+
+    def abort(self):
+        """Close and remove partial output"""
+        for handle in (self._games_handle, self._shard_handle):
+            if handle:
+                handle.close()
+        self._games_handle = self._shard_handle = None
+        if self.games_file and os.path.exists(self.games_file):
+            os.remove(self.games_file)
+        if self.shards_dir and os.path.exists(self.shards_dir):
+            shutil.rmtree(self.shards_dir, ignore_errors=True)
+        if self.database:
+            self.database.abort()
+
+
+def rebuild_from_index(games_file: str, shards_dir: Optional[str] = None, db_file: Optional[str] = None,
+                       shard_size: int = SHARD_SIZE):
+    """Rebuild the shard layout and/or database from an existing index file"""
+    with open(games_file, 'r', encoding='utf-8') as f:
+        index_data = json.load(f)
+    with IndexWriter(shards_dir=shards_dir, shard_size=shard_size, db_file=db_file) as writer:
+        writer.write_all(index_data.get("games", []))
+        writer.close(index_data.get("metadata", {}))
+    return writer.count
+
+
+def read_shard_header(shards_dir: str) -> Optional[Dict]:
+    """The header of a shard layout, None if there is none or its layout is unknown"""
+    try:
+        with open(os.path.join(shards_dir, SHARD_HEADER_NAME), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if header.get("version") != SHARD_LAYOUT_VERSION or not isinstance(header.get("shards"), list):
+        return None
+    return header
+
+
+def iter_shard_entries(shards_dir: str, header: Dict) -> Iterator[Dict]:
+    """Yield the entries of a shard layout one line at a time, in index order"""
+    for shard in header["shards"]:
+        with open(os.path.join(shards_dir, shard["file"]), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,354 @@
+"""
+Politeness Profiles
+How hard a scraper may hit each host: concurrency, request rate, backoff and retries
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Limits of one lane, a group of requests to the same host such as "pages" or "images".
+# A lane has at most `concurrency` requests in flight and sends `rate` per second after
+# a burst of `burst` (rate None is unlimited). A request is tried `attempts` times, waiting
+# backoff(attempt) seconds in between, and the lane may retry `retryBudget` times per run
+# in total (None is unlimited). Periodic lanes such as keep-alive pings use `interval`.
+DEFAULT_LANE = {
+    "concurrency": 4,
+    "rate": None,
+    "burst": 1,
+    "attempts": 3,
+    "backoff": {"curve": "exponential", "initial": 1.0, "max": 30.0, "jitter": 0.0},
+    "retryBudget": None,
+    "interval": None,
+}
+
+BACKOFF_CURVES = ("constant", "linear", "exponential")
+
+
+class TokenBucket:
+    """
+    Token bucket allowing bursts of `burst` requests and `rate` requests per second after.
+
+    On a 429 the rate is halved and the bucket is blocked for the Retry-After period,
+    every success then adds back a little rate until the configured rate is reached.
+    """
+
+    def __init__(self, rate: float, burst: int, min_rate: float = 0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self) -> float:
+        """Take a token if one is available, returns 0 or how long to wait before trying again"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            wait_time = self._take()
+            if not wait_time:
+                return
+            time.sleep(wait_time)
+
+    async def acquire_async(self):
+        """Wait on the event loop until a request may be sent"""
+        while True:
+            wait_time = self._take()
+            if not wait_time:
+                return
+            await asyncio.sleep(wait_time)
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """Slow down after the host answered 429"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Requests already in flight when the first 429 arrived do not slow down further
+            if now >= self.blocked_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+
+    def recover(self):
+        """Raise the rate back towards the configured one after a success"""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _positive(value, cast, minimum, allow_none=False):
+    if value is None and allow_none:
+        return None
+    value = cast(value)
+    if value < minimum:
+        raise ValueError(f"must be at least {minimum}")
+    return value
+
+
+def validate_lane(settings: Dict) -> Dict:
+    """Check the values of one lane, raises ValueError naming the first bad one"""
+    checked = {}
+    for key, value in settings.items():
+        try:
+            if key == "concurrency" or key == "burst" or key == "attempts":
+                checked[key] = _positive(value, int, 1)
+            elif key == "rate" or key == "interval":
+                checked[key] = _positive(value, float, 0.001, allow_none=True)
+            elif key == "retryBudget":
+                checked[key] = _positive(value, int, 0, allow_none=True)
+            elif key == "backoff":
+                if not isinstance(value, dict):
+                    raise ValueError("must be an object")
+                backoff = {}
+                for name, setting in value.items():
+                    if name == "curve":
+                        if setting not in BACKOFF_CURVES:
+                            raise ValueError(f"curve must be one of {', '.join(BACKOFF_CURVES)}")
+                        backoff[name] = setting
+                    elif name in ("initial", "max"):
+                        backoff[name] = _positive(setting, float, 0.0)
+                    elif name == "jitter":
+                        backoff[name] = min(1.0, _positive(setting, float, 0.0))
+                    else:
+                        raise ValueError(f"unknown setting {name}")
+                checked[key] = backoff
+            else:
+                raise ValueError("unknown setting")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{key}: {e}")
+    return checked
+
+
+class HostPolicy:
+    """
+    Enforces one lane of a profile and counts what it achieved.
+
+    Blocking code sends each request inside slot(), the fetch engine keeps its own
+    concurrency slots on the event loop and waits on the token bucket directly. Failed
+    requests are retried while take_retry() allows it, after waiting delay(attempt).
+    """
+
+    def __init__(self, name: str, settings: Dict, lane: Optional["HostPolicy"] = None):
+        self.name = name
+        self.settings = settings
+        self.concurrency = settings["concurrency"]
+        self.rate = settings["rate"]
+        self.burst = settings["burst"]
+        self.attempts = settings["attempts"]
+        self.backoff_curve = dict(DEFAULT_LANE["backoff"], **settings["backoff"])
+        self.interval = settings["interval"]
+        self.bucket = TokenBucket(self.rate, self.burst) if self.rate else None
+        self.slots = threading.BoundedSemaphore(self.concurrency)
+        # Hosts split off a lane share its retry budget and add to its counts
+        self.lane = lane
+        self.per_host = False
+        self.retries_left = settings["retryBudget"]
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.first_sent = None
+        self.last_sent = None
+
+    def for_host(self, host: str) -> "HostPolicy":
+        """A policy with the same limits for one host of the lane, e.g. one image CDN"""
+        self.per_host = True
+        return HostPolicy(f"{self.name} {host}", self.settings, lane=self)
+
+    def _count(self, counter: str):
+        now = time.monotonic()
+        for policy in (self, self.lane) if self.lane else (self,):
+            with policy.lock:
+                setattr(policy, counter, getattr(policy, counter) + 1)
+                if counter == "requests":
+                    if policy.first_sent is None:
+                        policy.first_sent = now
+                    policy.last_sent = now
+
+    def record_request(self):
+        self._count("requests")
+
+    def acquire(self):
+        """Block until the lane's rate allows the next request"""
+        if self.bucket:
+            self.bucket.acquire()
+        self.record_request()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the lane's concurrency slots and wait for its rate"""
+        with self.slots:
+            self.acquire()
+            yield
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number attempt (1 for the first retry)"""
+        curve = self.backoff_curve
+        initial = curve["initial"]
+        if curve["curve"] == "constant":
+            wait_time = initial
+        elif curve["curve"] == "linear":
+            wait_time = initial * attempt
+        else:
+            wait_time = initial * 2 ** max(0, attempt - 1)
+        wait_time = min(curve["max"], wait_time)
+        if curve["jitter"]:
+            wait_time *= 1 + random.uniform(-curve["jitter"], curve["jitter"])
+        return wait_time
+
+    def take_retry(self) -> bool:
+        """Use up one retry of the lane's budget, False once it is spent"""
+        owner = self.lane or self
+        with owner.lock:
+            if owner.retries_left is not None:
+                if owner.retries_left <= 0:
+                    return False
+                owner.retries_left -= 1
+        self._count("retries")
+        return True
+
+    def backoff(self, retry_after: Optional[float] = None):
+        """The host answered 429, slow the lane down"""
+        self._count("rate_limited")
+        if self.bucket:
+            self.bucket.backoff(retry_after)
+
+    def recover(self):
+        if self.bucket:
+            self.bucket.recover()
+
+    def summary(self) -> Optional[str]:
+        """Achieved request rate of the lane, None if it sent nothing"""
+        with self.lock:
+            if not self.requests:
+                return None
+            elapsed = self.last_sent - self.first_sent
+            # Requests sent within the burst say nothing about the sustained rate
+            if self.requests > self.burst and elapsed > 0:
+                achieved = f"{(self.requests - 1) / elapsed:.2f} req/s over {elapsed:.1f}s"
+            else:
+                achieved = "all within one burst"
+            limit = f"limit {self.rate:g} req/s" if self.rate else "no rate limit"
+            scope = " per host" if self.per_host else ""
+            return (f"{self.name}: {self.requests} requests, {achieved} "
+                    f"({limit}, {self.concurrency} concurrent{scope}), "
+                    f"{self.retries} retries, {self.rate_limited} rate limited")
+
+
+class PolitenessProfile:
+    """
+    The lanes of one source.
+
+    A lane's limits come from the source's defaults, then values the scraper derives
+    from command line options such as --view-workers, then the user's overrides from
+    the settings file or --profile. Lanes are built on first use and shared from then on.
+    """
+
+    def __init__(self, source_name: str, defaults: Dict[str, Dict], overrides: Optional[Dict[str, Dict]] = None):
+        self.source_name = source_name
+        self.defaults = defaults
+        self.overrides = overrides or {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.lanes: Dict[str, HostPolicy] = {}
+        self.lock = threading.Lock()
+        for lane in self.overrides:
+            if lane not in self.defaults:
+                self.logger.warning(f"{source_name} has no '{lane}' lane, its profile settings are ignored")
+
+    def lane(self, name: str, **fallback) -> HostPolicy:
+        """The policy of a lane, fallback values apply unless the user's profile sets them"""
+        with self.lock:
+            policy = self.lanes.get(name)
+            if policy is None:
+                settings = dict(DEFAULT_LANE, **self.defaults.get(name, {}))
+                settings.update((key, value) for key, value in fallback.items() if value is not None)
+                override = self.overrides.get(name, {})
+                settings.update(override)
+                if "backoff" in override:
+                    settings["backoff"] = dict(self.defaults.get(name, {}).get("backoff", {}), **override["backoff"])
+                policy = self.lanes[name] = HostPolicy(name, settings)
+            return policy
+
+    def log_request_rates(self, host_policies=()):
+        """Log what every lane that sent requests achieved, hosts split off a lane at debug level"""
+        for policy in self.lanes.values():
+            summary = policy.summary()
+            if summary:
+                self.logger.info(f"{self.source_name} {summary}")
+        for policy in host_policies:
+            summary = policy.summary()
+            if summary:
+                self.logger.debug(f"{self.source_name} {summary}")
+
+
+def parse_profiles(data, origin: str) -> Dict[str, Dict[str, Dict]]:
+    """
+    Validate profiles given as {source: {lane: {setting: value}}}.
+
+    Bad lanes are skipped with a warning naming origin, the rest of the profile still applies.
+    """
+    profiles = {}
+    if not isinstance(data, dict):
+        logging.warning(f"Ignoring refresh profiles from {origin}: expected an object of sources")
+        return profiles
+    for source, lanes in data.items():
+        if not isinstance(lanes, dict):
+            logging.warning(f"Ignoring refresh profile of {source} from {origin}: expected an object of lanes")
+            continue
+        for lane, settings in lanes.items():
+            try:
+                if not isinstance(settings, dict):
+                    raise ValueError("expected an object of settings")
+                profiles.setdefault(source.lower(), {})[lane] = validate_lane(settings)
+            except ValueError as e:
+                logging.warning(f"Ignoring {source} '{lane}' lane from {origin}: {e}")
+    return profiles
+
+
+def merge_profiles(base: Dict[str, Dict[str, Dict]], overrides: Dict[str, Dict[str, Dict]]) -> Dict[str, Dict[str, Dict]]:
+    """Profiles with the settings of overrides taking precedence, lane by lane"""
+    merged = {source: {lane: dict(settings) for lane, settings in lanes.items()} for source, lanes in base.items()}
+    for source, lanes in overrides.items():
+        for lane, settings in lanes.items():
+            target = merged.setdefault(source, {}).setdefault(lane, {})
+            if "backoff" in settings and "backoff" in target:
+                settings = dict(settings, backoff=dict(target["backoff"], **settings["backoff"]))
+            target.update(settings)
+    return merged
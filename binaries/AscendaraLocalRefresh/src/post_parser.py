@@ -0,0 +1,210 @@
+"""
+Post Parser
+Single-pass extraction of game fields from SteamRIP post HTML
+"""
+
+import re
+import html
+import json
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+# Download hosts and the provider name used in download_links, subdomains match too
+PROVIDER_HOSTS = {
+    "gofile.io": "gofile",
+    "qiwi.gg": "qiwi",
+    "megadb.net": "megadb",
+    "pixeldrain.com": "pixeldrain",
+    "bzzhr.to": "buzzheavier",
+    "vikingfile.com": "vikingfile",
+    "datanodes.to": "datanodes",
+    "1fichier.com": "1fichier",
+    "fileditchfiles.me": "fileditch",
+    "fileditch.com": "fileditch",
+}
+
+# <strong> labels of the minimum requirements block and their minReqs keys
+MIN_REQ_LABELS = {
+    "os": "os",
+    "processor": "cpu",
+    "memory": "ram",
+    "graphics": "gpu",
+    "directx": "directx",
+    "storage": "storage",
+}
+
+VERSION_NOISE_WORDS = frozenset({
+    'latest', 'vr', 'co-op', 'coop', 'multiplayer', 'online', 'zombies',
+    'all', 'dlcs', 'dlc', 'complete', 'edition', 'goty', 'game', 'year',
+    'the', 'of', 'and', 'with', 'plus', 'update', 'updated', 'final',
+    'definitive', 'ultimate', 'deluxe', 'premium', 'gold', 'silver',
+    'remastered', 'enhanced', 'extended', 'expanded', 'full', 'bonus'
+})
+
+STRONG_VALUE_RE = re.compile(r'</strong>([^<]*)', re.IGNORECASE)
+# Matching the whole <a> tag first keeps the scan anchored on a literal, href is read from the tag after
+DOWNLOAD_BUTTON_RE = re.compile(r'<a\s[^>]*class="shortc-button[^>]*>', re.IGNORECASE)
+HREF_RE = re.compile(r'href="([^"]+)"')
+SIZE_RE = re.compile(r'\d+(?:\.\d+)?\s*(?:GB|MB)', re.IGNORECASE)
+VERSION_PREFIX_RE = re.compile(r'^(?:v(?:ersion)?\.?\s*|Build\s*|Patch\s*)', re.IGNORECASE)
+PARENTHESES_RE = re.compile(r'\([^)]*\)')
+VERSION_SPLIT_RE = re.compile(r'\s*\+\s*|\s+')
+DIGIT_RE = re.compile(r'\d')
+# Plain substring checks on one lowercased copy beat case-insensitive regexes by about 10x
+ONLINE_KEYWORDS = ('multiplayer', 'co-op', 'online')
+
+
+def parse_strong_fields(content: str) -> Dict[str, str]:
+    """
+    Collect every <strong>Label</strong> value pair of a post in one scan.
+
+    Keys are the lowercased label text without a trailing colon, values are the raw
+    text up to the next tag. Only the first non-empty value of each label is kept.
+    """
+    fields = {}
+    for match in STRONG_VALUE_RE.finditer(content):
+        value = match.group(1)
+        if not value:
+            continue
+        end = match.start()
+        label = content[content.rfind('>', 0, end) + 1:end].rstrip()
+        if label.endswith(':'):
+            label = label[:-1]
+        key = label.strip().lower()
+        if key and key not in fields:
+            fields[key] = value
+    return fields
+
+
+def _field_ending_with(fields: Dict[str, str], suffix: str) -> Optional[str]:
+    """Value of the first label ending in suffix, e.g. 'Game Size' also matches 'Total Game Size'"""
+    for key, value in fields.items():
+        if key.endswith(suffix):
+            return value
+    return None
+
+
+def _strip_colon(value: str) -> str:
+    value = value.strip()
+    if value.startswith(':'):
+        value = value[1:].strip()
+    return value
+
+
+def classify_link(href: str) -> Optional[str]:
+    """Return the provider for a download link, or None for unknown hosts"""
+    try:
+        host = urlparse(href).hostname or ""
+    except ValueError:
+        return None
+    parts = host.lower().split('.')
+    for i in range(len(parts) - 1):
+        provider = PROVIDER_HOSTS.get('.'.join(parts[i:]))
+        if provider:
+            return provider
+    return None
+
+
+def extract_download_links(content: str) -> Dict[str, List[str]]:
+    download_links = {}
+    for tag in DOWNLOAD_BUTTON_RE.findall(content):
+        href_match = HREF_RE.search(tag)
+        if not href_match:
+            continue
+        href = href_match.group(1)
+        provider = classify_link(href)
+        if provider:
+            download_links.setdefault(provider, []).append(href)
+    return download_links
+
+
+def parse_size(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    match = SIZE_RE.search(value)
+    return match.group(0) if match else ""
+
+
+def parse_version(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    ver = _strip_colon(value).split('|', 1)[0].strip()
+    ver = VERSION_PREFIX_RE.sub('', ver)
+    ver = PARENTHESES_RE.sub('', ver)
+
+    version_parts = []
+    for part in VERSION_SPLIT_RE.split(ver):
+        part = part.strip()
+        if part.lower() in VERSION_NOISE_WORDS:
+            continue
+        if part and (DIGIT_RE.search(part) or part in ('x', 'X')):
+            version_parts.append(part)
+    return ' '.join(version_parts).strip()
+
+
+def parse_min_requirements(fields: Dict[str, str]) -> Optional[Dict[str, str]]:
+    reqs = {}
+    for label, key in MIN_REQ_LABELS.items():
+        value = fields.get(label)
+        if value is not None:
+            reqs[key] = html.unescape(_strip_colon(value))
+    return reqs or None
+
+
+def parse_post(content: str, title: str = "") -> Dict:
+    """Extract all game fields of a post, the keys match the index entry names"""
+    fields = parse_strong_fields(content)
+    released_by = _field_ending_with(fields, "released by")
+    lowered = content.lower()
+    title = title.lower()
+    return {
+        "download_links": extract_download_links(content),
+        "size": parse_size(_field_ending_with(fields, "game size")),
+        "version": parse_version(_field_ending_with(fields, "version")),
+        "releasedBy": html.unescape(released_by.strip()) if released_by else "",
+        "online": any(keyword in lowered or keyword in title for keyword in ONLINE_KEYWORDS),
+        "dlc": "dlc" in lowered,
+        "minReqs": parse_min_requirements(fields),
+    }
+
+
+def clean_game_name(title: str) -> str:
+    """Extract clean game name from title and decode HTML entities"""
+    name = html.unescape(title.replace("Free Download", "").strip())
+    if "(" in name:
+        name = name[:name.find("(")].strip()
+    return name
+
+
+def get_image_url(post: Dict) -> str:
+    """Extract og:image URL from post"""
+    try:
+        return post.get("yoast_head_json", {}).get("og_image", [{}])[0].get("url", "")
+    except (IndexError, KeyError, TypeError, AttributeError):
+        return ""
+
+
+def parse_raw_posts(raw: bytes) -> List[Dict]:
+    """
+    Decode one page of the posts API and parse every post on it.
+
+    Runs in a worker process, so only the compact parsed posts travel back instead of
+    the full post HTML. A post that fails to parse comes back with an "error" key.
+    """
+    results = []
+    for post in json.loads(raw):
+        post_id = post.get("id")
+        try:
+            title = post.get("title", {}).get("rendered", "")
+            results.append({
+                "id": post_id,
+                "name": clean_game_name(title),
+                "link": post.get("link", ""),
+                "modified": post.get("modified") or "",
+                "categories": post.get("categories", []),
+                "imageUrl": get_image_url(post),
+                "fields": parse_post(post.get("content", {}).get("rendered", ""), title),
+            })
+        except Exception as e:
+            results.append({"id": post_id, "error": str(e)})
+    return results
@@ -3,50 +3,68 @@ SteamRIP Scraper Implementation
 Handles all SteamRIP-specific scraping logic
 """
 
-import cloudscraper
-import requests
+import asyncio
+import os
 import json
 import time
 import threading
 import logging
 import re
-import html
 import random
 import string
-from typing import Dict, List, Optional, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from queue import Queue, Empty
-
-from base_scraper import BaseScraper
-from utils import encode_game_id
+import datetime
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor, wait
 
+from curl_cffi import requests as curl_requests
 
-# Custom exception for cookie expiration/rate limiting
-class CookieExpiredError(Exception):
-    pass
+from base_scraper import BaseScraper
+from fetch_engine import EngineSession, FetchEngine, browser_for, session_headers
+from image_cache import ImageCache
+from image_fetcher import ImageFetcher
+from post_parser import parse_raw_posts
+from utils import decode_game_id, encode_game_id
+from view_counts import ViewCountCache
 
 
 class SteamRIPScraper(BaseScraper):
     """Scraper implementation for SteamRIP source"""
     
-    def __init__(self, output_dir: str, progress_file: str):
-        super().__init__(output_dir, progress_file)
+    def __init__(self, output_dir: str, progress_file: str, image_cache: Optional[ImageCache] = None):
+        super().__init__(output_dir, progress_file, image_cache)
         
         # SteamRIP-specific configuration
         self.base_url = "https://steamrip.com/wp-json/wp/v2/posts"
         self.category_url = "https://steamrip.com/wp-json/wp/v2/categories"
-        self.scraper = None
+        self.views_url = "https://steamrip.com/wp-admin/admin-ajax.php"
+        self.keep_alive_urls = [
+            "https://steamrip.com/",
+            "https://steamrip.com/category/games/",
+            "https://steamrip.com/category/action/",
+        ]
+        self.engine = None
+        self.ENGINE_POOL_SIZE = 32
         self.category_map = {}
         
-        # Rate limiting for image downloads
-        self.image_download_lock = threading.Lock()
-        self.last_image_download = 0
-        self.IMAGE_DOWNLOAD_DELAY = 0.15
-        
-        # Failed image download tracking
-        self.failed_image_count = 0
-        self.failed_image_lock = threading.Lock()
-        self.MAX_FAILED_IMAGES = 5
+        # Request limits, enforced by the fetch engine and the cover fetcher. Post pages
+        # default to --page-window in flight and view counts to --view-workers, unless
+        # the user's profile sets them. "images" applies to each cover host on its own
+        self.PROFILE = {
+            "api": {"concurrency": 2, "rate": 5.0, "burst": 2},
+            "pages": {"concurrency": 3, "rate": 2.0, "burst": 1, "attempts": 5,
+                      "backoff": {"curve": "constant", "initial": 2.0}},
+            "views": {"concurrency": 4, "rate": 40.0, "burst": 4},
+            "images": {"concurrency": 8, "rate": 8.0, "burst": 16, "attempts": 3,
+                       "backoff": {"curve": "linear", "initial": 2.0}},
+            "keepalive": {"concurrency": 1, "interval": 30.0},
+        }
+        
+        # Cover downloads run in the background
+        self.image_fetcher = None
+        
+        # Post pages are decoded and parsed in worker processes, away from the GIL
+        self.DEFAULT_PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
         
         # Cookie refresh handling
         self.cookie_refresh_event = threading.Event()
@@ -54,16 +72,22 @@ class SteamRIPScraper(BaseScraper):
         self.new_cookie_value = [None]
         self.current_user_agent = [None]
         
-        # Keep-alive thread control
-        self.keep_alive_stop_event = threading.Event()
-        self.keep_alive_thread = None
-        
-        # View count fetching
-        self.view_count_queue = Queue()
-        self.view_count_cache = {}
-        self.view_count_cache_lock = threading.Lock()
-        self.view_count_stop_event = threading.Event()
-        self.view_count_threads = []
+        # Keep-alive pings run as a periodic task on the fetch engine
+        self.keep_alive_task = None
+        
+        # View counts persist between refreshes, only stale or new posts are queried
+        self.fetch_views = False
+        self.view_counts = ViewCountCache(os.path.join(output_dir, "view_counts.json"))
+        self.view_count_futures = {}
+        self.view_count_games = {}
+        self.view_count_stats = {"fetched": 0, "failed": 0}
+        # Games of the current scrape that had a view count when they were passed on
+        self.games_with_views = 0
+        self.VIEW_COUNT_WAIT = 120
+        
+        # Incremental refreshes look back a bit further than the last run, WordPress
+        # compares modified_after against the site's local time
+        self.INCREMENTAL_OVERLAP = 24 * 60 * 60
     
     def get_source_name(self) -> str:
         return "SteamRIP"
@@ -81,22 +105,31 @@ class SteamRIPScraper(BaseScraper):
                 self.logger.error("Cloudflare protection is active but no cookie was provided")
                 return False
             
-            # Create scraper
-            self.scraper = self._create_scraper(cookie if cf_active else None, user_agent)
+            # All SteamRIP requests share one event loop and connection pool
+            self.engine = FetchEngine(cookie if cf_active else None, user_agent, pool_size=self.ENGINE_POOL_SIZE)
+            self.engine.limit("api", self.lane("api"))
+            self.engine.limit("keepalive", self.lane("keepalive"))
+            self.engine.limit("views", self.lane("views", concurrency=view_workers, rate=10.0 * max(1, view_workers)))
+            self.engine.start()
             
             # Fetch categories
             self.logger.info("Fetching categories...")
             self.category_map = self._fetch_categories()
             
-            # Recreate scraper for posts
-            self.scraper = self._create_scraper(cookie if cf_active else None, user_agent)
+            # Covers are rate limited per host by the fetcher and downloaded as coroutines on the engine
+            images = self.lane("images")
+            self.image_fetcher = ImageFetcher(
+                self.image_cache,
+                EngineSession(self.engine, "images"),
+                images,
+                workers=images.concurrency
+            )
             
-            # Start keep-alive thread
-            self._start_keep_alive(interval=30)
+            self._start_keep_alive(interval=self.lane("keepalive").interval)
             
-            # Start view count fetcher
-            if not skip_views:
-                self._start_view_count_fetcher(cookie if cf_active else None, view_workers, user_agent)
+            self.fetch_views = not skip_views
+            if self.fetch_views:
+                self.logger.info(f"Fetching view counts with up to {self.lane('views').concurrency} concurrent requests")
             
             return True
             
@@ -105,14 +138,36 @@ class SteamRIPScraper(BaseScraper):
             return False
     
     def scrape_games(self, blacklist_ids: Set[int], per_page: int = 100, 
-                     workers: int = 8, progress=None) -> List[Dict]:
-        """Scrape all games from SteamRIP"""
+                     workers: int = 8, progress=None, modified_after: Optional[str] = None,
+                     page_window: int = 3, parse_workers: Optional[int] = None,
+                     sink: Optional[Callable[[List[Dict]], None]] = None) -> List[Dict]:
+        """Scrape all games from SteamRIP, or only posts modified after an ISO 8601 date.
+        
+        Pages are fetched on the fetch engine and decoded and parsed in a pool of parse_workers
+        processes (0 parses in a thread). workers sets how many covers download at once.
+        At least page_window pages, and enough to keep every parse worker busy, are in flight
+        while the current page is turned into game entries. Games are passed to sink in API
+        order once their cover is in, only games waiting for a cover are held here.
+        """
         game_data = []
+        if sink is None:
+            sink = game_data.extend
+        # Games whose cover is still downloading, and the games behind them
+        pending = deque()
+        games_sent = 0
+        self.games_with_views = 0
         processed_post_ids = set()
+        query = f"&modified_after={modified_after}" if modified_after else ""
+        if parse_workers is None:
+            parse_workers = self.DEFAULT_PARSE_WORKERS
+        page_window = max(1, page_window, parse_workers)
+        self.image_fetcher.workers = workers
+        pages = self.lane("pages", concurrency=page_window)
+        self.engine.limit("pages", pages)
         
         # Get total count
         try:
-            head_response = self.scraper.head(f"{self.base_url}?per_page=1", timeout=30)
+            head_response = self.engine.head("api", f"{self.base_url}?per_page=1{query}").result()
             total_posts = int(head_response.headers.get('X-WP-Total', 0))
             self.logger.info(f"Total posts available: {total_posts}")
             if progress:
@@ -121,158 +176,255 @@ class SteamRIPScraper(BaseScraper):
             self.logger.warning(f"Could not get total count: {e}")
             total_posts = 0
         
-        page = 1
+        # Without a total, pages are fetched until the API reports the end
+        last_page = (total_posts + per_page - 1) // per_page if total_posts else None
+        
         max_cookie_refreshes = 10
         refresh_count = 0
         consecutive_failures = 0
-        max_consecutive_failures = 5
+        max_consecutive_failures = pages.attempts
+        failed_page = None
         
         imgs_dir = f"{self.output_dir}/imgs_incoming"
         
-        self.logger.info(f"Starting streaming post processing ({per_page} posts per page)...")
+        # Pages an interrupted run finished come from its checkpoint instead of the API
+        restored_pages = set()
+        if self.checkpoint:
+            records = self.checkpoint.begin({"perPage": per_page, "modifiedAfter": modified_after},
+                                            totalPosts=total_posts)
+            restored_pages = self._restore_pages(records, total_posts, per_page, pending,
+                                                 processed_post_ids, imgs_dir, progress)
+        
+        self.logger.info(f"Starting streaming post processing ({per_page} posts per page, {page_window} pages in flight, "
+                         f"{parse_workers} parse processes, {workers} cover downloads)...")
+        
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+        in_flight = {}
+        next_page = 1
+        
+        async def fetch_and_parse(page):
+            """Fetch a page and hand its raw JSON to the parse pool, returns (status_code, parsed posts)"""
+            status_code, raw = await self._fetch_page(page, per_page, query)
+            if raw is None:
+                return status_code, None
+            return status_code, await asyncio.get_running_loop().run_in_executor(parse_pool, parse_raw_posts, raw)
+        
+        def restart_window(page):
+            """Drop prefetched pages so fetching resumes at page"""
+            nonlocal next_page
+            for f in in_flight.values():
+                f.cancel()
+            in_flight.clear()
+            next_page = page
+        
+        def wait_to_retry():
+            """Back off before a page is fetched again, False once the lane's retry budget is spent"""
+            if not pages.take_retry():
+                self.logger.error("Retry budget of the pages lane is spent")
+                return False
+            time.sleep(pages.delay(consecutive_failures))
+            return True
         
-        while True:
-            try:
-                response = self.scraper.get(f"{self.base_url}?per_page={per_page}&page={page}", timeout=30)
+        def refresh_cookie():
+            """Pause all requests until a new cookie arrives, returns False if none was provided"""
+            nonlocal refresh_count, consecutive_failures
+            if refresh_count >= max_cookie_refreshes:
+                self.logger.error("Max cookie refreshes reached")
+                return False
+            
+            refresh_count += 1
+            self.logger.info(f"Cookie refresh attempt {refresh_count}/{max_cookie_refreshes}")
+            
+            # View counts, covers and keep-alive pings wait too instead of burning the old cookie
+            self.engine.pause()
+            if self._wait_for_cookie_refresh():
+                self.engine.resume(self.new_cookie_value[0], self.current_user_agent[0])
+                self.image_fetcher.reset_session(EngineSession(self.engine, "images"))
+                self.new_cookie_value[0] = None
+                consecutive_failures = 0
+                return True
+            self.engine.resume()
+            self.logger.error("No new cookie provided")
+            return False
+        
+        try:
+            while True:
+                # Outside the page handling below, a failing sink is not a failed page
+                games_sent += self._emit(pending, sink)
                 
-                if response.status_code == 400:
-                    self.logger.info(f"Reached end of posts at page {page}")
+                # Keep the window of prefetched pages full
+                while len(in_flight) < page_window and (last_page is None or next_page <= last_page):
+                    if next_page not in restored_pages:
+                        in_flight[next_page] = self.engine.submit(fetch_and_parse(next_page))
+                    next_page += 1
+                
+                if not in_flight:
                     break
                 
-                if response.status_code == 403:
-                    self.logger.warning(f"403 Forbidden on page {page}, cookie may be expired")
-                    consecutive_failures += 1
+                # Pages are consumed in order so the index keeps the API's ordering
+                page = min(in_flight)
+                try:
+                    status_code, posts = in_flight.pop(page).result()
                     
-                    if consecutive_failures >= max_consecutive_failures:
-                        if refresh_count >= max_cookie_refreshes:
-                            self.logger.error("Max cookie refreshes reached")
-                            break
+                    if status_code == 400:
+                        self.logger.info(f"Reached end of posts at page {page}")
+                        break
+                    
+                    if status_code == 403:
+                        self.logger.warning(f"403 Forbidden on page {page}, cookie may be expired")
+                        consecutive_failures += 1
+                        restart_window(page)
                         
-                        refresh_count += 1
-                        self.logger.info(f"Cookie refresh attempt {refresh_count}/{max_cookie_refreshes}")
+                        if consecutive_failures >= max_consecutive_failures:
+                            if refresh_cookie():
+                                continue
+                            failed_page = page
+                            break
                         
-                        if self._wait_for_cookie_refresh():
-                            self.scraper = self._create_scraper(self.new_cookie_value[0], self.current_user_agent[0])
-                            self._restart_view_count_fetcher(self.new_cookie_value[0], 4, self.current_user_agent[0])
-                            self.new_cookie_value[0] = None
-                            consecutive_failures = 0
-                            continue
-                        else:
-                            self.logger.error("No new cookie provided")
+                        if not wait_to_retry():
+                            failed_page = page
                             break
+                        continue
                     
-                    time.sleep(2)
-                    continue
-                
-                response.raise_for_status()
-                posts = response.json()
-                
-                if not posts:
-                    self.logger.info(f"No posts returned at page {page}")
-                    break
-                
-                consecutive_failures = 0
-                self.logger.info(f"Page {page}: fetched {len(posts)} posts, processing with {workers} workers...")
-                
-                # Filter posts
-                posts_to_process = []
-                for post in posts:
-                    post_id = post.get("id")
-                    if post_id in processed_post_ids:
+                    if not posts:
+                        self.logger.info(f"No posts returned at page {page}")
+                        break
+                    
+                    if self.image_fetcher.session_expired:
+                        # Cover downloads keep getting refused, retry the page with a new cookie
+                        self.logger.warning(f"Image session expired while processing page {page}")
+                        consecutive_failures += 1
+                        restart_window(page)
+                        if consecutive_failures >= max_consecutive_failures:
+                            if refresh_cookie():
+                                continue
+                            failed_page = page
+                            break
+                        
+                        if not wait_to_retry():
+                            failed_page = page
+                            break
                         continue
-                    if blacklist_ids and post_id and int(post_id) in blacklist_ids:
-                        self.logger.debug(f"Skipping blacklisted post ID: {post_id}")
+                    
+                    consecutive_failures = 0
+                    self.logger.info(f"Page {page}: parsed {len(posts)} posts")
+                    page_post_ids = []
+                    page_entries = []
+                    
+                    for parsed in posts:
+                        post_id = parsed.get("id")
+                        if post_id in processed_post_ids:
+                            continue
                         processed_post_ids.add(post_id)
+                        page_post_ids.append(post_id)
                         if progress:
                             progress.increment_processed()
-                        continue
-                    posts_to_process.append(post)
-                
-                # Process posts in parallel
-                cookie_expired_in_page = False
-                page_results = []
-                
-                with ThreadPoolExecutor(max_workers=workers) as executor:
-                    futures = {
-                        executor.submit(self._process_post, post, imgs_dir, progress, blacklist_ids): post
-                        for post in posts_to_process
-                    }
-                    
-                    for future in as_completed(futures):
-                        post = futures[future]
-                        post_id = post.get("id")
                         
-                        try:
-                            result = future.result()
-                            if result:
-                                page_results.append(result)
-                            processed_post_ids.add(post_id)
-                            if progress:
-                                progress.increment_processed()
-                        
-                        except CookieExpiredError:
-                            self.logger.warning(f"Cookie expired while processing post {post_id}")
-                            cookie_expired_in_page = True
-                            for f in futures:
-                                f.cancel()
-                            break
+                        if blacklist_ids and post_id and int(post_id) in blacklist_ids:
+                            self.logger.debug(f"Skipping blacklisted post ID: {post_id}")
+                            continue
                         
-                        except Exception as e:
-                            self.logger.error(f"Error processing post {post_id}: {e}")
+                        if "error" in parsed:
+                            error_msg = f"Error processing post {post_id}: {parsed['error']}"
+                            self.logger.error(error_msg)
                             if progress:
-                                progress.add_error(str(e))
-                
-                game_data.extend(page_results)
-                
-                if cookie_expired_in_page:
+                                progress.add_error(error_msg)
+                            continue
+                        
+                        game_entry = self._build_game_entry(parsed, imgs_dir, progress)
+                        pending.append(game_entry)
+                        if self.checkpoint:
+                            page_entries.append(self._checkpoint_entry(game_entry, parsed["imageUrl"]))
+                    
+                    if self.checkpoint:
+                        self.checkpoint.record("page", flush=True, page=page, posts=page_post_ids, games=page_entries)
+                    
+                except Exception as e:
+                    self.logger.error(f"Error fetching page {page}: {e}")
                     consecutive_failures += 1
-                    if consecutive_failures >= max_consecutive_failures:
-                        if refresh_count < max_cookie_refreshes:
-                            refresh_count += 1
-                            
-                            if self._wait_for_cookie_refresh():
-                                self.scraper = self._create_scraper(self.new_cookie_value[0], self.current_user_agent[0])
-                                self._restart_view_count_fetcher(self.new_cookie_value[0], 4, self.current_user_agent[0])
-                                self.new_cookie_value[0] = None
-                                consecutive_failures = 0
-                                continue
+                    restart_window(page)
+                    if consecutive_failures >= max_consecutive_failures or not wait_to_retry():
+                        failed_page = page
                         break
-                    
-                    time.sleep(2)
-                    continue
-                
-                page += 1
-                time.sleep(0.5)
-                
-            except Exception as e:
-                self.logger.error(f"Error fetching page {page}: {e}")
-                consecutive_failures += 1
-                if consecutive_failures >= max_consecutive_failures:
-                    break
-                time.sleep(2)
+        finally:
+            restart_window(next_page)
+            if parse_pool:
+                parse_pool.shutdown(wait=True)
         
-        self.logger.info(f"Processed {len(game_data)} games total")
+        if failed_page is not None:
+            # A partial index would drop every later game, the checkpoint lets --resume pick up here
+            raise RuntimeError(f"Stopped at page {failed_page} after {consecutive_failures} failed attempts")
         
-        # Apply view counts
-        self._apply_view_counts(game_data)
+        # Wait for cover downloads still in flight
+        games_sent += self._emit(pending, sink, final=True)
+        self.logger.info(f"Processed {games_sent} games total")
+        self._log_view_counts(games_sent, self.games_with_views)
         
         return game_data
     
+    def scrape_updates(self, existing_games: List[Dict], since: float, blacklist_ids: Set[int],
+                       per_page: int = 100, workers: int = 8, progress=None,
+                       page_window: int = 3, parse_workers: Optional[int] = None) -> Optional[List[Dict]]:
+        """Scrape posts modified since the last refresh and merge them into the existing games"""
+        live_post_ids = self._fetch_post_ids(per_page)
+        if live_post_ids is not None and not live_post_ids and existing_games:
+            self.logger.warning("Post ID listing came back empty, keeping existing games")
+            live_post_ids = None
+        
+        modified_after = datetime.datetime.fromtimestamp(since - self.INCREMENTAL_OVERLAP, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        self.logger.info(f"Incremental refresh: fetching posts modified after {modified_after}")
+        
+        updated_games = self.scrape_games(blacklist_ids, per_page, workers, progress,
+                                          modified_after=modified_after, page_window=page_window,
+                                          parse_workers=parse_workers)
+        
+        merged = self._merge_games(existing_games, updated_games, live_post_ids, blacklist_ids)
+        # Unchanged games keep their weight unless their cached view count went stale
+        self._log_view_counts(len(merged), self._apply_view_counts(merged, queue_stale=True))
+        return merged
+    
     def get_total_pages(self) -> int:
         """Get total number of pages"""
         try:
-            head_response = self.scraper.head(f"{self.base_url}?per_page=100", timeout=30)
+            head_response = self.engine.head("api", f"{self.base_url}?per_page=100").result()
             total_posts = int(head_response.headers.get('X-WP-Total', 0))
             return (total_posts + 99) // 100
         except:
             return 0
     
+    def collect_late_updates(self, timeout: Optional[float] = None) -> Dict[str, Dict]:
+        """Wait for view counts still being fetched and return the new weights by gameID"""
+        futures = list(self.view_count_futures.values())
+        self.view_count_futures = {}
+        if futures:
+            self.logger.info(f"Waiting for {len(futures)} view count requests to finish...")
+            _, pending = wait(futures, timeout=self.VIEW_COUNT_WAIT if timeout is None else timeout)
+            if pending:
+                # Counts that did not make it stay stale and are fetched by the next refresh
+                self.logger.warning(f"Cancelling {len(pending)} view count requests that did not finish in time")
+                for future in pending:
+                    future.cancel()
+            self.logger.info(f"View counts fetched: {self.view_count_stats['fetched']}, "
+                             f"failed: {self.view_count_stats['failed']}")
+        self.view_counts.save()
+        
+        updates = {}
+        for game_id, post_id in self.view_count_games.items():
+            count = self.view_counts.get(post_id)
+            if count:
+                updates[game_id] = {"weight": count}
+        self.view_count_games = {}
+        return updates
+    
     def cleanup(self):
         """Cleanup resources"""
         self._stop_keep_alive()
-        self._stop_view_count_fetcher()
-        if self.scraper:
-            self.scraper.close()
+        if self.image_fetcher:
+            self.image_fetcher.shutdown()
+        self.image_cache.save()
+        self.view_counts.save()
+        if self.engine:
+            self.engine.close()
     
     # Private helper methods
     
@@ -281,15 +433,15 @@ class SteamRIPScraper(BaseScraper):
         self.logger.info("Checking if Cloudflare protection is active...")
         
         try:
-            test_scraper = cloudscraper.create_scraper(
-                browser={"browser": "chrome", "platform": "windows", "mobile": False}
-            )
-            
-            final_user_agent = user_agent if user_agent else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-            test_scraper.headers.update({"User-Agent": final_user_agent})
+            # Same browser impersonation as the fetch engine, so the answer holds for it
+            test_session = curl_requests.Session(impersonate=browser_for(user_agent),
+                                                 headers=session_headers(user_agent=user_agent))
             
-            test_url = "https://steamrip.com/wp-json/wp/v2/posts?per_page=1"
-            response = test_scraper.get(test_url, timeout=15)
+            test_url = f"{self.base_url}?per_page=1"
+            try:
+                response = test_session.get(test_url, timeout=15)
+            finally:
+                test_session.close()
             
             if response.status_code == 200:
                 self.logger.info("✓ Cloudflare protection is NOT active - cookie not required")
@@ -305,43 +457,6 @@ class SteamRIPScraper(BaseScraper):
             self.logger.warning(f"Error checking Cloudflare protection: {e}, assuming CF is active")
             return True
     
-    def _create_scraper(self, cookie=None, user_agent=None):
-        """Create a cloudscraper instance"""
-        self.logger.info("Creating cloudscraper instance...")
-        
-        browser_type = "chrome"
-        if user_agent:
-            ua_lower = user_agent.lower()
-            if "firefox" in ua_lower:
-                browser_type = "firefox"
-            self.logger.info(f"Using custom User-Agent (browser: {browser_type}): {user_agent[:60]}...")
-        
-        scraper = cloudscraper.create_scraper(
-            browser={"browser": browser_type, "platform": "windows", "mobile": False}
-        )
-        
-        adapter = requests.adapters.HTTPAdapter(
-            pool_connections=50,
-            pool_maxsize=50,
-            max_retries=3
-        )
-        scraper.mount('https://', adapter)
-        scraper.mount('http://', adapter)
-        
-        final_user_agent = user_agent if user_agent else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        
-        headers = {"User-Agent": final_user_agent}
-        
-        if cookie:
-            cookie = cookie.strip().strip('"\'')
-            if not cookie.startswith("cf_clearance="):
-                cookie = f"cf_clearance={cookie}"
-            headers["Cookie"] = cookie
-        
-        scraper.headers.update(headers)
-        self.logger.info("Scraper created successfully with pool size 50")
-        return scraper
-    
     def _fetch_categories(self):
         """Fetch category ID to name mapping"""
         categories = {}
@@ -350,13 +465,12 @@ class SteamRIPScraper(BaseScraper):
         
         while True:
             try:
-                response = self.scraper.get(f"{url}?per_page=100&page={page}", timeout=30)
+                response = self.engine.get("api", f"{url}?per_page=100&page={page}").result()
                 if response.status_code == 400 or not response.json():
                     break
                 for cat in response.json():
                     categories[cat["id"]] = cat["name"]
                 page += 1
-                time.sleep(0.2)
             except Exception as e:
                 self.logger.warning(f"Error fetching categories page {page}: {e}")
                 break
@@ -364,477 +478,234 @@ class SteamRIPScraper(BaseScraper):
         self.logger.info(f"Fetched {len(categories)} categories")
         return categories
     
-    def _process_post(self, post, imgs_dir, progress, blacklist_ids=None):
-        """Process a single post and return game data"""
-        try:
-            post_id = post.get("id")
-            if blacklist_ids and post_id and int(post_id) in blacklist_ids:
-                self.logger.debug(f"Skipping blacklisted post ID: {post_id}")
-                return None
-            
-            title = post.get("title", {}).get("rendered", "")
-            game_name = self._clean_game_name(title)
-            
-            if progress:
-                progress.set_current_game(game_name)
-            
-            content = post.get("content", {}).get("rendered", "")
-            
-            # Extract data
-            download_links = self._extract_download_links(content)
-            game_size = self._extract_game_size(content)
-            version = self._extract_version(content)
-            released_by = self._extract_released_by(content)
-            is_online = self._check_online_status(content, title)
-            has_dlc = self._check_dlc_status(content)
-            min_reqs = self._extract_min_requirements(content)
-            
-            # Get image
-            image_url = self._get_image_url(post)
-            img_id = self._generate_random_id()
-            if image_url:
-                img_id = self._download_image(image_url, img_id, imgs_dir, progress)
-            
-            # Get categories
-            cat_ids = post.get("categories", [])
-            categories = [self.category_map.get(cid, "") for cid in cat_ids if self.category_map.get(cid)]
-            
-            # Get dates
-            latest_update = post.get("modified", "")[:10] if post.get("modified") else ""
-            
-            # Queue view count fetch
-            self._queue_view_count_fetch(post_id)
-            
-            # Encode post_id
-            encoded_game_id = encode_game_id(post_id) if post_id else ""
-            
-            game_entry = {
-                "game": game_name,
-                "size": game_size,
-                "version": version,
-                "releasedBy": released_by,
-                "online": is_online,
-                "dlc": has_dlc,
-                "dirlink": post.get("link", ""),
-                "download_links": download_links,
-                "weight": "0",
-                "_post_id": post_id,
-                "imgID": img_id,
-                "gameID": encoded_game_id,
-                "category": categories,
-                "latest_update": latest_update,
-                "minReqs": min_reqs
-            }
-            
-            return game_entry
-        
-        except CookieExpiredError:
-            raise
-        except Exception as e:
-            error_msg = f"Error processing post {post.get('id')}: {e}"
-            self.logger.error(error_msg)
-            if progress:
-                progress.add_error(error_msg)
-            return None
-    
-    def _extract_download_links(self, content):
-        """Extract download links from content HTML"""
-        download_links = {}
-        link_pattern = r'href="([^"]+)"[^>]*class="shortc-button[^"]*"|class="shortc-button[^"]*"[^>]*href="([^"]+)"'
-        matches = re.findall(link_pattern, content)
-        
-        for match in matches:
-            href = match[0] or match[1]
-            if "gofile.io" in href:
-                download_links.setdefault("gofile", []).append(href)
-            elif "qiwi.gg" in href:
-                download_links.setdefault("qiwi", []).append(href)
-            elif "megadb.net" in href:
-                download_links.setdefault("megadb", []).append(href)
-            elif "pixeldrain.com" in href:
-                download_links.setdefault("pixeldrain", []).append(href)
-            elif "bzzhr.to" in href:
-                download_links.setdefault("buzzheavier", []).append(href)
-            elif "vikingfile.com" in href:
-                download_links.setdefault("vikingfile", []).append(href)
-            elif "datanodes.to" in href:
-                download_links.setdefault("datanodes", []).append(href)
-            elif "1fichier.com" in href:
-                download_links.setdefault("1fichier", []).append(href)
-            elif "fileditchfiles.me" in href or "fileditch.com" in href:
-                download_links.setdefault("fileditch", []).append(href)
-        
-        return download_links
-    
-    def _extract_game_size(self, content):
-        """Extract game size from content"""
-        match = re.search(r'Game Size:?\s*</strong>\s*([^<]+)', content, re.IGNORECASE)
-        if match:
-            size = match.group(1).strip()
-            size_match = re.search(r'(\d+(?:\.\d+)?\s*(?:GB|MB))', size, re.IGNORECASE)
-            return size_match.group(0) if size_match else ""
-        return ""
+    async def _fetch_page(self, page, per_page, query=""):
+        """Fetch one page of posts, returns (status_code, raw JSON body)"""
+        response = await self.engine.fetch("pages", "GET", f"{self.base_url}?per_page={per_page}&page={page}{query}")
+        if response.status_code in (400, 403):
+            return response.status_code, None
+        response.raise_for_status()
+        return response.status_code, response.content
     
-    def _extract_version(self, content):
-        """Extract version from content"""
-        match = re.search(r'Version:?\s*</strong>\s*:?\s*([^<|]+)', content, re.IGNORECASE)
-        if match:
-            ver = match.group(1).strip()
-            ver = re.sub(r'^(?:v(?:ersion)?\.?\s*|Build\s*|Patch\s*)', '', ver, flags=re.IGNORECASE)
-            ver = re.sub(r'\([^)]*\)', '', ver)
-            
-            noise_words = {
-                'latest', 'vr', 'co-op', 'coop', 'multiplayer', 'online', 'zombies',
-                'all', 'dlcs', 'dlc', 'complete', 'edition', 'goty', 'game', 'year',
-                'the', 'of', 'and', 'with', 'plus', 'update', 'updated', 'final',
-                'definitive', 'ultimate', 'deluxe', 'premium', 'gold', 'silver',
-                'remastered', 'enhanced', 'extended', 'expanded', 'full', 'bonus'
-            }
-            
-            parts = re.split(r'\s*\+\s*|\s+', ver)
-            version_parts = []
-            for part in parts:
-                part = part.strip()
-                if part.lower() in noise_words:
-                    continue
-                if part and (re.search(r'\d', part) or (len(part) == 1 and part.upper() == 'X')):
-                    version_parts.append(part)
-            
-            ver = ' '.join(version_parts).strip()
-            if ver:
-                return ver
-        return ""
-    
-    def _extract_released_by(self, content):
-        """Extract 'Released By' field from content"""
-        match = re.search(r'Released By:?\s*</strong>\s*([^<]+)', content, re.IGNORECASE)
-        if match:
-            released_by = match.group(1).strip()
-            return html.unescape(released_by)
-        return ""
-    
-    def _extract_min_requirements(self, content):
-        """Extract minimum system requirements from content"""
-        reqs = {}
-        
-        os_match = re.search(r'<strong>OS</strong>:?\s*([^<]+)', content, re.IGNORECASE)
-        if os_match:
-            reqs['os'] = html.unescape(os_match.group(1).strip())
-        
-        cpu_match = re.search(r'<strong>Processor</strong>:?\s*([^<]+)', content, re.IGNORECASE)
-        if cpu_match:
-            reqs['cpu'] = html.unescape(cpu_match.group(1).strip())
-        
-        ram_match = re.search(r'<strong>Memory</strong>:?\s*([^<]+)', content, re.IGNORECASE)
-        if ram_match:
-            reqs['ram'] = html.unescape(ram_match.group(1).strip())
-        
-        gpu_match = re.search(r'<strong>Graphics</strong>:?\s*([^<]+)', content, re.IGNORECASE)
-        if gpu_match:
-            reqs['gpu'] = html.unescape(gpu_match.group(1).strip())
-        
-        dx_match = re.search(r'<strong>DirectX</strong>:?\s*([^<]+)', content, re.IGNORECASE)
-        if dx_match:
-            reqs['directx'] = html.unescape(dx_match.group(1).strip())
+    def _fetch_post_ids(self, per_page=100):
+        """Fetch the IDs of all published posts, returns None if the listing fails"""
+        post_ids = set()
+        page = 1
         
-        storage_match = re.search(r'<strong>Storage</strong>:?\s*([^<]+)', content, re.IGNORECASE)
-        if storage_match:
-            reqs['storage'] = html.unescape(storage_match.group(1).strip())
+        while True:
+            try:
+                response = self.engine.get("api", f"{self.base_url}?per_page={per_page}&page={page}&_fields=id").result()
+                if response.status_code == 400:
+                    break
+                if response.status_code != 200:
+                    self.logger.warning(f"Could not list post IDs (HTTP {response.status_code} on page {page})")
+                    return None
+                posts = response.json()
+                if not posts:
+                    break
+                post_ids.update(post["id"] for post in posts if "id" in post)
+                if len(posts) < per_page:
+                    break
+                page += 1
+            except Exception as e:
+                self.logger.warning(f"Error listing post IDs on page {page}: {e}")
+                return None
         
-        return reqs if reqs else None
-    
-    def _check_online_status(self, content, title):
-        """Check if game has online/multiplayer/co-op"""
-        text = (content + title).lower()
-        return bool(re.search(r'multiplayer|co-op|online', text))
+        self.logger.info(f"Listed {len(post_ids)} live post IDs")
+        return post_ids
     
-    def _check_dlc_status(self, content):
-        """Check if game has DLC"""
-        return bool(re.search(r"DLC'?s?\s*(Added|Included)?", content, re.IGNORECASE))
+    def _merge_games(self, existing_games, updated_games, live_post_ids, blacklist_ids):
+        """Merge re-scraped games into the existing list, dropping deleted and blacklisted posts"""
+        updated_by_id = {game["gameID"]: game for game in updated_games if game.get("gameID")}
+        live_game_ids = {encode_game_id(post_id) for post_id in live_post_ids} if live_post_ids is not None else None
+        blacklisted_game_ids = {encode_game_id(post_id) for post_id in blacklist_ids or ()}
+        
+        merged = []
+        seen = set()
+        dropped = 0
+        for game in existing_games:
+            game_id = game.get("gameID")
+            if not game_id:
+                merged.append(game)
+                continue
+            if game_id in seen:
+                continue
+            seen.add(game_id)
+            if game_id in blacklisted_game_ids or (live_game_ids is not None and game_id not in live_game_ids):
+                dropped += 1
+                continue
+            merged.append(updated_by_id.get(game_id, game))
+        
+        # Posts that were not in the index yet are the newest, list them first
+        new_games = [game for game_id, game in updated_by_id.items() if game_id not in seen]
+        
+        self.logger.info(
+            f"Merged index: {len(new_games)} new, {len(updated_by_id) - len(new_games)} updated, "
+            f"{dropped} removed, {len(merged) + len(new_games)} total"
+        )
+        return new_games + merged
     
-    def _clean_game_name(self, title):
-        """Extract clean game name from title and decode HTML entities"""
-        name = html.unescape(title.replace("Free Download", "").strip())
-        if "(" in name:
-            name = name[:name.find("(")].strip()
-        return name
+    def _build_game_entry(self, parsed, imgs_dir, progress):
+        """Turn a parsed post into a game entry and queue its cover and view count"""
+        post_id = parsed["id"]
+        fields = parsed["fields"]
+        
+        if progress:
+            progress.set_current_game(parsed["name"])
+        
+        # Queue the cover download, imgID is filled in once it completes
+        image_url = parsed["imageUrl"]
+        img_id = self._generate_random_id()
+        img_future = self._submit_cover(image_url, imgs_dir, progress) if image_url else None
+        
+        # Get categories
+        categories = [self.category_map.get(cid, "") for cid in parsed["categories"] if self.category_map.get(cid)]
+        
+        # Queue view count fetch
+        self._queue_view_count_fetch(post_id, parsed["modified"])
+        
+        game_entry = {
+            "game": parsed["name"],
+            "size": fields["size"],
+            "version": fields["version"],
+            "releasedBy": fields["releasedBy"],
+            "online": fields["online"],
+            "dlc": fields["dlc"],
+            "dirlink": parsed["link"],
+            "download_links": fields["download_links"],
+            "weight": "0",
+            "_post_id": post_id,
+            "imgID": img_id,
+            "gameID": encode_game_id(post_id) if post_id else "",
+            "category": categories,
+            "latest_update": parsed["modified"][:10],
+            "minReqs": fields["minReqs"]
+        }
+        if img_future:
+            game_entry["_img_future"] = img_future
+        
+        return game_entry
     
-    def _get_image_url(self, post):
-        """Extract og:image URL from post"""
-        try:
-            return post.get("yoast_head_json", {}).get("og_image", [{}])[0].get("url", "")
-        except (IndexError, KeyError, TypeError):
-            return ""
+    def _restore_pages(self, records, total_posts, per_page, pending, processed_post_ids, imgs_dir, progress):
+        """Restore the pages of an interrupted run from its checkpoint, returns the page numbers restored"""
+        pages = {record["page"]: record for record in records if record.get("type") == "page"}
+        covers = {record["url"]: record["imgID"] for record in records if record.get("type") == "cover"}
+        
+        # Pages are finished in order, only the unbroken run from page 1 is used
+        restored_until = 0
+        while restored_until + 1 in pages:
+            restored_until += 1
+        # Posts deleted since then moved later posts onto earlier pages, those pages are fetched again
+        deleted = max(0, self.checkpoint.info.get("totalPosts", 0) - total_posts) if total_posts else 0
+        restored_until -= (deleted + per_page - 1) // per_page
+        
+        restored = 0
+        for page in range(1, restored_until + 1):
+            record = pages[page]
+            for post_id in record["posts"]:
+                processed_post_ids.add(post_id)
+                if progress:
+                    progress.increment_processed()
+            for game_entry in record["games"]:
+                self._restore_cover(game_entry, game_entry.pop("_cover", None), covers, imgs_dir, progress)
+                self._queue_view_count_fetch(game_entry.get("_post_id"))
+                pending.append(game_entry)
+                restored += 1
+        
+        if restored_until > 0:
+            self.logger.info(f"Restored {restored} games from {restored_until} checkpointed pages")
+        return set(range(1, restored_until + 1))
     
     def _generate_random_id(self, length=10):
         """Generate a random alphanumeric ID"""
         return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
     
-    def _download_image(self, image_url, img_id, imgs_dir, progress):
-        """Download and save image with rate limiting and retry"""
-        if not image_url:
-            return ""
-        
-        if progress:
-            progress.increment_images()
-        
-        max_retries = 3
-        
-        for attempt in range(max_retries):
-            with self.failed_image_lock:
-                if self.failed_image_count >= self.MAX_FAILED_IMAGES:
-                    self.logger.warning(f"Hit {self.MAX_FAILED_IMAGES} failed downloads, triggering cookie refresh...")
-                    raise CookieExpiredError("Too many failed image downloads - cookie likely expired")
-            
-            if self.cookie_refresh_event.is_set():
-                while self.cookie_refresh_event.is_set():
-                    time.sleep(0.5)
-            
+    def _start_keep_alive(self, interval=30.0):
+        """Ping SteamRIP periodically from the fetch engine so the session stays warm"""
+        if not interval:
+            self.logger.info("Keep-alive disabled by the refresh profile")
+            return
+        keep_alive_urls = self.keep_alive_urls
+        
+        async def ping(run):
+            url = keep_alive_urls[run % len(keep_alive_urls)]
             try:
-                with self.image_download_lock:
-                    elapsed = time.time() - self.last_image_download
-                    if elapsed < self.IMAGE_DOWNLOAD_DELAY:
-                        time.sleep(self.IMAGE_DOWNLOAD_DELAY - elapsed)
-                    self.last_image_download = time.time()
-                
-                response = self.scraper.get(image_url, timeout=15)
-                
-                if response.status_code == 429:
-                    wait_time = (attempt + 1) * 5
-                    self.logger.warning(f"429 on image, waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    continue
-                
-                if response.status_code == 403:
-                    self.logger.warning(f"403 Forbidden on image (attempt {attempt+1}), cookie may be expired")
-                    with self.failed_image_lock:
-                        self.failed_image_count += 1
-                        if self.failed_image_count >= self.MAX_FAILED_IMAGES:
-                            raise CookieExpiredError("Cookie expired or rate limited")
-                    time.sleep((attempt + 1) * 2)
-                    continue
-                
-                response.raise_for_status()
-                import os
-                img_path = os.path.join(imgs_dir, f"{img_id}.jpg")
-                with open(img_path, 'wb') as f:
-                    f.write(response.content)
-                
-                if progress:
-                    progress.increment_downloaded_images()
-                
-                with self.failed_image_lock:
-                    self.failed_image_count = 0
-                
-                return img_id
-                
-            except CookieExpiredError:
-                raise
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep((attempt + 1) * 2)
+                response = await self.engine.fetch("keepalive", "HEAD", url, timeout=10)
+                if response.status_code == 200:
+                    self.logger.debug(f"Keep-alive ping successful: {url}")
+                elif response.status_code == 403:
+                    self.logger.warning(f"Keep-alive got 403 - cookie may be expiring")
                 else:
-                    self.logger.warning(f"Failed to download image after {max_retries} attempts: {image_url}")
-                    with self.failed_image_lock:
-                        self.failed_image_count += 1
-                        if self.failed_image_count >= self.MAX_FAILED_IMAGES:
-                            self.logger.error(f"Reached {self.MAX_FAILED_IMAGES} failed image downloads")
-                            raise CookieExpiredError("Cookie expired or rate limited")
-        return ""
-    
-    def _start_keep_alive(self, interval=30):
-        """Start a background thread that periodically pings SteamRIP"""
-        def keep_alive_worker():
-            keep_alive_urls = [
-                "https://steamrip.com/",
-                "https://steamrip.com/category/games/",
-                "https://steamrip.com/category/action/",
-            ]
-            url_index = 0
-            
-            self.logger.info(f"Keep-alive thread started (interval: {interval}s)")
-            
-            while not self.keep_alive_stop_event.is_set():
-                try:
-                    for _ in range(interval):
-                        if self.keep_alive_stop_event.is_set():
-                            break
-                        time.sleep(1)
-                    
-                    if self.keep_alive_stop_event.is_set():
-                        break
-                    
-                    url = keep_alive_urls[url_index % len(keep_alive_urls)]
-                    url_index += 1
-                    
-                    response = self.scraper.head(url, timeout=10)
-                    if response.status_code == 200:
-                        self.logger.debug(f"Keep-alive ping successful: {url}")
-                    elif response.status_code == 403:
-                        self.logger.warning(f"Keep-alive got 403 - cookie may be expiring")
-                    else:
-                        self.logger.debug(f"Keep-alive response: {response.status_code}")
-                        
-                except Exception as e:
-                    self.logger.debug(f"Keep-alive request failed: {e}")
-            
-            self.logger.info("Keep-alive thread stopped")
+                    self.logger.debug(f"Keep-alive response: {response.status_code}")
+            except Exception as e:
+                self.logger.debug(f"Keep-alive request failed: {e}")
         
-        self.keep_alive_stop_event.clear()
-        self.keep_alive_thread = threading.Thread(target=keep_alive_worker, daemon=True)
-        self.keep_alive_thread.start()
+        self.keep_alive_task = self.engine.every(interval, ping)
+        self.logger.info(f"Keep-alive started (interval: {interval}s)")
     
     def _stop_keep_alive(self):
-        """Stop the keep-alive background thread"""
-        self.keep_alive_stop_event.set()
-        if self.keep_alive_thread and self.keep_alive_thread.is_alive():
-            self.keep_alive_thread.join(timeout=5)
-        self.keep_alive_thread = None
+        """Stop the keep-alive pings"""
+        if self.keep_alive_task:
+            self.keep_alive_task.cancel()
+            self.keep_alive_task = None
     
-    def _start_view_count_fetcher(self, cookie, num_workers=4, user_agent=None):
-        """Start background threads that fetch view counts"""
-        cookie_str = None
-        if cookie:
-            cookie_str = cookie.strip().strip('"\'')
-            if not cookie_str.startswith("cf_clearance="):
-                cookie_str = f"cf_clearance={cookie_str}"
-        
-        browser_type = "chrome"
-        final_user_agent = user_agent if user_agent else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        if user_agent and "firefox" in user_agent.lower():
-            browser_type = "firefox"
-        
-        def view_count_worker(worker_id):
-            self.logger.info(f"View count worker {worker_id} started")
-            
-            view_scraper = cloudscraper.create_scraper(
-                browser={"browser": browser_type, "platform": "windows", "mobile": False}
-            )
-            headers = {"User-Agent": final_user_agent}
-            if cookie_str:
-                headers["Cookie"] = cookie_str
-            view_scraper.headers.update(headers)
-            adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=1)
-            view_scraper.mount('https://', adapter)
-            
-            fetched_count = 0
-            failed_count = 0
-            
-            while not self.view_count_stop_event.is_set() or not self.view_count_queue.empty():
-                try:
-                    try:
-                        post_id = self.view_count_queue.get(timeout=0.5)
-                    except Empty:
-                        continue
-                    
-                    try:
-                        url = f"https://steamrip.com/wp-admin/admin-ajax.php?postviews_id={post_id}&action=tie_postviews&_={int(time.time() * 1000)}"
-                        response = view_scraper.get(url, timeout=10)
-                        if response.status_code == 200:
-                            views = re.sub(r'[^\d]', '', response.text.strip())
-                            if views:
-                                with self.view_count_cache_lock:
-                                    self.view_count_cache[post_id] = views
-                                fetched_count += 1
-                                if fetched_count % 100 == 0:
-                                    self.logger.debug(f"Worker {worker_id}: Fetched {fetched_count} view counts")
-                            else:
-                                failed_count += 1
-                        else:
-                            failed_count += 1
-                    except Exception as e:
-                        failed_count += 1
-                        self.logger.debug(f"Worker {worker_id}: Error fetching view count for {post_id}: {e}")
-                    
-                    time.sleep(0.1)
-                    
-                except Exception as e:
-                    self.logger.debug(f"View count worker {worker_id} error: {e}")
-            
-            view_scraper.close()
-            self.logger.info(f"View count worker {worker_id} finished. Fetched: {fetched_count}, Failed: {failed_count}")
-        
-        self.view_count_stop_event.clear()
-        self.view_count_threads = []
-        for i in range(num_workers):
-            t = threading.Thread(target=view_count_worker, args=(i,), daemon=True, name=f"ViewCountWorker-{i}")
-            t.start()
-            self.view_count_threads.append(t)
-        
-        self.logger.info(f"Started {num_workers} view count fetcher workers")
-    
-    def _stop_view_count_fetcher(self):
-        """Stop the view count fetcher threads"""
-        if self.view_count_threads:
-            self.logger.info("Stopping view count fetcher...")
-            self.view_count_stop_event.set()
-            
-            for t in self.view_count_threads:
-                if t.is_alive():
-                    t.join(timeout=5)
-            
-            self.view_count_threads = []
-            self.logger.info(f"View count fetcher stopped. Cached {len(self.view_count_cache)} view counts.")
-    
-    def _restart_view_count_fetcher(self, cookie, num_workers=4, user_agent=None):
-        """Restart the view count fetcher with a new cookie"""
-        self.logger.info("Restarting view count fetcher with new cookie...")
-        
-        if self.view_count_threads:
-            self.view_count_stop_event.set()
-            for t in self.view_count_threads:
-                if t.is_alive():
-                    t.join(timeout=2)
-            self.view_count_threads = []
-        
-        self.view_count_stop_event.clear()
-        self._start_view_count_fetcher(cookie, num_workers=num_workers, user_agent=user_agent)
-        self.logger.info("View count fetcher restarted with new cookie")
+    def _queue_view_count_fetch(self, post_id, modified=None):
+        """Start fetching the view count of a post in the background unless the cached one is fresh"""
+        if not post_id or not self.fetch_views:
+            return
+        key = str(post_id)
+        if key in self.view_count_futures or not self.view_counts.is_stale(key, modified):
+            return
+        url = f"{self.views_url}?postviews_id={key}&action=tie_postviews&_={int(time.time() * 1000)}"
+        future = self.engine.get("views", url, timeout=10)
+        future.add_done_callback(lambda f: self._store_view_count(key, f))
+        self.view_count_futures[key] = future
     
-    def _queue_view_count_fetch(self, post_id):
-        """Add a post_id to the view count fetch queue"""
-        if post_id:
-            self.view_count_queue.put(post_id)
+    def _store_view_count(self, post_id, future):
+        """Cache the view count of a finished request"""
+        if future.cancelled():
+            return
+        try:
+            response = future.result()
+            views = re.sub(r'[^\d]', '', response.text.strip()) if response.status_code == 200 else ""
+        except Exception as e:
+            self.logger.debug(f"Error fetching view count for {post_id}: {e}")
+            views = ""
+        if views:
+            self.view_counts.put(post_id, views)
+            self.view_count_stats["fetched"] += 1
+        else:
+            self.view_count_stats["failed"] += 1
     
-    def _get_cached_view_count(self, post_id):
-        """Get view count from cache"""
-        with self.view_count_cache_lock:
-            return self.view_count_cache.get(post_id, "0")
+    def _finish_games(self, games):
+        self.games_with_views += self._apply_view_counts(games)
     
-    def _apply_view_counts(self, game_data):
-        """Apply cached view counts to game data"""
-        self.logger.info("Waiting for view count fetcher to finish...")
-        queue_wait_start = time.time()
-        max_queue_wait = 60
-        while not self.view_count_queue.empty() and (time.time() - queue_wait_start) < max_queue_wait:
-            remaining = self.view_count_queue.qsize()
-            if remaining > 0:
-                self.logger.info(f"Waiting for {remaining} view counts to be fetched...")
-            time.sleep(2)
-        
-        self._stop_view_count_fetcher()
-        
-        self.logger.info("Applying view counts to game data...")
+    def _apply_view_counts(self, game_data, queue_stale=False):
+        """Fill in cached view counts without waiting, counts still in flight are picked up by collect_late_updates().
+        Returns how many of the games have views"""
         games_with_views = 0
-        games_without_views = 0
         for game in game_data:
-            post_id = game.pop("_post_id", None)
-            if post_id:
-                view_count = self._get_cached_view_count(post_id)
-                game["weight"] = view_count
-                if view_count != "0":
-                    games_with_views += 1
-                else:
-                    games_without_views += 1
-        
-        self.logger.info(f"View count stats: {games_with_views} games with views, {games_without_views} games with weight=0")
-        self.logger.info(f"Total cached view counts: {len(self.view_count_cache)}")
+            post_id = game.pop("_post_id", None) or decode_game_id(game.get("gameID"))
+            if not post_id:
+                continue
+            key = str(post_id)
+            if queue_stale:
+                self._queue_view_count_fetch(key)
+            count = self.view_counts.get(key)
+            if count:
+                game["weight"] = count
+            if key in self.view_count_futures:
+                self.view_count_games[game["gameID"]] = key
+            if game.get("weight", "0") != "0":
+                games_with_views += 1
+        return games_with_views
+    
+    def _log_view_counts(self, games, games_with_views):
+        self.logger.info(f"View count stats: {games_with_views} games with views, "
+                         f"{games - games_with_views} games with weight=0, "
+                         f"{len(self.view_count_futures)} counts still being fetched")
     
     def _wait_for_cookie_refresh(self):
         """Wait for user to provide a new cookie via stdin"""
-        with self.failed_image_lock:
-            self.failed_image_count = 0
-        
         with self.cookie_refresh_lock:
             if self.new_cookie_value[0] is not None:
                 return True
@@ -856,8 +727,7 @@ class SteamRIPScraper(BaseScraper):
                 new_cookie = input().strip()
                 
                 if new_cookie:
-                    self.logger.info("Received new cookie, refreshing scraper...")
-                    self.scraper = self._create_scraper(new_cookie, self.current_user_agent[0])
+                    self.logger.info("Received new cookie, refreshing sessions...")
                     self.new_cookie_value[0] = new_cookie
                     
                     self.cookie_refresh_event.clear()
@@ -6,7 +6,7 @@ import os
 import sys
 import json
 import logging
-from typing import Set, Tuple
+from typing import Dict, Optional, Set, Tuple
 
 
 # Character set for encoding post IDs (mixed case for visual variety)
@@ -62,25 +62,24 @@ def decode_game_id(game_id):
         return None
 
 
+def get_settings_path() -> Optional[str]:
+    """Path of the Ascendara settings file, None if it does not exist."""
+    if sys.platform == 'win32':
+        appdata = os.environ.get('APPDATA')
+        if not appdata:
+            return None
+        candidate = os.path.join(appdata, 'Electron', 'ascendarasettings.json')
+    elif sys.platform == 'darwin':
+        candidate = os.path.join(os.path.expanduser('~/Library/Application Support/ascendara'), 'ascendarasettings.json')
+    else:
+        candidate = os.path.join(os.path.expanduser('~/.config/ascendara'), 'ascendarasettings.json')
+    return candidate if os.path.exists(candidate) else None
+
+
 def get_blacklist_ids() -> Set[int]:
     """Read blacklisted game IDs from settings file and decode them to numeric IDs."""
     try:
-        settings_path = None
-        if sys.platform == 'win32':
-            appdata = os.environ.get('APPDATA')
-            if appdata:
-                candidate = os.path.join(appdata, 'Electron', 'ascendarasettings.json')
-                if os.path.exists(candidate):
-                    settings_path = candidate
-        elif sys.platform == 'darwin':
-            candidate = os.path.join(os.path.expanduser('~/Library/Application Support/ascendara'), 'ascendarasettings.json')
-            if os.path.exists(candidate):
-                settings_path = candidate
-        else:
-            candidate = os.path.join(os.path.expanduser('~/.config/ascendara'), 'ascendarasettings.json')
-            if os.path.exists(candidate):
-                settings_path = candidate
-
+        settings_path = get_settings_path()
         if settings_path and os.path.exists(settings_path):
             with open(settings_path, 'r', encoding='utf-8') as f:
                 settings = json.load(f)
@@ -100,22 +99,7 @@ def get_blacklist_ids() -> Set[int]:
 def get_notification_settings() -> Tuple[bool, str]:
     """Read notification settings from settings file. Returns (enabled, theme) tuple."""
     try:
-        settings_path = None
-        if sys.platform == 'win32':
-            appdata = os.environ.get('APPDATA')
-            if appdata:
-                candidate = os.path.join(appdata, 'Electron', 'ascendarasettings.json')
-                if os.path.exists(candidate):
-                    settings_path = candidate
-        elif sys.platform == 'darwin':
-            candidate = os.path.join(os.path.expanduser('~/Library/Application Support/ascendara'), 'ascendarasettings.json')
-            if os.path.exists(candidate):
-                settings_path = candidate
-        else:
-            candidate = os.path.join(os.path.expanduser('~/.config/ascendara'), 'ascendarasettings.json')
-            if os.path.exists(candidate):
-                settings_path = candidate
-
+        settings_path = get_settings_path()
         if settings_path and os.path.exists(settings_path):
             with open(settings_path, 'r', encoding='utf-8') as f:
                 settings = json.load(f)
@@ -127,6 +111,19 @@ def get_notification_settings() -> Tuple[bool, str]:
     return False, 'dark'
 
 
+def get_refresh_profiles() -> Dict:
+    """Read the per-source refresh profiles from settings file, {} if there are none."""
+    try:
+        settings_path = get_settings_path()
+        if settings_path:
+            with open(settings_path, 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+                return settings.get('localRefreshProfiles') or {}
+    except Exception as e:
+        logging.error(f"Failed to read refresh profiles from settings: {e}")
+    return {}
+
+
 def send_notification(title: str, message: str):
     """Send a desktop notification using platform-specific methods."""
     try:
@@ -0,0 +1,94 @@
+"""
+View Count Cache
+Keeps post view counts across refreshes so only stale or new posts are queried
+"""
+
+import os
+import json
+import time
+import zlib
+import logging
+import datetime
+import threading
+from typing import Dict, Optional
+
+
+class ViewCountCache:
+    """
+    On-disk map of post_id to its last fetched view count and when it was fetched.
+
+    A count is stale once it is older than max_age, stretched by up to 50% per post so
+    counts fetched in the same run do not all expire on the same day, or when the post
+    was modified after the count was fetched. Entries not refreshed for
+    MAX_UNUSED_DAYS belong to deleted posts and are dropped on save.
+    """
+
+    VERSION = 1
+    DEFAULT_MAX_AGE = 3 * 24 * 60 * 60
+    MAX_UNUSED_DAYS = 90
+
+    def __init__(self, cache_file: str, max_age: float = DEFAULT_MAX_AGE):
+        self.cache_file = cache_file
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+
+        try:
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self.entries = data.get("views", {})
+        except Exception as e:
+            self.logger.warning(f"Could not load view count cache, starting empty: {e}")
+            self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, post_id) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(str(post_id))
+        return entry["count"] if entry else None
+
+    def put(self, post_id, count: str):
+        with self.lock:
+            self.entries[str(post_id)] = {"count": count, "fetchedAt": time.time()}
+            self.dirty = True
+
+    def is_stale(self, post_id, modified: Optional[str] = None) -> bool:
+        """True if the post's count should be fetched again, modified is the post's ISO date"""
+        key = str(post_id)
+        with self.lock:
+            entry = self.entries.get(key)
+        if not entry:
+            return True
+        fetched_at = entry.get("fetchedAt", 0)
+        spread = 1 + (zlib.crc32(key.encode()) % 1000) / 2000
+        if time.time() - fetched_at > self.max_age * spread:
+            return True
+        if modified:
+            try:
+                modified_at = datetime.datetime.fromisoformat(modified).replace(tzinfo=datetime.timezone.utc).timestamp()
+            except ValueError:
+                return False
+            return modified_at > fetched_at
+        return False
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            cutoff = time.time() - self.MAX_UNUSED_DAYS * 86400
+            self.entries = {key: entry for key, entry in self.entries.items() if entry.get("fetchedAt", 0) >= cutoff}
+            data = {"version": self.VERSION, "views": self.entries}
+            self.dirty = False
+        tmp_path = self.cache_file + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            self.logger.warning(f"Could not save view count cache: {e}")
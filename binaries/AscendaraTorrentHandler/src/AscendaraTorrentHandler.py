@@ -24,6 +24,10 @@ import argparse
 import subprocess
 from typing import Dict, Any
 
+# Modules shared between the binaries, bundled by PyInstaller through --paths binaries/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'shared'))
+from pe_info import read_pe_info
+
 def _launch_crash_reporter_on_exit(error_code, error_message):
     try:
         binary_name = 'AscendaraCrashReporter.exe' if sys.platform == 'win32' else 'AscendaraCrashReporter'
@@ -158,6 +162,7 @@ def _launch_notification(theme, title, message):
     except Exception as e:
         logging.error(f"Failed to launch notification helper: {e}")
 
+
 class TorrentManager:
     def __init__(self, qbit_host='localhost', qbit_port=8080, qbit_username='admin', qbit_password='adminadmin'):
         self.qbt_client = None
@@ -336,13 +341,28 @@ class TorrentManager:
             if self.notification_theme:
                 _launch_notification(self.notification_theme, "Download Complete", f"Download complete for {game}, starting installation")
             
-            # Find setup executable
+            # Find setup executable, preferring files whose PE overlay identifies an installer
             setup_file = None
+            best_score = 0
             torrent_folder = os.path.join(game_dir, torrent.name)
             for file in os.listdir(torrent_folder):
-                if file.lower().startswith(('setup', game.lower())) and file.lower().endswith('.exe'):
-                    setup_file = os.path.join(torrent_folder, file)
-                    break
+                if not file.lower().endswith('.exe'):
+                    continue
+                file_path = os.path.join(torrent_folder, file)
+                pe = read_pe_info(file_path)
+                if pe is None or pe['is_dll']:
+                    continue
+                score = 0
+                if pe['installer'] == 'inno':
+                    score += 100
+                elif pe['installer'] or pe['sfx']:
+                    score += 50
+                if file.lower().startswith(('setup', game.lower())):
+                    score += 30
+                logging.debug(f"Setup candidate {file}: installer={pe['installer']}, sfx={pe['sfx']}, score={score}")
+                if score > best_score:
+                    best_score = score
+                    setup_file = file_path
             
             if not setup_file:
                 raise Exception("Could not find setup executable")
@@ -0,0 +1,230 @@
+# ==============================================================================
+# Ascendara PE Inspection
+# ==============================================================================
+# Reads what the binaries need to know about a Windows executable (architecture,
+# subsystem, installer or archive payload, version strings) from its headers,
+# without reading the whole file. Shared by the downloader and the torrent
+# handler; PyInstaller bundles it through --paths binaries/shared.
+
+import os
+import struct
+import logging
+from typing import Optional, Dict, Any
+
+PE_HEADER_READ_SIZE = 4096
+PE_RESOURCE_READ_LIMIT = 64 * 1024
+
+PE_MACHINE_TYPES = {
+    0x014c: 'x86',
+    0x8664: 'x64',
+    0xaa64: 'arm64',
+}
+
+PE_SUBSYSTEMS = {
+    2: 'gui',
+    3: 'console',
+}
+
+PE_VERSION_KEYS = ('ProductName', 'FileDescription', 'OriginalFilename', 'InternalName', 'CompanyName')
+
+# (offset into overlay, signature, installer name)
+PE_INSTALLER_SIGNATURES = [
+    (0, b'zlb\x1a', 'inno'),
+    (0, b'idska32\x1a', 'inno'),
+    (4, b'\xef\xbe\xad\xdeNullsoftInst', 'nsis'),
+    (8, b'\xef\xbe\xad\xdeNullsoftInst', 'nsis'),
+]
+
+# (offset into overlay, signature, archive format). An appended archive is not
+# necessarily an installer: fused LÖVE and NW.js games carry their data as a zip
+PE_ARCHIVE_SIGNATURES = [
+    (0, b'7z\xbc\xaf\x27\x1c', '7z'),
+    (0, b'Rar!\x1a\x07', 'rar'),
+    (0, b'PK\x03\x04', 'zip'),
+    (0, b'MSCF', 'cab'),
+]
+
+PE_INSTALLER_SECTIONS = {
+    b'.ndata': 'nsis',
+}
+
+
+def _match_signature(overlay_head: bytes, signatures: list) -> Optional[str]:
+    for sig_offset, signature, name in signatures:
+        if overlay_head[sig_offset:sig_offset + len(signature)] == signature:
+            return name
+    return None
+
+def _pe_rva_to_offset(rva: int, sections: list) -> Optional[int]:
+    for section in sections:
+        span = max(section['virtual_size'], section['raw_size'])
+        if section['virtual_address'] <= rva < section['virtual_address'] + span:
+            return rva - section['virtual_address'] + section['raw_offset']
+    return None
+
+def _parse_version_strings(data: bytes) -> Dict[str, str]:
+    """Walk a VS_VERSIONINFO block and collect its StringFileInfo values."""
+    strings = {}
+
+    def align(value):
+        return (value + 3) & ~3
+
+    def walk(offset, end, depth):
+        while offset + 6 <= end:
+            length, value_length, value_type = struct.unpack_from('<HHH', data, offset)
+            if length == 0:
+                break
+            block_end = min(offset + length, end)
+            key_end = offset + 6
+            while key_end + 1 < block_end and data[key_end:key_end + 2] != b'\x00\x00':
+                key_end += 2
+            key = data[offset + 6:key_end].decode('utf-16-le', errors='ignore')
+            value_start = align(key_end + 2)
+
+            if depth == 3:
+                raw = data[value_start:min(value_start + value_length * 2, block_end)]
+                strings[key] = raw.decode('utf-16-le', errors='ignore').rstrip('\x00').strip()
+            elif depth < 3 and (depth != 1 or key == 'StringFileInfo'):
+                value_size = value_length * 2 if value_type == 1 else value_length
+                walk(align(value_start + value_size), block_end, depth + 1)
+
+            offset = align(block_end)
+
+    try:
+        walk(0, len(data), 0)
+    except struct.error:
+        pass
+    return strings
+
+def _read_pe_version_resource(f, data_dirs: list, sections: list) -> Dict[str, str]:
+    """Locate the RT_VERSION resource and return its version strings."""
+    if len(data_dirs) < 3 or not data_dirs[2][0]:
+        return {}
+    rsrc_rva = data_dirs[2][0]
+    rsrc_offset = _pe_rva_to_offset(rsrc_rva, sections)
+    if rsrc_offset is None:
+        return {}
+
+    f.seek(rsrc_offset)
+    rsrc = f.read(min(data_dirs[2][1] or PE_RESOURCE_READ_LIMIT, PE_RESOURCE_READ_LIMIT))
+
+    def entries(dir_offset):
+        named, ids = struct.unpack_from('<HH', rsrc, dir_offset + 12)
+        for i in range(named + ids):
+            yield struct.unpack_from('<II', rsrc, dir_offset + 16 + i * 8)
+
+    try:
+        # Root (type) -> name -> language -> data entry, taking the first name/language
+        target = None
+        for name_id, entry_target in entries(0):
+            if name_id == 16 and entry_target & 0x80000000:  # RT_VERSION
+                target = entry_target
+                break
+        for _ in range(2):
+            if target is None or not target & 0x80000000:
+                break
+            target = next((t for _, t in entries(target & 0x7fffffff)), None)
+        if target is None or target & 0x80000000:
+            return {}
+
+        data_rva, data_size = struct.unpack_from('<II', rsrc, target)
+        data_offset = _pe_rva_to_offset(data_rva, sections)
+        if data_offset is None:
+            return {}
+        f.seek(data_offset)
+        version_info = f.read(min(data_size, PE_RESOURCE_READ_LIMIT))
+    except struct.error:
+        return {}
+
+    strings = _parse_version_strings(version_info)
+    return {key: strings[key] for key in PE_VERSION_KEYS if strings.get(key)}
+
+def read_pe_info(path: str) -> Optional[Dict[str, Any]]:
+    """Inspect a Windows executable without reading the whole file.
+
+    Only the PE headers, the version resource and a few bytes at the start of
+    the overlay are read. Returns None if the file is not a valid PE image.
+
+    Returns:
+        Dict with machine, subsystem, is_dll, has_overlay, installer (inno/nsis
+        or None), sfx (format of an appended 7z/rar/zip/cab archive or None) and
+        version (ProductName, OriginalFilename...)
+    """
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            header = f.read(PE_HEADER_READ_SIZE)
+            if len(header) < 64 or header[:2] != b'MZ':
+                return None
+
+            pe_offset = struct.unpack_from('<I', header, 0x3c)[0]
+            if pe_offset + 24 > len(header):
+                f.seek(pe_offset)
+                header = header[:pe_offset] + f.read(PE_HEADER_READ_SIZE)
+            if header[pe_offset:pe_offset + 4] != b'PE\x00\x00':
+                return None
+
+            machine, num_sections, _, _, _, opt_size, characteristics = struct.unpack_from(
+                '<HHIIIHH', header, pe_offset + 4
+            )
+            opt_offset = pe_offset + 24
+            magic = struct.unpack_from('<H', header, opt_offset)[0]
+            if magic == 0x10b:
+                subsystem_offset, dirs_offset = opt_offset + 68, opt_offset + 96
+            elif magic == 0x20b:
+                subsystem_offset, dirs_offset = opt_offset + 68, opt_offset + 112
+            else:
+                return None
+            subsystem = struct.unpack_from('<H', header, subsystem_offset)[0]
+            num_dirs = min(struct.unpack_from('<I', header, dirs_offset - 4)[0], 16)
+            data_dirs = [struct.unpack_from('<II', header, dirs_offset + i * 8) for i in range(num_dirs)]
+
+            sections = []
+            section_offset = opt_offset + opt_size
+            for i in range(num_sections):
+                entry = section_offset + i * 40
+                if entry + 40 > len(header):
+                    break
+                name, virtual_size, virtual_address, raw_size, raw_offset = struct.unpack_from(
+                    '<8sIIII', header, entry
+                )
+                sections.append({
+                    'name': name.rstrip(b'\x00'),
+                    'virtual_size': virtual_size,
+                    'virtual_address': virtual_address,
+                    'raw_size': raw_size,
+                    'raw_offset': raw_offset,
+                })
+
+            # Anything past the last section that is not the Authenticode signature is overlay
+            image_end = max((s['raw_offset'] + s['raw_size'] for s in sections), default=0)
+            overlay_end = file_size
+            if len(data_dirs) > 4 and data_dirs[4][0] >= image_end:
+                overlay_end = min(overlay_end, data_dirs[4][0])
+            has_overlay = overlay_end - image_end > 0
+
+            installer = None
+            sfx = None
+            for section in sections:
+                installer = installer or PE_INSTALLER_SECTIONS.get(section['name'])
+            if has_overlay and not installer:
+                f.seek(image_end)
+                overlay_head = f.read(32)
+                installer = _match_signature(overlay_head, PE_INSTALLER_SIGNATURES)
+                if not installer:
+                    sfx = _match_signature(overlay_head, PE_ARCHIVE_SIGNATURES)
+
+            version = _read_pe_version_resource(f, data_dirs, sections)
+
+        return {
+            'machine': PE_MACHINE_TYPES.get(machine, 'unknown'),
+            'subsystem': PE_SUBSYSTEMS.get(subsystem, 'other'),
+            'is_dll': bool(characteristics & 0x2000),
+            'has_overlay': has_overlay,
+            'installer': installer,
+            'sfx': sfx,
+            'version': version,
+        }
+    except (OSError, struct.error) as e:
+        logging.debug(f"[read_pe_info] Could not parse {path}: {e}")
+        return None
@@ -303,7 +303,8 @@ function registerMiscHandlers() {
       if (fs.existsSync(imagePath)) {
         const imageBuffer = await fs.promises.readFile(imagePath);
         const base64 = imageBuffer.toString("base64");
-        return `data:image/jpeg;base64,${base64}`;
+        const mimeType = imagePath.toLowerCase().endsWith(".webp") ? "image/webp" : "image/jpeg";
+        return `data:${mimeType};base64,${base64}`;
       }
       return null;
     } catch (error) {
@@ -29,8 +29,10 @@ let publicIndexDownloading = false;
  */
 async function createIndexZip(indexPath) {
   const zipPath = path.join(indexPath, "shared_index.zip");
-  const gamesJsonPath = path.join(indexPath, "ascendara_games.json");
-  const imgsDir = path.join(indexPath, "imgs");
+  // The index paths may be symlinks into the live index version, archive what they point at
+  const resolvePath = p => (fs.existsSync(p) ? fs.realpathSync(p) : p);
+  const gamesJsonPath = resolvePath(path.join(indexPath, "ascendara_games.json"));
+  const imgsDir = resolvePath(path.join(indexPath, "imgs"));
 
   // Remove existing zip if present
   if (fs.existsSync(zipPath)) {
@@ -429,6 +431,11 @@ function registerLocalRefreshHandlers() {
           if (userAgent) args.push("--user-agent", userAgent);
         }
 
+        // Only fetch posts changed since the last refresh when the index supports it
+        if (settingsManager.getSettings().localRefreshIncremental) {
+          args.push("--incremental");
+        }
+
         localRefreshProcess = spawn(executablePath, args, {
           stdio: ["pipe", "pipe", "pipe"],
         });
@@ -686,34 +693,8 @@ function registerLocalRefreshHandlers() {
         } catch (e) {}
       }
 
-      // Restore backups
-      let localIndexPath = outputPath;
-      if (!localIndexPath) {
-        const settings = settingsManager.getSettings();
-        localIndexPath = settings.localIndex;
-      }
-
-      if (localIndexPath) {
-        const imgsDir = path.join(localIndexPath, "imgs");
-        const imgsBackupDir = path.join(localIndexPath, "imgs_backup");
-        const gamesFile = path.join(localIndexPath, "ascendara_games.json");
-        const gamesBackupFile = path.join(localIndexPath, "ascendara_games_backup.json");
-
-        if (fs.existsSync(imgsBackupDir)) {
-          try {
-            if (fs.existsSync(imgsDir))
-              fs.rmSync(imgsDir, { recursive: true, force: true });
-            fs.renameSync(imgsBackupDir, imgsDir);
-          } catch (e) {}
-        }
-
-        if (fs.existsSync(gamesBackupFile)) {
-          try {
-            if (fs.existsSync(gamesFile)) fs.unlinkSync(gamesFile);
-            fs.renameSync(gamesBackupFile, gamesFile);
-          } catch (e) {}
-        }
-      }
+      // Nothing to restore, a killed refresh never touches the live index version. Its
+      // incoming data and unpublished versions are removed when the next refresh starts
 
       return { success: true };
     } catch (error) {
@@ -823,6 +804,11 @@ function registerLocalRefreshHandlers() {
   });
 
   ipcMain.handle("download-shared-index", async (_, outputPath) => {
+    // A refresh still publishing into the index folder would race the extraction
+    if (localRefreshProcess && !localRefreshProcess.killed) {
+      return { success: false, error: "Local refresh is still running" };
+    }
+
     const mainWindow = BrowserWindow.getAllWindows()[0];
 
     // Set downloading flag and notify renderer
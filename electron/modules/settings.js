@@ -43,6 +43,7 @@ class SettingsManager {
       threadCount: 12,
       singleStream: true,
       downloadLimit: 0,
+      extractionExcludes: ["_CommonRedist/", "*.url"],
       sideScrollBar: false,
       excludeFolders: false,
       prioritizeTorboxOverSeamless: false,
@@ -56,6 +57,7 @@ class SettingsManager {
       shareLocalIndex: true,
       fetchPageCount: 50,
       localRefreshWorkers: 8,
+      localRefreshIncremental: true,
       homeSearch: true,
       indexReminder: "7",
       autoRefreshEnabled: false,
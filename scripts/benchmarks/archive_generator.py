@@ -0,0 +1,173 @@
+# Builds synthetic game archives for the Ascendara benchmarks. The layout mimics
+# what the download sources ship: a wrapper folder named after the game, a main
+# executable, crash handlers and DLLs, nested data folders and the usual junk
+# (_CommonRedist, .url shortcuts) so every extraction stage has real work to do.
+#
+# zip is written with the standard library. rar needs the `rar` command line
+# tool and 7z needs either `7z`/`7za` or the py7zr package.
+#
+# Run standalone:
+#   python scripts/benchmarks/archive_generator.py --output ./fixtures --format zip --files 500 --file-size 256KB
+
+import os
+import sys
+import random
+import shutil
+import struct
+import zipfile
+import subprocess
+import tempfile
+from argparse import ArgumentParser
+
+from fixture_server import parse_size
+
+ARCHIVE_FORMATS = ('zip', 'rar', '7z')
+
+
+class ArchiveToolMissing(Exception):
+    """Raised when the tool needed to build an archive format is not installed."""
+
+
+def build_pe(size=64 * 1024, machine=0x8664, subsystem=2, dll=False):
+    """Build a minimal PE image that passes the downloader's header checks."""
+    header_size = 0x200
+    size = max(size, header_size * 2)
+    pe_offset = 0x80
+    dos_header = bytearray(pe_offset)
+    dos_header[0:2] = b'MZ'
+    struct.pack_into('<I', dos_header, 0x3c, pe_offset)
+
+    characteristics = 0x0022 | (0x2000 if dll else 0)
+    coff = b'PE\x00\x00' + struct.pack('<HHIIIHH', machine, 1, 0, 0, 0, 240, characteristics)
+    optional = bytearray(240)
+    struct.pack_into('<H', optional, 0, 0x20b)
+    struct.pack_into('<H', optional, 68, subsystem)
+    struct.pack_into('<I', optional, 108, 16)
+    raw_size = size - header_size
+    section = struct.pack('<8sIIII', b'.text', raw_size, 0x1000, raw_size, header_size) + bytes(16)
+
+    header = bytes(dos_header) + coff + bytes(optional) + section
+    return header.ljust(header_size, b'\x00') + os.urandom(raw_size)
+
+
+def build_tree(root, game_name, files=200, file_size=256 * 1024, depth=3, exe_size=4 * 1024 * 1024,
+               junk=True, seed=0):
+    """Write the synthetic game tree under root/<game_name> and return its path."""
+    rng = random.Random(seed)
+    game_dir = os.path.join(root, game_name)
+    os.makedirs(game_dir, exist_ok=True)
+
+    exe_name = game_name.replace(' ', '') + '.exe'
+    with open(os.path.join(game_dir, exe_name), 'wb') as f:
+        f.write(build_pe(exe_size))
+    with open(os.path.join(game_dir, 'UnityCrashHandler64.exe'), 'wb') as f:
+        f.write(build_pe(64 * 1024))
+    with open(os.path.join(game_dir, 'UnityPlayer.dll'), 'wb') as f:
+        f.write(build_pe(256 * 1024, dll=True))
+
+    if junk:
+        redist_dir = os.path.join(game_dir, '_CommonRedist', 'DirectX')
+        os.makedirs(redist_dir, exist_ok=True)
+        with open(os.path.join(redist_dir, 'DXSETUP.exe'), 'wb') as f:
+            f.write(build_pe(128 * 1024, subsystem=3))
+        with open(os.path.join(game_dir, 'Visit Source.url'), 'w') as f:
+            f.write("[InternetShortcut]\nURL=https://example.invalid/\n")
+
+    for index in range(files):
+        parts = [f"Data{rng.randrange(4)}"] + [f"Level{rng.randrange(3)}" for _ in range(rng.randrange(depth))]
+        file_dir = os.path.join(game_dir, *parts)
+        os.makedirs(file_dir, exist_ok=True)
+        # Half compressible, half random, so archive sizes resemble real game data
+        if index % 2:
+            payload = os.urandom(file_size)
+        else:
+            payload = (b'ascendara-benchmark-' * (file_size // 20 + 1))[:file_size]
+        with open(os.path.join(file_dir, f"asset_{index:05d}.bin"), 'wb') as f:
+            f.write(payload)
+    return game_dir
+
+
+def _find_tool(*names):
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def write_archive(source_dir, archive_path, archive_format='zip'):
+    """Archive source_dir (including its own folder name) into archive_path."""
+    parent = os.path.dirname(os.path.abspath(source_dir))
+    top = os.path.basename(os.path.abspath(source_dir))
+    archive_path = os.path.abspath(archive_path)
+    if os.path.exists(archive_path):
+        os.remove(archive_path)
+
+    if archive_format == 'zip':
+        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for root, dirs, files in os.walk(source_dir):
+                rel_root = os.path.relpath(root, parent)
+                zf.write(root, rel_root)
+                for name in sorted(files):
+                    zf.write(os.path.join(root, name), os.path.join(rel_root, name))
+    elif archive_format == 'rar':
+        rar = _find_tool('rar')
+        if not rar:
+            raise ArchiveToolMissing("rar archives need the 'rar' command line tool")
+        subprocess.run([rar, 'a', '-r', '-m1', '-idq', archive_path, top], cwd=parent, check=True)
+    elif archive_format == '7z':
+        seven_zip = _find_tool('7z', '7za', '7zz')
+        if seven_zip:
+            subprocess.run([seven_zip, 'a', '-mx=1', '-bd', '-bso0', archive_path, top], cwd=parent, check=True)
+        else:
+            try:
+                import py7zr
+            except ImportError:
+                raise ArchiveToolMissing("7z archives need the '7z' command line tool or the py7zr package")
+            with py7zr.SevenZipFile(archive_path, 'w') as archive:
+                archive.writeall(source_dir, top)
+    else:
+        raise ValueError(f"Unsupported archive format: {archive_format}")
+    return archive_path
+
+
+def generate_archive(output_dir, game_name='Benchmark Game', archive_format='zip', **tree_options):
+    """Build a synthetic game tree and archive it. Returns the archive path."""
+    os.makedirs(output_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='ascendara-bench-src-')
+    try:
+        source_dir = build_tree(staging, f"{game_name}-Bench", **tree_options)
+        archive_name = f"{game_name.replace(' ', '-')}.{archive_format}"
+        return write_archive(source_dir, os.path.join(output_dir, archive_name), archive_format)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def main():
+    parser = ArgumentParser(description="Generate synthetic game archives for benchmarks")
+    parser.add_argument('--output', required=True, help="Directory to write archives to")
+    parser.add_argument('--format', choices=ARCHIVE_FORMATS, default='zip')
+    parser.add_argument('--name', default='Benchmark Game', help="Game name used for the wrapper folder and exe")
+    parser.add_argument('--files', type=int, default=200, help="Number of data files")
+    parser.add_argument('--file-size', default='256KB', help="Size of each data file")
+    parser.add_argument('--depth', type=int, default=3, help="Maximum folder nesting below each data folder")
+    parser.add_argument('--exe-size', default='4MB', help="Size of the main executable")
+    parser.add_argument('--no-junk', action='store_true', help="Leave out _CommonRedist and .url shortcuts")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        path = generate_archive(
+            args.output, args.name, args.format,
+            files=args.files, file_size=parse_size(args.file_size), depth=args.depth,
+            exe_size=parse_size(args.exe_size), junk=not args.no_junk, seed=args.seed,
+        )
+    except ArchiveToolMissing as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
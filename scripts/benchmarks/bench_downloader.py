@@ -0,0 +1,245 @@
+# Benchmarks the AscendaraDownloader pipeline fully offline. A synthetic archive
+# is served from a local fixture server (with optional throttling, resets and
+# 429s) and each stage is timed on its own:
+#
+#   download  - ChunkedDownloader.download
+#   extract   - RobustDownloader._extract_files (minus any flatten pass it runs)
+#   flatten   - RobustDownloader._flatten_directories on a wrapped copy of the tree
+#   verify    - RobustDownloader._verify_extracted_files
+#   detect    - RobustDownloader._detect_and_set_executable
+#
+# The JSON report holds every run plus median/min/max per stage so results from
+# two commits can be compared directly.
+#
+# Example:
+#   python scripts/benchmarks/bench_downloader.py --formats zip --files 500 --repeat 3 --output bench.json
+
+import os
+import sys
+import json
+import time
+import contextlib
+import shutil
+import hashlib
+import logging
+import platform
+import statistics
+import tempfile
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+
+from fixture_server import FaultPlan, FixtureServer, parse_size
+from archive_generator import ARCHIVE_FORMATS, ArchiveToolMissing, generate_archive
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DOWNLOADER_SRC = os.path.join(REPO_ROOT, 'binaries', 'AscendaraDownloader', 'src')
+
+GAME_NAME = 'Benchmark Game'
+STAGES = ('download', 'extract', 'flatten', 'verify', 'detect')
+# The downloader only extracts these, other formats are benchmarked for download only
+EXTRACTABLE_FORMATS = ('zip', 'rar')
+
+
+def load_downloader(verbose=False):
+    """Import the downloader module from the binaries tree."""
+    if DOWNLOADER_SRC not in sys.path:
+        sys.path.insert(0, DOWNLOADER_SRC)
+    # The module logs to stdout, send that to stderr to keep stdout for the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        import AscendaraDownloader
+    logging.getLogger().setLevel(logging.INFO if verbose else logging.WARNING)
+    return AscendaraDownloader
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run_pipeline(downloader_module, archive_path, archive_format, server, work_dir, retry_delay=None):
+    """Run every stage once against a fresh download directory."""
+    timings = {}
+    details = {}
+    size_str = downloader_module.read_size(os.path.getsize(archive_path))
+
+    dl = downloader_module.RobustDownloader(GAME_NAME, False, False, False, False, '1.0', size_str,
+                                            os.path.join(work_dir, 'download'))
+    dest = os.path.join(dl.download_dir, os.path.basename(archive_path))
+
+    # download, with the fault plan rearmed so every run sees the same faults
+    server.faults.rearm()
+    stats_before = dict(server.faults.stats)
+    chunked = downloader_module.ChunkedDownloader(server.url_for(os.path.basename(archive_path)), dest,
+                                                  dl.game_info, dl.game_info_path)
+    chunked._speed_limit_bytes = 0
+    if retry_delay is not None:
+        chunked.RETRY_DELAY_BASE = retry_delay
+        chunked.RETRY_DELAY_MAX = retry_delay
+    timings['download'], ok = timed(chunked.download)
+    if not ok or sha256_file(dest) != sha256_file(archive_path):
+        raise RuntimeError("Downloaded archive does not match the fixture")
+    details['download_bytes'] = os.path.getsize(dest)
+    details['download_mb_s'] = round(details['download_bytes'] / 1024 ** 2 / timings['download'], 2)
+    details['resets'] = server.faults.stats['resets'] - stats_before['resets']
+    details['rate_limited'] = server.faults.stats['rate_limited'] - stats_before['rate_limited']
+
+    if archive_format not in EXTRACTABLE_FORMATS:
+        details['skipped'] = f"the downloader does not extract .{archive_format} archives"
+        return timings, details
+
+    # extract, with verification held back and any flatten pass timed separately
+    flatten_runs = []
+    original_flatten = dl._flatten_directories
+
+    def timed_flatten():
+        flatten_runs.append(timed(original_flatten)[0])
+
+    dl._flatten_directories = timed_flatten
+    dl._verify_extracted_files = lambda watching_path, backup_dir=None: None
+    elapsed, _ = timed(dl._extract_files, dest)
+    timings['extract'] = elapsed - sum(flatten_runs)
+    details['flatten_during_extract'] = bool(flatten_runs)
+    del dl._flatten_directories, dl._verify_extracted_files
+    watching_path = os.path.join(dl.download_dir, 'filemap.ascendara.json')
+    with open(watching_path, 'r') as f:
+        details['files_extracted'] = len(json.load(f))
+
+    # flatten, on a copy of the extracted tree moved back under a wrapper folder
+    flat = downloader_module.RobustDownloader(GAME_NAME, False, False, False, False, '1.0', size_str,
+                                              os.path.join(work_dir, 'flatten'))
+    wrapper = os.path.join(flat.download_dir, f"{GAME_NAME}-Bench")
+    os.makedirs(wrapper)
+    for item in os.listdir(dl.download_dir):
+        if item.endswith('.ascendara.json'):
+            continue
+        src = os.path.join(dl.download_dir, item)
+        if os.path.isdir(src):
+            shutil.copytree(src, os.path.join(wrapper, item))
+        else:
+            shutil.copy2(src, os.path.join(wrapper, item))
+    timings['flatten'], _ = timed(flat._flatten_directories)
+    if os.path.isdir(wrapper):
+        raise RuntimeError("Flatten pass left the wrapper folder in place")
+
+    # verify, without the UI display floor and without the follow-up stages
+    dl.VERIFY_MIN_DISPLAY_TIME = 0
+    dl._detect_and_set_executable = lambda: None
+    dl._handle_post_download_behavior = lambda: None
+    timings['verify'], _ = timed(dl._verify_extracted_files, watching_path)
+    if 'downloadingData' in dl.game_info:
+        raise RuntimeError(f"Verification failed: {dl.game_info['downloadingData'].get('verifyError')}")
+    del dl._detect_and_set_executable
+
+    # detect
+    timings['detect'], _ = timed(dl._detect_and_set_executable)
+    details['executable'] = os.path.relpath(dl.game_info['executable'], dl.download_dir)
+    return timings, details
+
+
+def summarize(runs):
+    return {
+        'runs': [round(value, 4) for value in runs],
+        'median': round(statistics.median(runs), 4),
+        'min': round(min(runs), 4),
+        'max': round(max(runs), 4),
+    }
+
+
+def benchmark_format(downloader_module, archive_format, args, fixtures_dir, server):
+    tree_options = {
+        'files': args.files,
+        'file_size': parse_size(args.file_size),
+        'depth': args.depth,
+        'exe_size': parse_size(args.exe_size),
+    }
+    try:
+        gen_time, archive_path = timed(lambda: generate_archive(fixtures_dir, GAME_NAME, archive_format, **tree_options))
+    except ArchiveToolMissing as e:
+        return {'format': archive_format, 'skipped': str(e)}
+
+    stage_runs = {stage: [] for stage in STAGES}
+    details = {}
+    for run in range(args.repeat):
+        work_dir = tempfile.mkdtemp(prefix=f'ascendara-bench-{archive_format}-{run}-')
+        try:
+            timings, details = run_pipeline(downloader_module, archive_path, archive_format, server,
+                                             work_dir, args.retry_delay)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        for stage, value in timings.items():
+            stage_runs[stage].append(value)
+        print(f"[{archive_format}] run {run + 1}/{args.repeat}: " +
+              ", ".join(f"{stage} {value:.3f}s" for stage, value in timings.items()), file=sys.stderr)
+
+    return {
+        'format': archive_format,
+        'archive_bytes': os.path.getsize(archive_path),
+        'generate_seconds': round(gen_time, 4),
+        'stages': {stage: summarize(runs) for stage, runs in stage_runs.items() if runs},
+        'last_run': details,
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark the AscendaraDownloader download/extract/verify pipeline")
+    parser.add_argument('--formats', default='zip', help=f"Comma separated archive formats ({', '.join(ARCHIVE_FORMATS)})")
+    parser.add_argument('--files', type=int, default=200, help="Number of data files in the archive")
+    parser.add_argument('--file-size', default='256KB', help="Size of each data file")
+    parser.add_argument('--depth', type=int, default=3, help="Maximum folder nesting below each data folder")
+    parser.add_argument('--exe-size', default='4MB', help="Size of the main executable")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per format")
+    parser.add_argument('--throttle', default='0', help="Server bandwidth limit per response (e.g. 50MB), 0 = unlimited")
+    parser.add_argument('--resets', type=int, default=0, help="Connection resets injected per download")
+    parser.add_argument('--rate-limit', type=int, default=0, help="429 answers before each download is served")
+    parser.add_argument('--retry-delay', type=float, default=None, help="Override the downloader's retry delay (seconds)")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--verbose', action='store_true', help="Show downloader logging")
+    args = parser.parse_args()
+
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    for fmt in formats:
+        if fmt not in ARCHIVE_FORMATS:
+            parser.error(f"unknown format: {fmt}")
+
+    downloader_module = load_downloader(args.verbose)
+    fixtures_dir = tempfile.mkdtemp(prefix='ascendara-bench-fixtures-')
+    faults = FaultPlan(parse_size(args.throttle), args.resets, args.rate_limit)
+    results = []
+    try:
+        with FixtureServer(fixtures_dir, faults=faults) as server:
+            for fmt in formats:
+                results.append(benchmark_format(downloader_module, fmt, args, fixtures_dir, server))
+    finally:
+        shutil.rmtree(fixtures_dir, ignore_errors=True)
+
+    report = {
+        'metadata': {
+            'benchmark': 'downloader',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': vars(args),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
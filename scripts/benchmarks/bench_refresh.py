@@ -0,0 +1,341 @@
+# Benchmarks the AscendaraLocalRefresh scrapers end to end, fully offline. SteamRIP
+# and GOG-Games are pointed at a local fixture server replaying recorded (or
+# generated, see refresh_fixtures.py) post pages, categories, view counts, game
+# pages and covers, with optional latency, 503 errors and 429s. Per run it reports:
+#
+#   posts_per_s            - games returned by scrape_games over the scrape time
+#   images_per_s           - covers downloaded over the scrape time
+#   parse_cpu_ms_per_post  - CPU time to decode and parse one post (or GOG game page),
+#                            measured by replaying the fixtures through the parsers
+#   peak_rss_mb            - peak RSS of the scraper process and of its parse processes
+#   progress_writes        - times progress.json was written
+#
+# Every run is a fresh process so peak RSS is per run. The JSON report holds
+# every run plus median/min/max per metric so two commits can be compared directly.
+#
+# Example:
+#   python scripts/benchmarks/bench_refresh.py --posts 2000 --games 300 --latency 0.05 --error-rate 0.02 --no-rate-limits --output refresh.json
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+from argparse import ArgumentParser, SUPPRESS
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from fixture_server import FaultPlan, FixtureServer, parse_size
+from refresh_fixtures import GOG_PREFIX, STEAMRIP_PREFIX, RefreshFixtureHandler, RefreshFixtures, generate_fixtures
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REFRESH_SRC = os.path.join(REPO_ROOT, 'binaries', 'AscendaraLocalRefresh', 'src')
+
+SOURCES = ('steamrip', 'goggames')
+METRICS = ('posts_per_s', 'images_per_s', 'parse_cpu_ms_per_post', 'peak_rss_mb', 'progress_writes', 'total_seconds')
+
+
+def load_refresh(verbose=False):
+    """Import the refresh module from the binaries tree."""
+    if REFRESH_SRC not in sys.path:
+        sys.path.insert(0, REFRESH_SRC)
+    # The module logs to stdout, send that to stderr to keep stdout for the JSON result
+    with contextlib.redirect_stdout(sys.stderr):
+        import AscendaraLocalRefresh
+    logging.getLogger().setLevel(logging.INFO if verbose else logging.WARNING)
+    return AscendaraLocalRefresh
+
+
+def peak_rss_mb(who):
+    """Peak RSS in MB of this process or its reaped children, None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def point_at_fixtures(scraper, source, base_url):
+    """Send every request of the scraper to the fixture server."""
+    if source == 'steamrip':
+        site = base_url + STEAMRIP_PREFIX
+        scraper.base_url = f"{site}/wp-json/wp/v2/posts"
+        scraper.category_url = f"{site}/wp-json/wp/v2/categories"
+        scraper.views_url = f"{site}/wp-admin/admin-ajax.php"
+        scraper.keep_alive_urls = [f"{site}/", f"{site}/games-list-page/"]
+    else:
+        scraper.base_url = base_url + GOG_PREFIX
+
+
+def politeness_overrides(scraper, source, args):
+    """The --profile lanes of this source, without rate limits when --no-rate-limits is set."""
+    from politeness import merge_profiles, parse_profiles
+
+    overrides = {}
+    if args.profile:
+        profile = args.profile
+        if os.path.isfile(profile):
+            with open(profile, 'r', encoding='utf-8') as f:
+                profile = f.read()
+        overrides = parse_profiles(json.loads(profile), '--profile').get(source, {})
+    if args.no_rate_limits:
+        overrides = merge_profiles({source: {lane: {'rate': None} for lane in scraper.PROFILE}},
+                                   {source: overrides})[source]
+    return overrides
+
+
+def replay_parse_cpu(scraper, source, fixtures, per_page):
+    """CPU seconds spent parsing the fixtures the way a scrape does, and the number of posts parsed."""
+    cpu = 0.0
+    posts = 0
+    if source == 'steamrip':
+        from post_parser import parse_raw_posts
+
+        for raw in fixtures.post_pages(per_page):
+            start = time.process_time()
+            posts += len(parse_raw_posts(raw))
+            cpu += time.process_time() - start
+    else:
+        from html_parser import parse_html
+
+        for path in fixtures.game_pages():
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            start = time.process_time()
+            page = parse_html(text)
+            scraper._extract_game_name(page)
+            scraper._extract_game_size(page)
+            scraper._extract_version(page)
+            scraper._extract_download_links(page)
+            scraper._extract_image_url(page)
+            scraper._extract_update_date(page)
+            cpu += time.process_time() - start
+            posts += 1
+    return cpu, posts
+
+
+def run_source(args):
+    """One refresh of one source against the fixture server, runs in its own process."""
+    module = load_refresh(args.verbose)
+
+    class CountingProgress(module.RefreshProgress):
+        writes = 0
+
+        def _update_progress(self):
+            CountingProgress.writes += 1
+            super()._update_progress()
+
+    work_dir = tempfile.mkdtemp(prefix=f'ascendara-bench-refresh-{args.run_source}-')
+    try:
+        os.makedirs(os.path.join(work_dir, 'imgs_incoming'))
+        progress = CountingProgress(work_dir)
+        progress.set_status('running')
+        scraper = module.AVAILABLE_SCRAPERS[args.run_source](work_dir, progress.progress_file)
+        point_at_fixtures(scraper, args.run_source, args.base_url)
+        scraper.configure_politeness(politeness_overrides(scraper, args.run_source, args))
+
+        cpu_start = os.times()
+        start = time.perf_counter()
+        # The fixture server never asks for a cookie, one is passed so an injected 429 or 503 on the
+        # Cloudflare check does not fail the run
+        if not scraper.initialize(cookie='benchmark', skip_views=args.skip_views, view_workers=args.view_workers):
+            raise RuntimeError(f"{scraper.get_source_name()} scraper failed to initialize")
+        initialized = time.perf_counter()
+        progress.set_phase('processing_posts')
+        games = scraper.scrape_games(set(), per_page=args.per_page, workers=args.workers, progress=progress,
+                                     page_window=args.page_window, parse_workers=args.parse_workers)
+        scraped = time.perf_counter()
+        late_updates = scraper.collect_late_updates()
+        finished = time.perf_counter()
+        scraper.log_request_rates()
+        scraper.cleanup()
+        progress.complete(success=True)
+        cpu_end = os.times()
+        rss = {'main': peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+               'parse_processes': peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None}
+
+        parse_cpu, parsed_posts = replay_parse_cpu(scraper, args.run_source, RefreshFixtures(args.fixtures), args.per_page)
+        scrape_seconds = scraped - initialized
+        return {
+            'source': args.run_source,
+            'games': len(games),
+            'images': progress.downloaded_images,
+            'late_updates': len(late_updates),
+            'errors': len(progress.errors),
+            'seconds': {
+                'initialize': round(initialized - start, 4),
+                'scrape': round(scrape_seconds, 4),
+                'late_updates': round(finished - scraped, 4),
+                'total': round(finished - start, 4),
+            },
+            'posts_per_s': round(len(games) / scrape_seconds, 2) if scrape_seconds else None,
+            'images_per_s': round(progress.downloaded_images / scrape_seconds, 2) if scrape_seconds else None,
+            'parse_cpu_ms_per_post': round(parse_cpu * 1000 / parsed_posts, 4) if parsed_posts else None,
+            'cpu_seconds': {
+                'main': round(cpu_end.user + cpu_end.system - cpu_start.user - cpu_start.system, 4),
+                'parse_processes': round(cpu_end.children_user + cpu_end.children_system
+                                         - cpu_start.children_user - cpu_start.children_system, 4),
+            },
+            'peak_rss_mb': rss,
+            'progress_writes': CountingProgress.writes,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_child(source, args, fixtures_dir, base_url):
+    """Run one source in a fresh process and return its result."""
+    command = [sys.executable, os.path.abspath(__file__), '--run-source', source, '--base-url', base_url,
+               '--fixtures', fixtures_dir, '--per-page', str(args.per_page), '--workers', str(args.workers),
+               '--page-window', str(args.page_window), '--view-workers', str(args.view_workers)]
+    if args.parse_workers is not None:
+        command += ['--parse-workers', str(args.parse_workers)]
+    if args.profile:
+        command += ['--profile', args.profile]
+    for flag in ('skip_views', 'no_rate_limits', 'verbose'):
+        if getattr(args, flag):
+            command.append('--' + flag.replace('_', '-'))
+    completed = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{source} run exited with code {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs):
+    runs = [value for value in runs if value is not None]
+    if not runs:
+        return None
+    return {
+        'runs': [round(value, 4) for value in runs],
+        'median': round(statistics.median(runs), 4),
+        'min': round(min(runs), 4),
+        'max': round(max(runs), 4),
+    }
+
+
+def metric(result, name):
+    if name == 'peak_rss_mb':
+        return result['peak_rss_mb']['main']
+    if name == 'total_seconds':
+        return result['seconds']['total']
+    return result[name]
+
+
+def benchmark_source(source, args, fixtures, server):
+    available = fixtures.manifest.get(source)
+    if not available:
+        return {'source': source, 'skipped': 'no fixtures for this source'}
+
+    runs = []
+    for run in range(args.repeat):
+        # Every run sees the same faults
+        server.faults.rearm()
+        stats_before = dict(server.faults.stats)
+        result = run_child(source, args, fixtures.root, server.base_url)
+        result['server'] = {key: value - stats_before[key] for key, value in server.faults.stats.items()}
+        runs.append(result)
+        print(f"[{source}] run {run + 1}/{args.repeat}: {result['games']} games, "
+              f"{result['posts_per_s']} posts/s, {result['images_per_s']} images/s, "
+              f"{result['parse_cpu_ms_per_post']} ms parse CPU/post, peak RSS {result['peak_rss_mb']['main']} MB, "
+              f"{result['progress_writes']} progress writes", file=sys.stderr)
+
+    return {
+        'source': source,
+        'fixtures': available,
+        'metrics': {name: summarize([metric(result, name) for result in runs]) for name in METRICS},
+        'runs': runs,
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark the AscendaraLocalRefresh scrapers against replayed fixtures")
+    parser.add_argument('--sources', default=','.join(SOURCES), help=f"Comma separated sources ({', '.join(SOURCES)})")
+    parser.add_argument('--fixtures', help="Recorded or generated fixture directory, synthetic fixtures are generated if omitted")
+    parser.add_argument('--posts', type=int, default=1000, help="SteamRIP posts to generate")
+    parser.add_argument('--games', type=int, default=200, help="GOG-Games games to generate")
+    parser.add_argument('--post-size', default='12KB', help="Approximate HTML size of each generated post")
+    parser.add_argument('--image-size', default='24KB', help="Size of each generated cover")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for generated fixtures and injected errors")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per source")
+    parser.add_argument('--latency', type=float, default=0.0, help="Server latency before each response (seconds)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered 503 (0-1)")
+    parser.add_argument('--rate-limit', type=int, default=0, help="429 answers before each URL is served")
+    parser.add_argument('--per-page', type=int, default=100, help="SteamRIP posts per page")
+    parser.add_argument('--workers', type=int, default=8, help="Cover download threads (GOG detail workers)")
+    parser.add_argument('--page-window', type=int, default=3, help="SteamRIP pages in flight")
+    parser.add_argument('--parse-workers', type=int, default=None, help="SteamRIP parse processes, 0 parses in a thread")
+    parser.add_argument('--view-workers', type=int, default=4, help="Concurrent SteamRIP view count requests")
+    parser.add_argument('--skip-views', action='store_true', help="Do not fetch SteamRIP view counts")
+    parser.add_argument('--profile', help="Refresh profiles as a JSON file or inline JSON, as for --profile of the refresh")
+    parser.add_argument('--no-rate-limits', action='store_true', help="Drop the request rate of every lane")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    parser.add_argument('--verbose', action='store_true', help="Show refresh logging")
+    parser.add_argument('--run-source', help=SUPPRESS)
+    parser.add_argument('--base-url', help=SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_source:
+        result = run_source(args)
+        print(json.dumps(result))
+        return 0
+
+    sources = [source.strip() for source in args.sources.split(',') if source.strip()]
+    for source in sources:
+        if source not in SOURCES:
+            parser.error(f"unknown source: {source}")
+
+    generated_dir = None
+    if args.fixtures:
+        fixtures_dir = args.fixtures
+    else:
+        generated_dir = fixtures_dir = tempfile.mkdtemp(prefix='ascendara-bench-refresh-fixtures-')
+        start = time.perf_counter()
+        generate_fixtures(fixtures_dir, posts=args.posts if 'steamrip' in sources else 0,
+                          games=args.games if 'goggames' in sources else 0, per_page=args.per_page,
+                          post_size=parse_size(args.post_size), image_size=parse_size(args.image_size), seed=args.seed)
+        print(f"Generated fixtures in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    results = []
+    try:
+        fixtures = RefreshFixtures(fixtures_dir)
+        faults = FaultPlan(rate_limit=args.rate_limit, latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+        with FixtureServer(fixtures_dir, faults=faults, handler=RefreshFixtureHandler, fixtures=fixtures) as server:
+            for source in sources:
+                results.append(benchmark_source(source, args, fixtures, server))
+    finally:
+        if generated_dir:
+            shutil.rmtree(generated_dir, ignore_errors=True)
+
+    report = {
+        'metadata': {
+            'benchmark': 'refresh',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'fixtures': fixtures.manifest.get('origin'),
+            'parameters': vars(args),
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Report written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
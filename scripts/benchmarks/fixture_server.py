@@ -0,0 +1,277 @@
+# Local HTTP fixture server used by the Ascendara benchmarks. It serves files
+# from a directory with HTTP range support and can inject the faults real file
+# hosts produce: bandwidth throttling, connection resets part way through a
+# response, 429 rate limit answers, response latency and random 503 errors.
+#
+# Run standalone:
+#   python scripts/benchmarks/fixture_server.py --root ./fixtures --port 8765 --throttle 20MB --resets 2
+
+import os
+import re
+import sys
+import time
+import random
+import threading
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+SEND_CHUNK_SIZE = 64 * 1024
+
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def parse_size(value):
+    """Parse sizes like 512, 64KB or 20MB into bytes."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+class FaultPlan:
+    """Faults to inject, tracked per served path so every file sees the same plan."""
+
+    def __init__(self, throttle=0, resets=0, rate_limit=0, retry_after=1, latency=0.0, error_rate=0.0, seed=0):
+        self.throttle = throttle  # bytes/s per response, 0 = unlimited
+        self.resets = resets  # connection resets spread evenly over each file
+        self.rate_limit = rate_limit  # first N requests per path answer 429
+        self.retry_after = retry_after
+        self.latency = latency  # seconds before each response starts
+        self.error_rate = error_rate  # share of requests answered 503
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._requests = {}
+        self._resets_done = {}
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'resets': 0, 'bytes_sent': 0}
+
+    def rearm(self):
+        """Forget which faults were already injected, so the next request sees them again."""
+        with self._lock:
+            self._requests.clear()
+            self._resets_done.clear()
+            self._random = random.Random(self.seed)
+
+    def wait_latency(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def should_fail(self):
+        """Draw whether this request gets a 503, the same seed gives the same sequence."""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            if self._random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return True
+            return False
+
+    def should_rate_limit(self, path):
+        with self._lock:
+            self.stats['requests'] += 1
+            count = self._requests.get(path, 0)
+            self._requests[path] = count + 1
+            if count < self.rate_limit:
+                self.stats['rate_limited'] += 1
+                return True
+            return False
+
+    def next_reset_offset(self, path, file_size):
+        """Return the file offset where the next reset happens, or None."""
+        with self._lock:
+            done = self._resets_done.get(path, 0)
+        if done >= self.resets or file_size == 0:
+            return None
+        return file_size * (done + 1) // (self.resets + 1)
+
+    def record_reset(self, path):
+        with self._lock:
+            self._resets_done[path] = self._resets_done.get(path, 0) + 1
+            self.stats['resets'] += 1
+
+    def record_sent(self, count):
+        with self._lock:
+            self.stats['bytes_sent'] += count
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    root = '.'
+    faults = FaultPlan()
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _resolve(self):
+        rel_path = unquote(urlparse(self.path).path).lstrip('/')
+        full_path = os.path.realpath(os.path.join(self.root, rel_path))
+        if not full_path.startswith(os.path.realpath(self.root) + os.sep) or not os.path.isfile(full_path):
+            return rel_path, None
+        return rel_path, full_path
+
+    def _send_empty(self, status, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def _inject_faults(self, key, head):
+        """Answer with an injected fault, returns True if the request was handled."""
+        self.faults.wait_latency()
+        if head:
+            return False
+        if self.faults.should_rate_limit(key):
+            self._send_empty(429, {'Retry-After': str(self.faults.retry_after)})
+            return True
+        if self.faults.should_fail():
+            self._send_empty(503)
+            return True
+        return False
+
+    def _serve(self, head):
+        rel_path, full_path = self._resolve()
+        if full_path is None:
+            self._send_empty(404)
+            return
+
+        if self._inject_faults(rel_path, head):
+            return
+
+        file_size = os.path.getsize(full_path)
+        start, end = 0, file_size - 1
+        range_header = self.headers.get('Range')
+        if range_header:
+            match = re.fullmatch(r'bytes=(\d*)-(\d*)', range_header.strip())
+            if not match or (not match.group(1) and not match.group(2)):
+                self._send_empty(416, {'Content-Range': f'bytes */{file_size}'})
+                return
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), file_size - 1)
+            else:
+                start = max(file_size - int(match.group(2)), 0)
+            if start >= file_size or start > end:
+                self._send_empty(416, {'Content-Range': f'bytes */{file_size}'})
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{file_size}')
+        else:
+            self.send_response(200)
+
+        length = end - start + 1
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        if head:
+            return
+
+        reset_at = self.faults.next_reset_offset(rel_path, file_size)
+        if reset_at is not None and not (start < reset_at <= end):
+            reset_at = None
+
+        throttle = self.faults.throttle
+        sent = 0
+        started = time.time()
+        with open(full_path, 'rb') as f:
+            f.seek(start)
+            while sent < length:
+                to_send = min(SEND_CHUNK_SIZE, length - sent)
+                if reset_at is not None:
+                    to_send = min(to_send, reset_at - start - sent)
+                    if to_send <= 0:
+                        # Drop the connection mid-body, the client sees a truncated response
+                        self.faults.record_reset(rel_path)
+                        self.close_connection = True
+                        self.connection.shutdown(2)
+                        return
+                data = f.read(to_send)
+                if not data:
+                    break
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                sent += len(data)
+                self.faults.record_sent(len(data))
+                if throttle > 0:
+                    ahead = sent / throttle - (time.time() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+
+class FixtureServer:
+    """Serve a directory on localhost in a background thread."""
+
+    def __init__(self, root, host='127.0.0.1', port=0, faults=None, handler=FixtureRequestHandler, **handler_attrs):
+        self.faults = faults or FaultPlan()
+        handler = type(f'Bound{handler.__name__}', (handler,), dict(handler_attrs, **{
+            'root': os.path.abspath(root),
+            'faults': self.faults,
+        }))
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, rel_path):
+        return f"{self.base_url}/{rel_path.replace(os.sep, '/')}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = ArgumentParser(description="Serve benchmark fixtures with ranges and injected faults")
+    parser.add_argument('--root', required=True, help="Directory to serve")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--throttle', default='0', help="Per-response bandwidth limit (e.g. 20MB), 0 = unlimited")
+    parser.add_argument('--resets', type=int, default=0, help="Connection resets injected per file")
+    parser.add_argument('--rate-limit', type=int, default=0, help="First N GET requests per file answer 429")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds before each response starts")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of GET requests answered 503 (0-1)")
+    args = parser.parse_args()
+
+    faults = FaultPlan(parse_size(args.throttle), args.resets, args.rate_limit,
+                       latency=args.latency, error_rate=args.error_rate)
+    server = FixtureServer(args.root, args.host, args.port, faults)
+    print(f"Serving {os.path.abspath(args.root)} at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Stats: {faults.stats}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,509 @@
+# Fixtures for the AscendaraLocalRefresh benchmark: SteamRIP WordPress REST post
+# pages, categories and view counts, GOG-Games listing and game pages, and their
+# cover images. Fixtures are either recorded from the live sites or generated with
+# the same layout, and are replayed by RefreshFixtureHandler on the fixture server:
+#
+#   manifest.json
+#   steamrip/posts/page-0001.json   raw REST pages, recorded at manifest perPage
+#   steamrip/categories.json
+#   steamrip/views.json             post ID -> admin-ajax view count response
+#   goggames/index.html
+#   goggames/games/page-0001.html
+#   goggames/game/<slug>.html
+#   images/<name>.jpg
+#
+# Image URLs in posts and pages are stored as {{FIXTURE_BASE}}/images/<name>.jpg
+# and point at the fixture server when replayed.
+#
+# Run standalone:
+#   python scripts/benchmarks/refresh_fixtures.py generate --output ./refresh-fixtures --posts 2000 --games 300
+#   python scripts/benchmarks/refresh_fixtures.py record --output ./refresh-fixtures --steamrip-pages 5 --gog-pages 3 --cookie <cf_clearance>
+
+import os
+import re
+import sys
+import json
+import math
+import random
+import hashlib
+import threading
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urljoin, urlparse
+
+from fixture_server import FixtureRequestHandler, parse_size
+
+FIXTURE_FORMAT = 1
+PLACEHOLDER = '{{FIXTURE_BASE}}'
+STEAMRIP_PREFIX = '/steamrip'
+GOG_PREFIX = '/goggames'
+
+CATEGORY_NAMES = ['Action', 'Adventure', 'RPG', 'Strategy', 'Simulation', 'Racing', 'Sports', 'Horror',
+                  'Indie', 'Puzzle', 'Shooter', 'Survival', 'Open World', 'Platformer', 'Fighting',
+                  'Sandbox', 'Co-op', 'VR', 'Anime', 'Casual']
+TITLE_WORDS = ['Shadow', 'Legends', 'Empire', 'Odyssey', 'Frontier', 'Chronicles', 'Protocol', 'Harbor',
+               'Crimson', 'Echoes', 'Kingdom', 'Drift', 'Station', 'Hollow', 'Rising', 'Signal', 'Atlas',
+               'Nomad', 'Vertex', 'Requiem']
+RELEASE_GROUPS = ['TENOKE', 'RUNE', 'FLT', 'DOGE', 'P2P', 'SKIDROW', 'GOG']
+HOSTS = [('gofile', 'https://gofile.io/d/{}'), ('buzzheavier', 'https://bzzhr.to/{}'),
+         ('pixeldrain', 'https://pixeldrain.com/u/{}'), ('datanodes', 'https://datanodes.to/{}')]
+FILLER = ("Survive a world shaped by your choices, build a base, recruit companions and explore "
+          "hand crafted regions full of secrets. ")
+
+PAGE_FILE_RE = re.compile(r'^page-(\d+)\.(?:json|html)$')
+IMG_SRC_RE = re.compile(r'<meta[^>]+property="og:image"[^>]+content="([^"]+)"', re.IGNORECASE)
+
+
+def fixture_image(rng, size):
+    """Cover bytes with JPEG markers, unique per call so the image cache keeps them apart."""
+    return b'\xff\xd8\xff\xe0' + rng.randbytes(max(0, size - 6)) + b'\xff\xd9'
+
+
+def game_title(rng, index):
+    return f"{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {index}"
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def write_manifest(output_dir, origin, **sources):
+    manifest = {
+        'format': FIXTURE_FORMAT,
+        'origin': origin,
+        'createdAt': datetime.now(timezone.utc).isoformat(),
+    }
+    manifest.update(sources)
+    write_file(os.path.join(output_dir, 'manifest.json'), json.dumps(manifest, indent=2))
+    return manifest
+
+
+def steamrip_post_content(rng, title, post_size):
+    """Post HTML with the labels, requirement list and download buttons SteamRIP posts have."""
+    version = f"v{rng.randint(1, 3)}.{rng.randint(0, 20)}.{rng.randint(0, 99)} (Build {rng.randint(1000, 99999)})"
+    parts = [
+        f"<p><strong>{title}</strong> is an {rng.choice(CATEGORY_NAMES).lower()} game.</p>",
+        "<h2>GAME INFO</h2><ul>",
+        f"<li><strong>Genre</strong>: {rng.choice(CATEGORY_NAMES)}</li>",
+        f"<li><strong>Developer</strong>: {rng.choice(TITLE_WORDS)} Studio</li>",
+        f"<li><strong>Released By</strong>: {rng.choice(RELEASE_GROUPS)}</li>",
+        f"<li><strong>Version</strong>: {version}</li>",
+        f"<li><strong>Game Size</strong>: {rng.uniform(0.5, 120):.1f} GB</li>",
+        "</ul><h2>SYSTEM REQUIREMENTS</h2><ul>",
+        "<li><strong>OS</strong>: Windows 10 64-bit</li>",
+        "<li><strong>Processor:</strong> Intel Core i5-4460 / AMD FX-6300</li>",
+        f"<li><strong>Memory:</strong> {rng.choice([4, 8, 16])} GB RAM</li>",
+        "<li><strong>Graphics:</strong> NVIDIA GeForce GTX 970 / AMD Radeon R9 290</li>",
+        "<li><strong>DirectX:</strong> Version 11</li>",
+        f"<li><strong>Storage:</strong> {rng.randint(5, 150)} GB available space</li></ul>",
+    ]
+    for name, url in rng.sample(HOSTS, rng.randint(1, len(HOSTS))):
+        code = ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=10))
+        parts.append(f'<a class="shortc-button small green " href="{url.format(code)}" target="_blank">DOWNLOAD HERE</a>')
+    if rng.random() < 0.1:
+        parts.append("<p>Includes all DLC and online multiplayer fix.</p>")
+    html = ''.join(parts)
+    while len(html) < post_size:
+        html += f"<p>{FILLER * 4}</p>"
+    return html
+
+
+def generate_steamrip(output_dir, rng, posts, per_page, post_size, image_size):
+    categories = [{'id': index + 1, 'count': 0, 'name': name, 'slug': slugify(name), 'taxonomy': 'category'}
+                  for index, name in enumerate(CATEGORY_NAMES)]
+    write_file(os.path.join(output_dir, 'steamrip', 'categories.json'), json.dumps(categories))
+
+    views = {}
+    modified = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    page_posts = []
+    page = 1
+    post_id = 400000
+    for index in range(posts):
+        post_id -= rng.randint(1, 7)
+        title = game_title(rng, index)
+        image_name = f"steamrip-{post_id}.jpg"
+        write_file(os.path.join(output_dir, 'images', image_name), fixture_image(rng, image_size))
+        image_url = f"{PLACEHOLDER}/images/{image_name}"
+        modified -= timedelta(minutes=rng.randint(1, 600))
+        stamp = modified.strftime('%Y-%m-%dT%H:%M:%S')
+        page_posts.append({
+            'id': post_id,
+            'date': stamp,
+            'modified': stamp,
+            'slug': slugify(title),
+            'status': 'publish',
+            'type': 'post',
+            'link': f"https://steamrip.com/{slugify(title)}-free-download/",
+            'title': {'rendered': f"{title} Free Download ({rng.choice(['v1.0', 'Build 1234', 'All DLC'])})"},
+            'content': {'rendered': steamrip_post_content(rng, title, post_size), 'protected': False},
+            'excerpt': {'rendered': f"<p>{FILLER}</p>", 'protected': False},
+            'categories': rng.sample(range(1, len(CATEGORY_NAMES) + 1), rng.randint(1, 3)),
+            'yoast_head': f'<meta property="og:image" content="{image_url}" /><meta name="description" content="{FILLER * 3}" />',
+            'yoast_head_json': {'title': title, 'og_image': [{'width': 630, 'height': 350, 'url': image_url, 'type': 'image/jpeg'}]},
+        })
+        views[str(post_id)] = f"{rng.randint(0, 2000000):,}"
+        if len(page_posts) == per_page or index == posts - 1:
+            write_file(os.path.join(output_dir, 'steamrip', 'posts', f"page-{page:04d}.json"), json.dumps(page_posts))
+            page_posts = []
+            page += 1
+    write_file(os.path.join(output_dir, 'steamrip', 'views.json'), json.dumps(views))
+    return {'posts': posts, 'perPage': per_page, 'pages': page - 1}
+
+
+def gog_listing_page(slugs, page, last_page):
+    cards = ''.join(f'<div class="game-card"><a href="/game/{slug}">{slug.replace("-", " ").title()}</a></div>'
+                    for slug in slugs)
+    pagination = ''.join(f'<a href="/games?page={number}">{number}</a>' for number in range(1, last_page + 1))
+    return (f'<html><head><title>Games - GOG Games</title></head><body><main>{cards}</main>'
+            f'<nav class="pagination">{pagination}</nav></body></html>')
+
+
+def gog_game_page(rng, title, image_url, page_size):
+    links = ''.join(f'<a href="{url.format(rng.randint(10 ** 6, 10 ** 7))}">{name}</a>'
+                    for name, url in rng.sample(HOSTS, rng.randint(1, 3)))
+    body = (f'<h1 class="game-title">{title}</h1><img class="game-cover" src="{image_url}">'
+            f'<ul><li>Size: {rng.uniform(0.5, 60):.1f} GB</li><li>Version: {rng.randint(1, 4)}.{rng.randint(0, 9)}.{rng.randint(0, 9)}</li>'
+            f'<li>Updated: 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</li></ul><div class="links">{links}</div>')
+    while len(body) < page_size:
+        body += f"<p>{FILLER * 4}</p>"
+    return (f'<html><head><title>{title} - GOG Games</title><meta property="og:image" content="{image_url}">'
+            f'</head><body>{body}</body></html>')
+
+
+def generate_goggames(output_dir, rng, games, per_page, page_size, image_size):
+    write_file(os.path.join(output_dir, 'goggames', 'index.html'),
+               '<html><head><title>GOG Games</title></head><body><a href="/games">Games</a></body></html>')
+    slugs = []
+    for index in range(games):
+        title = game_title(rng, index)
+        slug = slugify(title)
+        image_name = f"gog-{slug}.jpg"
+        write_file(os.path.join(output_dir, 'images', image_name), fixture_image(rng, image_size))
+        write_file(os.path.join(output_dir, 'goggames', 'game', f"{slug}.html"),
+                   gog_game_page(rng, title, f"{PLACEHOLDER}/images/{image_name}", page_size))
+        slugs.append(slug)
+    last_page = max(1, math.ceil(games / per_page))
+    for page in range(1, last_page + 1):
+        write_file(os.path.join(output_dir, 'goggames', 'games', f"page-{page:04d}.html"),
+                   gog_listing_page(slugs[(page - 1) * per_page:page * per_page], page, last_page))
+    return {'games': games, 'listingPages': last_page}
+
+
+def generate_fixtures(output_dir, posts=1000, games=200, per_page=100, gog_per_page=24,
+                      post_size=12 * 1024, page_size=8 * 1024, image_size=24 * 1024, seed=0):
+    """Write synthetic fixtures with the recorded layout, the same seed gives the same bytes."""
+    rng = random.Random(seed)
+    sources = {}
+    if posts:
+        sources['steamrip'] = generate_steamrip(output_dir, rng, posts, per_page, post_size, image_size)
+    if games:
+        sources['goggames'] = generate_goggames(output_dir, rng, games, gog_per_page, page_size, image_size)
+    return write_manifest(output_dir, 'synthetic', seed=seed, **sources)
+
+
+def _record_image(session, output_dir, url, prefix, recorded):
+    """Download a cover once, returns its placeholder URL (or the original if it failed)."""
+    if url in recorded:
+        return recorded[url]
+    name = f"{prefix}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.jpg"
+    try:
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        write_file(os.path.join(output_dir, 'images', name), response.content)
+        recorded[url] = f"{PLACEHOLDER}/images/{name}"
+    except Exception as e:
+        print(f"Could not record image {url}: {e}", file=sys.stderr)
+        recorded[url] = url
+    return recorded[url]
+
+
+def record_steamrip(output_dir, session, pages, per_page=100, views=True):
+    api = 'https://steamrip.com/wp-json/wp/v2'
+    categories = []
+    page = 1
+    while True:
+        response = session.get(f"{api}/categories?per_page=100&page={page}", timeout=30)
+        if response.status_code != 200 or not response.json():
+            break
+        categories.extend(response.json())
+        page += 1
+    write_file(os.path.join(output_dir, 'steamrip', 'categories.json'), json.dumps(categories))
+
+    images = {}
+    view_counts = {}
+    recorded_posts = 0
+    for page in range(1, pages + 1):
+        response = session.get(f"{api}/posts?per_page={per_page}&page={page}", timeout=60)
+        if response.status_code != 200:
+            print(f"Stopped recording SteamRIP at page {page}: HTTP {response.status_code}", file=sys.stderr)
+            break
+        posts = response.json()
+        page_text = json.dumps(posts)
+        for post in posts:
+            try:
+                image_url = post['yoast_head_json']['og_image'][0]['url']
+            except (KeyError, IndexError, TypeError):
+                image_url = None
+            if image_url:
+                page_text = page_text.replace(image_url, _record_image(session, output_dir, image_url, 'steamrip', images))
+            if views:
+                count = session.get(f"https://steamrip.com/wp-admin/admin-ajax.php?postviews_id={post['id']}"
+                                    f"&action=tie_postviews", timeout=30)
+                if count.status_code == 200:
+                    view_counts[str(post['id'])] = count.text
+        write_file(os.path.join(output_dir, 'steamrip', 'posts', f"page-{page:04d}.json"), page_text)
+        recorded_posts += len(posts)
+        print(f"Recorded SteamRIP page {page} ({len(posts)} posts)", file=sys.stderr)
+        if len(posts) < per_page:
+            break
+    write_file(os.path.join(output_dir, 'steamrip', 'views.json'), json.dumps(view_counts))
+    return {'posts': recorded_posts, 'perPage': per_page, 'pages': math.ceil(recorded_posts / per_page)}
+
+
+def record_goggames(output_dir, session, pages):
+    site = 'https://gog-games.to'
+    response = session.get(f"{site}/", timeout=30)
+    write_file(os.path.join(output_dir, 'goggames', 'index.html'), response.text.replace(site, ''))
+
+    images = {}
+    games = 0
+    recorded_pages = 0
+    for page in range(1, pages + 1):
+        response = session.get(f"{site}/games?page={page}", timeout=30)
+        if response.status_code != 200:
+            print(f"Stopped recording GOG-Games at page {page}: HTTP {response.status_code}", file=sys.stderr)
+            break
+        listing = response.text.replace(site, '')
+        write_file(os.path.join(output_dir, 'goggames', 'games', f"page-{page:04d}.html"), listing)
+        recorded_pages += 1
+        for slug in dict.fromkeys(re.findall(r'href="/game/([^"/?#]+)"', listing)):
+            game = session.get(f"{site}/game/{slug}", timeout=30)
+            if game.status_code != 200:
+                continue
+            text = game.text
+            image = IMG_SRC_RE.search(text)
+            if image:
+                image_url = urljoin(site, image.group(1))
+                text = text.replace(image.group(1), _record_image(session, output_dir, image_url, 'gog', images))
+            write_file(os.path.join(output_dir, 'goggames', 'game', f"{slug}.html"), text.replace(site, ''))
+            games += 1
+        print(f"Recorded GOG-Games listing page {page} ({games} games so far)", file=sys.stderr)
+    return {'games': games, 'listingPages': recorded_pages}
+
+
+def record_fixtures(output_dir, steamrip_pages=0, gog_pages=0, cookie=None, user_agent=None, views=True):
+    """Record fixtures from the live sites, SteamRIP may need a cf_clearance cookie."""
+    try:
+        import cloudscraper
+        session = cloudscraper.create_scraper(browser={'browser': 'chrome', 'platform': 'windows', 'mobile': False})
+    except ImportError:
+        import requests
+        session = requests.Session()
+    if user_agent:
+        session.headers['User-Agent'] = user_agent
+    if cookie:
+        session.headers['Cookie'] = cookie if cookie.startswith('cf_clearance=') else f"cf_clearance={cookie}"
+
+    sources = {}
+    if steamrip_pages:
+        sources['steamrip'] = record_steamrip(output_dir, session, steamrip_pages, views=views)
+    if gog_pages:
+        sources['goggames'] = record_goggames(output_dir, session, gog_pages)
+    return write_manifest(output_dir, 'recorded', **sources)
+
+
+class RefreshFixtures:
+    """
+    Fixture data in memory, answering requests the way the live sites do.
+
+    Post pages are sliced again for any per_page, so runs may use other page sizes
+    than the recording. Rendered responses are cached by URL.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        with open(os.path.join(self.root, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.posts = []
+        self.post_modified = []
+        posts_dir = os.path.join(self.root, 'steamrip', 'posts')
+        if os.path.isdir(posts_dir):
+            for name in sorted(os.listdir(posts_dir), key=lambda n: int(PAGE_FILE_RE.match(n).group(1)) if PAGE_FILE_RE.match(n) else 0):
+                if not PAGE_FILE_RE.match(name):
+                    continue
+                with open(os.path.join(posts_dir, name), 'r', encoding='utf-8') as f:
+                    for post in json.load(f):
+                        self.posts.append((post.get('id'), json.dumps(post)))
+                        self.post_modified.append(post.get('modified') or '')
+        self.categories = self._load_json(os.path.join('steamrip', 'categories.json'), [])
+        self.views = self._load_json(os.path.join('steamrip', 'views.json'), {})
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _load_json(self, rel_path, default):
+        path = os.path.join(self.root, rel_path)
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def post_pages(self, per_page):
+        """The recorded post pages re-sliced to per_page, as raw response bodies."""
+        return [('[' + ','.join(text for _, text in self.posts[start:start + per_page]) + ']').encode('utf-8')
+                for start in range(0, len(self.posts), per_page)]
+
+    def game_pages(self):
+        game_dir = os.path.join(self.root, 'goggames', 'game')
+        if not os.path.isdir(game_dir):
+            return []
+        return [os.path.join(game_dir, name) for name in sorted(os.listdir(game_dir)) if name.endswith('.html')]
+
+    def respond(self, path, query, base_url):
+        """(status, headers, body) for a site URL, None for paths served as files (covers)."""
+        key = (path, tuple(sorted((name, tuple(values)) for name, values in query.items() if name != '_')))
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            cached = self._render(path, query)
+            if cached is not None:
+                status, headers, body = cached
+                cached = status, headers, body.replace(PLACEHOLDER.encode('utf-8'), base_url.encode('utf-8'))
+            with self._lock:
+                self._cache[key] = cached
+        return cached
+
+    def _render(self, path, query):
+        if path.startswith(STEAMRIP_PREFIX + '/'):
+            return self._render_steamrip(path[len(STEAMRIP_PREFIX):], query)
+        if path == GOG_PREFIX or path.startswith(GOG_PREFIX + '/'):
+            return self._render_goggames(path[len(GOG_PREFIX):] or '/', query)
+        return None
+
+    def _render_steamrip(self, path, query):
+        def number(name, default):
+            try:
+                return int(query.get(name, [default])[0])
+            except ValueError:
+                return default
+
+        if path.rstrip('/') in ('/wp-json/wp/v2/posts', '/wp-json/wp/v2/categories'):
+            if path.rstrip('/').endswith('posts'):
+                after = query.get('modified_after', [''])[0]
+                items = [(post_id, text) for (post_id, text), modified in zip(self.posts, self.post_modified)
+                         if not after or modified > after]
+                if query.get('_fields', [''])[0] == 'id':
+                    items = [(post_id, json.dumps({'id': post_id})) for post_id, _ in items]
+            else:
+                items = [(category['id'], json.dumps(category)) for category in self.categories]
+            per_page = max(1, min(100, number('per_page', 10)))
+            page = number('page', 1)
+            total_pages = math.ceil(len(items) / per_page)
+            headers = {'Content-Type': 'application/json; charset=UTF-8',
+                       'X-WP-Total': str(len(items)), 'X-WP-TotalPages': str(total_pages)}
+            if page < 1 or (page > total_pages and page > 1):
+                body = json.dumps({'code': 'rest_post_invalid_page_number',
+                                   'message': 'The page number requested is larger than the number of pages available.',
+                                   'data': {'status': 400}})
+                return 400, headers, body.encode('utf-8')
+            body = '[' + ','.join(text for _, text in items[(page - 1) * per_page:page * per_page]) + ']'
+            return 200, headers, body.encode('utf-8')
+
+        if path == '/wp-admin/admin-ajax.php':
+            count = self.views.get(query.get('postviews_id', [''])[0], '0')
+            return 200, {'Content-Type': 'text/html; charset=UTF-8'}, str(count).encode('utf-8')
+
+        # Keep-alive pings and anything else on the site
+        return 200, {'Content-Type': 'text/html; charset=UTF-8'}, b'<html><body>SteamRIP</body></html>'
+
+    def _render_goggames(self, path, query):
+        if path in ('/', ''):
+            rel_path = os.path.join('goggames', 'index.html')
+        elif path.rstrip('/') == '/games':
+            try:
+                page = int(query.get('page', ['1'])[0])
+            except ValueError:
+                page = 1
+            rel_path = os.path.join('goggames', 'games', f"page-{page:04d}.html")
+        elif path.startswith('/game/'):
+            rel_path = os.path.join('goggames', 'game', f"{os.path.basename(path.rstrip('/'))}.html")
+        else:
+            rel_path = None
+        full_path = os.path.join(self.root, rel_path) if rel_path else None
+        if not full_path or not os.path.isfile(full_path):
+            return 404, {'Content-Type': 'text/html; charset=UTF-8'}, b'<html><body>Not Found</body></html>'
+        with open(full_path, 'rb') as f:
+            return 200, {'Content-Type': 'text/html; charset=UTF-8'}, f.read()
+
+
+class RefreshFixtureHandler(FixtureRequestHandler):
+    """Answers SteamRIP and GOG-Games URLs from RefreshFixtures, covers are served as files."""
+
+    fixtures = None
+
+    def _serve(self, head):
+        parsed = urlparse(self.path)
+        host, port = self.server.server_address[:2]
+        response = self.fixtures.respond(parsed.path, parse_qs(parsed.query), f"http://{host}:{port}")
+        if response is None:
+            super()._serve(head)
+            return
+        if self._inject_faults(self.path, head):
+            return
+
+        status, headers, body = response
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            self.faults.record_sent(len(body))
+
+
+def main():
+    parser = ArgumentParser(description="Generate or record fixtures for the local refresh benchmark")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="Write synthetic fixtures")
+    generate.add_argument('--output', required=True, help="Fixture directory to write")
+    generate.add_argument('--posts', type=int, default=1000, help="SteamRIP posts, 0 for none")
+    generate.add_argument('--games', type=int, default=200, help="GOG-Games games, 0 for none")
+    generate.add_argument('--post-size', default='12KB', help="Approximate HTML size of each post")
+    generate.add_argument('--page-size', default='8KB', help="Approximate HTML size of each GOG game page")
+    generate.add_argument('--image-size', default='24KB', help="Size of each cover image")
+    generate.add_argument('--seed', type=int, default=0)
+
+    record = commands.add_parser('record', help="Record fixtures from the live sites")
+    record.add_argument('--output', required=True, help="Fixture directory to write")
+    record.add_argument('--steamrip-pages', type=int, default=2, help="SteamRIP post pages of 100 to record, 0 for none")
+    record.add_argument('--gog-pages', type=int, default=1, help="GOG-Games listing pages to record, 0 for none")
+    record.add_argument('--skip-views', action='store_true', help="Do not record SteamRIP view counts")
+    record.add_argument('--cookie', help="cf_clearance cookie for SteamRIP")
+    record.add_argument('--user-agent', help="User-Agent the cookie was issued for")
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        manifest = generate_fixtures(args.output, args.posts, args.games, post_size=parse_size(args.post_size),
+                                     page_size=parse_size(args.page_size), image_size=parse_size(args.image_size),
+                                     seed=args.seed)
+    else:
+        manifest = record_fixtures(args.output, args.steamrip_pages, args.gog_pages, args.cookie,
+                                   args.user_agent, views=not args.skip_views)
+    print(json.dumps(manifest, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
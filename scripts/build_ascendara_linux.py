@@ -213,6 +213,8 @@ def build_python_binaries_linux():
             '--distpath', dist_dir,
             '--workpath', os.path.join(dist_dir, 'build_tmp'),
             '--specpath', os.path.join(dist_dir, 'spec_tmp'),
+            # Modules shared between binaries (e.g. pe_info) are imported from here
+            '--paths', os.path.join(binaries_dir, 'shared'),
         ] + extra_args + [script_path]
 
         print(f"Compiling {binary_name}...")
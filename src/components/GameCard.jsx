@@ -59,6 +59,7 @@ const GameCard = memo(function GameCard({ game, compact }) {
   const { cachedImage, loading, error } = useImageLoader(game?.imgID, {
     quality: isVisible ? "high" : "low",
     priority: isVisible ? "high" : "low",
+    thumb: game?.thumb,
     enabled: !!game?.imgID || (!game?.imgID && !!game?.game),
     fallbackGameName: !game?.imgID ? game?.game : null,
     fallbackSlot: "card",
@@ -51,6 +51,7 @@ export function SettingsProvider({ children }) {
     shareLocalIndex: true,
     fetchPageCount: 50,
     localRefreshWorkers: 8,
+    localRefreshIncremental: true,
     homeSearch: true,
     indexReminder: "7",
     autoRefreshEnabled: false,
@@ -235,6 +236,7 @@ const defaultSettings = {
   shareLocalIndex: true,
   fetchPageCount: 50,
   localRefreshWorkers: 8,
+  localRefreshIncremental: true,
   homeSearch: true,
   indexReminder: "7",
   autoRefreshEnabled: false,
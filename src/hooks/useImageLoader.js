@@ -96,7 +96,8 @@ export function useImageLoader(
     }
 
     // Check memory cache synchronously first (instant return)
-    const cachedUrl = imageCacheService.memoryCache?.get(imgID)?.url;
+    const cacheKey = options.thumb ? `${imgID}@thumb` : imgID;
+    const cachedUrl = imageCacheService.memoryCache?.get(cacheKey)?.url;
     if (cachedUrl) {
       setState({
         cachedImage: cachedUrl,
@@ -107,7 +108,7 @@ export function useImageLoader(
     }
 
     // Check if this image is already being loaded
-    const loadingKey = `${imgID}-${options.quality}`;
+    const loadingKey = `${cacheKey}-${options.quality}`;
     if (loadingImages.has(loadingKey)) {
       setState(prev => ({ ...prev, loading: true }));
       loadingImages
@@ -190,6 +191,7 @@ export function useImageLoader(
     options.enabled,
     options.quality,
     options.priority,
+    options.thumb,
     options.fallbackGameName,
     options.fallbackSlot,
   ]);
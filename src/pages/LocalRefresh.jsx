@@ -336,12 +336,15 @@ const LocalRefresh = () => {
                     t("localRefresh.fetchingPosts") || "Fetching game posts...",
                   processing_posts:
                     t("localRefresh.processingPosts") || "Processing games...",
+                  processing_images:
+                    t("localRefresh.processingImages") || "Optimizing images...",
                   fetching_views:
                     t("localRefresh.fetchingViews") || "Fetching view counts...",
                   waiting_for_cookie:
                     t("localRefresh.waitingForCookie") ||
                     "Cookie expired - waiting for new cookie...",
                   saving: t("localRefresh.saving") || "Saving data...",
+                  swapping: t("localRefresh.swapping") || "Finalizing...",
                   done: t("localRefresh.done") || "Done",
                 };
                 setCurrentStep(phaseMessages[data.phase] || data.phase);
@@ -431,6 +434,9 @@ const LocalRefresh = () => {
             t("localRefresh.fetchingCategories") || "Fetching categories...",
           fetching_posts: t("localRefresh.fetchingPosts") || "Fetching game posts...",
           processing_posts: t("localRefresh.processingPosts") || "Processing games...",
+          processing_images:
+            t("localRefresh.processingImages") || "Optimizing images...",
+          fetching_views: t("localRefresh.fetchingViews") || "Fetching view counts...",
           waiting_for_cookie:
             t("localRefresh.waitingForCookie") ||
             "Cookie expired - waiting for new cookie...",
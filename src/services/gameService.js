@@ -275,6 +275,35 @@ function writeCustomSourceCache(url, payload) {
   }
 }
 
+// ---------------------------------------------------------------------------
+// Local index helpers
+// ---------------------------------------------------------------------------
+
+/**
+ * Apply fields published after the live index version (late view counts) in place.
+ * index/current.json names the updates file when the live version has one.
+ */
+async function applyIndexUpdates(localIndexPath, games) {
+  if (!games) return;
+  try {
+    const pointer = JSON.parse(
+      await window.electron.ipcRenderer.readFile(`${localIndexPath}/index/current.json`)
+    );
+    if (!pointer.updates) return;
+    const updates = JSON.parse(
+      await window.electron.ipcRenderer.readFile(`${localIndexPath}/${pointer.updates}`)
+    );
+    if (updates.version !== pointer.version || !updates.games) return;
+    for (const game of games) {
+      const fields = updates.games[game.gameID];
+      if (fields) Object.assign(game, fields);
+    }
+  } catch (error) {
+    // Indexes from before versioning have no pointer, the index itself is complete
+    console.warn("[GameService] Could not apply local index updates:", error);
+  }
+}
+
 const gameService = {
   parseDateString(dateStr) {
     if (!dateStr) return null;
@@ -425,6 +454,7 @@ const gameService = {
       const filePath = `${localIndexPath}/ascendara_games.json`;
       const fileContent = await window.electron.ipcRenderer.readFile(filePath);
       const data = JSON.parse(fileContent);
+      await applyIndexUpdates(localIndexPath, data.games);
 
       // Sanitize game titles
       if (data.games) {
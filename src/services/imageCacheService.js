@@ -212,6 +212,11 @@ class ImageCacheService {
   async getImage(imgID, options = { priority: "normal", quality: "high" }) {
     if (!imgID) return null;
 
+    // Card thumbnails built by the local refresh are cached apart from full covers
+    if (options.thumb) {
+      return this._getLocalThumbnail(imgID, options.thumb);
+    }
+
     // Check memory cache FIRST - no async needed, instant return
     if (this.memoryCache.has(imgID)) {
       const cached = this.memoryCache.get(imgID);
@@ -306,6 +311,45 @@ class ImageCacheService {
     return null;
   }
 
+  /**
+   * Load a card thumbnail (imgs/thumbs/{imgID}.{ext}), falling back to the full cover
+   */
+  async _getLocalThumbnail(imgID, ext) {
+    const cacheKey = `${imgID}@thumb`;
+    if (this.memoryCache.has(cacheKey)) {
+      return this.memoryCache.get(cacheKey).url;
+    }
+    if (this.activeRequests.has(cacheKey)) {
+      return this.activeRequests.get(cacheKey);
+    }
+
+    const settings = await this._getSettings();
+    if (!settings?.localIndex) {
+      return this.getImage(imgID);
+    }
+
+    const loadPromise = (async () => {
+      const thumbUrl = await window.electron.getLocalImageUrl(
+        `${settings.localIndex}/imgs/thumbs/${imgID}.${ext}`
+      );
+      if (thumbUrl) {
+        this._setMemoryCache(cacheKey, thumbUrl, "low");
+        return thumbUrl;
+      }
+      return this._loadLocalImage(imgID, settings.localIndex);
+    })();
+    this.activeRequests.set(cacheKey, loadPromise);
+
+    try {
+      return await loadPromise;
+    } catch (error) {
+      console.warn(`[ImageCache] Failed to load local thumbnail ${imgID}:`, error);
+      return null;
+    } finally {
+      this.activeRequests.delete(cacheKey);
+    }
+  }
+
   _setMemoryCache(imgID, url, quality = "high") {
     this.memoryCache.set(imgID, { url, quality });
     this.memoryCacheOrder = this.memoryCacheOrder.filter(id => id !== imgID);
@@ -563,9 +607,11 @@ class ImageCacheService {
     console.log(`[ImageCache] Invalidating cache for image ID: ${imgID}`);
 
     // Remove from memory cache
-    if (this.memoryCache.has(imgID)) {
-      this.memoryCache.delete(imgID);
-      this.memoryCacheOrder = this.memoryCacheOrder.filter(id => id !== imgID);
+    for (const cacheKey of [imgID, `${imgID}@thumb`]) {
+      if (this.memoryCache.has(cacheKey)) {
+        this.memoryCache.delete(cacheKey);
+        this.memoryCacheOrder = this.memoryCacheOrder.filter(id => id !== cacheKey);
+      }
     }
 
     // Remove from IndexedDB if available